@@ -0,0 +1,117 @@
+"""
+Benchmarks the hand-written frame parsers in utils.py against the frame signal table
+(utils.frame_specs, compiled to one struct unpack per frame)
+
+The corpus is a synthetic session, or a recorded logs/candump_<timestamp>.csv given with --log.
+Both decoders must give identical output on every frame of it before anything is timed
+
+Run from the repo root: python benchmarks/bench_frame_decoders.py [--log logs/candump_20250101_120000.csv]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from can_frame import parse_candump_line  # noqa: E402
+from frame_sources import read_candump_log  # noqa: E402
+from frame_sources.synthetic import synthetic_frames  # noqa: E402
+from utils import (  # noqa: E402
+    decode_0x060_frame,
+    decode_0x070_frame,
+    frame_decoders,
+    parse_0x001_frame,
+    parse_0x060_frame,
+    parse_0x070_frame,
+    parse_0x204_frame,
+    parse_0x206_frame,
+    parse_sail_wind_sensor_frame,
+    parse_wind_sensor_frame,
+    pid_obj,
+)
+
+# frame_id: (hand-written parser, table decoder)
+DECODERS = {
+    0x001: (parse_0x001_frame, frame_decoders[0x001]),
+    0x040: (parse_sail_wind_sensor_frame, frame_decoders[0x040]),
+    0x041: (parse_wind_sensor_frame, frame_decoders[0x041]),
+    0x060: (
+        lambda payload: parse_0x060_frame(payload, 0.0),
+        lambda payload: decode_0x060_frame(payload, 0.0),
+    ),
+    0x070: (parse_0x070_frame, decode_0x070_frame),
+    0x204: (parse_0x204_frame, frame_decoders[0x204]),
+    0x206: (parse_0x206_frame, frame_decoders[0x206]),
+}
+
+
+def load_corpus(log_path):
+    if log_path is None:
+        return [frame for t in range(3600) for frame in synthetic_frames(t)]
+    frames = (parse_candump_line(line) for _, line in read_candump_log(log_path))
+    return [frame for frame in frames if frame is not None]
+
+
+def check_identical(frames):
+    mismatches = 0
+    for frame_id, payload in frames:
+        hand, table = DECODERS[frame_id]
+        try:
+            expected = hand(payload)
+        except ValueError:
+            continue  # eg. a malformed frame in a recorded log
+        if table(payload) != expected:
+            mismatches += 1
+            print(f"MISMATCH 0x{frame_id:03X} {payload.hex()}")
+    return mismatches
+
+
+def time_decoder(decode, payloads, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for payload in payloads:
+            decode(payload)
+        best = min(best, time.perf_counter() - start)
+    return best / len(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame decoder benchmark")
+    parser.add_argument("--log", help="recorded logs/candump_<timestamp>.csv to decode")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs (best kept)")
+    args = parser.parse_args()
+
+    pid_obj.set_refs(
+        49.2722, -123.1985
+    )  # so 0x070 offsets don't depend on the first fix
+    frames = [frame for frame in load_corpus(args.log) if frame[0] in DECODERS]
+    mismatches = check_identical(frames)
+    print(f"{len(frames)} frames, {mismatches} mismatches\n")
+    if mismatches:
+        sys.exit(1)
+
+    # range_check() prints are part of both decoders; keep them out of the timings
+    sys.stdout = open(os.devnull, "w")
+    rows = []
+    for frame_id, (hand, table) in DECODERS.items():
+        payloads = [payload for fid, payload in frames if fid == frame_id]
+        if payloads:
+            hand_us = time_decoder(hand, payloads, args.repeat) * 1e6
+            table_us = time_decoder(table, payloads, args.repeat) * 1e6
+            rows.append((f"0x{frame_id:03X}", len(payloads), hand_us, table_us))
+    sys.stdout = sys.__stdout__
+
+    columns = ["frame_id", "frames", "hand_us", "table_us", "speedup"]
+    print(" ".join(f"{col:>10}" for col in columns))
+    for frame_id, count, hand_us, table_us in rows:
+        print(
+            f"{frame_id:>10} {count:>10} {hand_us:>10.2f} {table_us:>10.2f} "
+            f"{hand_us / table_us:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
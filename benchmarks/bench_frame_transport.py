@@ -0,0 +1,134 @@
+"""
+Benchmarks the candump_process -> GUI frame transport at several frame rates:
+- queue: batches of candump text lines through a multiprocessing.Queue, parsed by the GUI
+- ring: frames parsed by the producer and read from a shared memory FrameRing
+
+The consumer runs a tick every config.gui_update_freq ms, like CANWindow.update_status
+
+Run from the repo root: python benchmarks/bench_frame_transport.py [--duration 5] [--rates 1000 5000 20000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from can_frame import format_candump_line, parse_candump_line  # noqa: E402
+from config import frame_ring_capacity, gui_update_freq  # noqa: E402
+from frame_ring import FrameRing, iter_frames  # noqa: E402
+from workers.CAN_dump_worker import push_candump_lines  # noqa: E402
+
+PRODUCER_PERIOD = 0.005  # secs between batches, as candump_batch_max_delay
+SAMPLE_LINE = format_candump_line(0x204, bytes(range(16)))
+
+
+def producer(transport, queue, frame_ring, rate, duration):
+    per_batch = max(1, round(rate * PRODUCER_PERIOD))
+    start = time.perf_counter()
+    next_batch = start
+    while next_batch - start < duration:
+        lines = [SAMPLE_LINE] * per_batch
+        if transport == "queue":
+            queue.put((time.time(), lines))
+        else:
+            push_candump_lines(lines, frame_ring, queue)
+        next_batch += PRODUCER_PERIOD
+        time.sleep(max(0.0, next_batch - time.perf_counter()))
+    queue.put(None)  # done
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(transport, rate, duration):
+    queue = multiprocessing.Queue()
+    frame_ring = FrameRing(frame_ring_capacity)
+    proc = multiprocessing.Process(
+        target=producer, args=(transport, queue, frame_ring, rate, duration)
+    )
+    proc.start()
+
+    tick_times = []
+    latencies = []
+    frames = 0
+    done = False
+    while not done:
+        time.sleep(gui_update_freq / 1000)
+        tick_start = time.perf_counter()
+        now = time.time()
+        while not queue.empty():
+            item = queue.get()
+            if item is None:
+                done = True
+                continue
+            if transport == "queue":
+                sent, lines = item
+                for line in lines:
+                    parse_candump_line(line)
+                    latencies.append(now - sent)
+                    frames += 1
+        if transport == "ring":
+            for timestamp, _, _ in iter_frames(frame_ring.read()):
+                latencies.append(now - timestamp)
+                frames += 1
+        tick_times.append(time.perf_counter() - tick_start)
+
+    proc.join()
+    overflows = frame_ring.overflow_count
+    frame_ring.close()
+    return {
+        "transport": transport,
+        "rate": rate,
+        "frames": frames,
+        "overflows": overflows,
+        "tick_p50_ms": percentile(tick_times, 50) * 1000,
+        "tick_p99_ms": percentile(tick_times, 99) * 1000,
+        "gui_busy_pct": 100 * sum(tick_times) / duration,
+        "latency_p50_ms": percentile(latencies, 50) * 1000,
+        "latency_p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame transport benchmark")
+    parser.add_argument("--duration", type=float, default=5.0, help="secs per run")
+    parser.add_argument(
+        "--rates", type=int, nargs="+", default=[1000, 5000, 20000], help="frames/s"
+    )
+    args = parser.parse_args()
+
+    multiprocessing.set_start_method("spawn")
+    columns = [
+        "transport",
+        "rate",
+        "frames",
+        "overflows",
+        "tick_p50_ms",
+        "tick_p99_ms",
+        "gui_busy_pct",
+        "latency_p50_ms",
+        "latency_p99_ms",
+    ]
+    print(" ".join(f"{col:>14}" for col in columns))
+    for rate in args.rates:
+        for transport in ("queue", "ring"):
+            result = run(transport, rate, args.duration)
+            print(
+                " ".join(
+                    f"{result[col]:>14.2f}"
+                    if isinstance(result[col], float)
+                    else f"{result[col]:>14}"
+                    for col in columns
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Benchmarks CANWindow.update_status end to end with offscreen Qt: a producer process pushes a
+mix of frames to the window's FrameRing (and text lines to its queue) at real rates, while
+the GUI thread runs update_status (plus Qt's repaint) every config.gui_update_freq ms
+
+Frame mixes (rates in frames/s, scaled by --scale):
+- rudder: 0x204 at 100 Hz
+- pdb: 0x206
+- gps: 0x070
+- ais: bursts of 0x060, one frame per ship, once a second
+- heartbeats: 0x130 - 0x133
+- full: all of the above together
+
+Reports sustained frames/s, update_status tick p50/p99, graph line redraws (setData calls)/s
+and backlog growth (frames/s left in the ring), and saves the results as JSON. Pass an earlier JSON as --baseline to compare
+
+Run from the repo root: python benchmarks/bench_update_status.py [--duration 10] [--mixes full] [--scale 1 10]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# main re-runs this script with Qt's library path set (as when running the GUI) on import
+import main as gui  # noqa: E402
+from config import frame_ring_capacity, gui_update_freq  # noqa: E402
+from frame_ring import FrameRing  # noqa: E402
+from frame_sources.synthetic import (  # noqa: E402
+    encode_ais_frame,
+    encode_gps_frame,
+    encode_pdb_frame,
+    encode_rudder_frame,
+)
+
+PRODUCER_PERIOD = 0.005  # secs between batches, as candump_batch_max_delay
+AIS_SHIPS = 50  # frames per AIS burst
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _rudder(i):
+    return 0x204, encode_rudder_frame(i % 40 - 20, 1, -1, i % 360, 5, 1, -1, 2.5)
+
+
+def _pdb(i):
+    return 0x206, encode_pdb_frame([3.7] * 4, [30, 31, 32], [1.0, 1.1, 1.2, 1.3])
+
+
+def _gps(i):
+    return 0x070, encode_gps_frame(49.2722, -123.1985 + 0.00001 * i, 2.5)
+
+
+def _ais_burst(i):
+    return [
+        (0x060, encode_ais_frame(sid, 49.27 + sid * 0.001, -123.19, sid, AIS_SHIPS))
+        for sid in range(AIS_SHIPS)
+    ]
+
+
+def _heartbeats(i):
+    return [(frame_id, b"") for frame_id in (0x130, 0x131, 0x132, 0x133)]
+
+
+# Each stream is (makes the frames for its i-th send, sends per sec)
+STREAMS = {
+    "rudder": [(lambda i: [_rudder(i)], 100)],
+    "pdb": [(lambda i: [_pdb(i)], 10)],
+    "gps": [(lambda i: [_gps(i)], 5)],
+    "ais": [(_ais_burst, 1)],
+    "heartbeats": [(_heartbeats, 1)],
+}
+MIXES = {
+    **STREAMS,
+    "full": [stream for streams in STREAMS.values() for stream in streams],
+}
+
+
+def producer(mix, scale, frame_ring, queue, pushed, duration):
+    streams = MIXES[mix]
+    sent = [0] * len(streams)
+    start = time.perf_counter()
+    next_batch = start
+    while next_batch - start < duration:
+        elapsed = time.perf_counter() - start
+        now = time.time()
+        for s, (make_frames, rate) in enumerate(streams):
+            due = int(elapsed * rate * scale)
+            for i in range(sent[s], due):
+                for frame_id, payload in make_frames(i):
+                    frame_ring.push(now, frame_id, payload)
+                    pushed.value += 1
+            sent[s] = due
+        if int(elapsed) > int(elapsed - PRODUCER_PERIOD):
+            queue.put(["[BENCH] one text line a second, as candump errors are"])
+        next_batch += PRODUCER_PERIOD
+        time.sleep(max(0.0, next_batch - time.perf_counter()))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def make_window(frame_ring, queue, temp_conn):
+    """A CANWindow fed by frame_ring and queue, whose update_status is only run by the benchmark"""
+    from utils import all_objs, heartbeat_modules
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    for obj in all_objs:
+        obj.initialize(timestamp)
+    for mod in heartbeat_modules:
+        mod.init_time(time.time())
+    # Nothing reads the cansend and CAN log queues, so exiting must not wait to flush them
+    unread_queues = [multiprocessing.Queue() for _ in range(3)]
+    for unread_queue in unread_queues:
+        unread_queue.cancel_join_thread()
+    window = gui.CANWindow(queue, temp_conn, *unread_queues, timestamp, frame_ring)
+    window.timer.stop()
+    window.show()
+    return window
+
+
+def count_set_data():
+    """Counts PlotDataItem.setData() calls (line redraws) from now on, in the returned list"""
+    import pyqtgraph as pg
+
+    counter = [0]
+    set_data = pg.PlotDataItem.setData
+
+    def counted_set_data(item, *args, **kwargs):
+        counter[0] += 1
+        return set_data(item, *args, **kwargs)
+
+    pg.PlotDataItem.setData = counted_set_data
+    return counter
+
+
+def run(app, mix, scale, duration):
+    queue = multiprocessing.Queue()
+    frame_ring = FrameRing(frame_ring_capacity)
+    pushed = multiprocessing.Value("q", 0, lock=False)
+    temp_conn, temp_child_conn = multiprocessing.Pipe()  # no RPI temperature updates
+    window = make_window(frame_ring, queue, temp_conn)
+    set_data_calls = count_set_data()
+    proc = multiprocessing.Process(
+        target=producer, args=(mix, scale, frame_ring, queue, pushed, duration)
+    )
+    proc.start()
+
+    tick_times = []
+    backlog = []  # (secs since start, frames waiting at the start of a tick)
+    start = time.perf_counter()
+    next_tick = start
+    while proc.is_alive() or frame_ring.pending():
+        next_tick += gui_update_freq / 1000
+        time.sleep(max(0.0, next_tick - time.perf_counter()))
+        backlog.append((time.perf_counter() - start, frame_ring.pending()))
+        tick_start = time.perf_counter()
+        window.update_status()
+        app.processEvents()  # repaints the plots, as the Qt event loop would
+        tick_times.append(time.perf_counter() - tick_start)
+    elapsed = time.perf_counter() - start
+    proc.join()
+
+    overflows = frame_ring.overflow_count
+    frames = pushed.value - overflows
+    window.closeEvent(None)
+    window.close()
+    frame_ring.close()
+    temp_conn.close()
+    temp_child_conn.close()
+
+    # Backlog growth: frames/s left waiting while the producer ran (~0 if update_status keeps up)
+    running = [(t, pending) for t, pending in backlog if t <= duration]
+    growth = 0.0
+    if len(running) > 1:
+        growth = (running[-1][1] - running[0][1]) / (running[-1][0] - running[0][0])
+    return {
+        "mix": mix,
+        "scale": scale,
+        "frames": frames,
+        "overflows": overflows,
+        "frames_per_s": frames / elapsed,
+        "tick_p50_ms": percentile(tick_times, 50) * 1000,
+        "tick_p99_ms": percentile(tick_times, 99) * 1000,
+        "set_data_per_s": set_data_calls[0] / elapsed,
+        "backlog_growth_per_s": growth,
+        "backlog_max": max((pending for _, pending in backlog), default=0),
+    }
+
+
+def gui_process(results, mix, scale, duration):
+    """Runs one benchmark in a fresh process, as the GUI's data objects only hold one window"""
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv)
+    os.chdir(tempfile.mkdtemp(prefix="bench_update_status_"))  # the window's logs/
+    results.put(run(app, mix, scale, duration))
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as baseline_file:
+        baseline = {
+            (result["mix"], result["scale"]): result
+            for result in json.load(baseline_file)["results"]
+        }
+    print(f"\nChange from {baseline_path}:")
+    for result in results:
+        old = baseline.get((result["mix"], result["scale"]))
+        if old is None:
+            continue
+        changes = [
+            f"{col} {100 * (result[col] - old[col]) / old[col]:+.1f}%"
+            for col in ("frames_per_s", "tick_p50_ms", "tick_p99_ms", "set_data_per_s")
+            if old.get(col)
+        ]
+        print(f"{result['mix']:>10} x{result['scale']:<6g} " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="update_status benchmark")
+    parser.add_argument("--duration", type=float, default=10.0, help="secs per run")
+    parser.add_argument(
+        "--mixes",
+        nargs="+",
+        choices=list(MIXES),
+        default=list(MIXES),
+        help="frame mixes",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        nargs="+",
+        default=[1.0, 10.0],
+        help="frame rate multipliers",
+    )
+    parser.add_argument(
+        "--output",
+        help="results JSON (default: benchmarks/results/update_status_<time>.json)",
+    )
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"update_status_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+
+    multiprocessing.set_start_method("spawn")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    columns = [
+        "mix",
+        "scale",
+        "frames",
+        "overflows",
+        "frames_per_s",
+        "tick_p50_ms",
+        "tick_p99_ms",
+        "set_data_per_s",
+        "backlog_growth_per_s",
+        "backlog_max",
+    ]
+    print(" ".join(f"{col:>14}" for col in columns))
+    results = []
+    for scale in args.scale:
+        for mix in args.mixes:
+            result_queue = multiprocessing.Queue()
+            proc = multiprocessing.Process(
+                target=gui_process, args=(result_queue, mix, scale, args.duration)
+            )
+            proc.start()
+            result = result_queue.get()
+            proc.join()
+            results.append(result)
+            print(
+                " ".join(
+                    f"{result[col]:>14.2f}"
+                    if isinstance(result[col], float)
+                    else f"{result[col]:>14}"
+                    for col in columns
+                )
+            )
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as output_file:
+        json.dump(
+            {
+                "time": datetime.now().isoformat(),
+                "duration": args.duration,
+                "gui_update_freq": gui_update_freq,
+                "results": results,
+            },
+            output_file,
+            indent=2,
+        )
+    print(f"\nResults saved to {output}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from config import can_line
+
+### ----------  CAN Frame Records ---------- ###
+# A received CAN frame is passed around as (timestamp, frame_id, payload)
+# timestamp: seconds since epoch (laptop clock), frame_id: int, payload: bytes (at most CANFD_MAX_DLEN long)
+
+CANFD_MAX_DLEN = 64  # max number of data bytes in a CAN FD frame
+CAN_EFF_FLAG = 0x80000000  # marks extended (29 bit) frame ids, as in SocketCAN
+CAN_SFF_ID_LEN = 3  # number of hex digits candump prints for a standard frame id
+
+
+def split_candump_timestamp(line: str) -> tuple[float | None, str]:
+    """
+    Splits the "(1760000000.123456)" timestamp candump -ta / -L puts before each frame
+    off line; returns (None, line) if there is none
+    """
+    end = line.find(")")
+    if line.startswith("(") and end > 0:
+        try:
+            return float(line[1:end]), line[end + 1 :]
+        except ValueError:
+            pass
+    return None, line
+
+
+def parse_candump_line(line: str) -> tuple[int, bytes] | None:
+    """
+    Parses a line printed by candump (eg. "can0  204  [16]  5E 87 ...") into (frame_id, payload)\n
+    Also accepts candump -L log lines (eg. "can0 204#5E87..."); any timestamp is ignored\n
+    Returns None if the line is not a CAN frame (eg. an error message)
+    """
+    parts = split_candump_timestamp(line)[1].split()
+    if (
+        len(parts) == 2 and "#" in parts[1]
+    ):  # -L format: id#data or id##<flags>data (CAN FD)
+        frame_id_hex, data_hex = parts[1].split("#", 1)
+        if data_hex.startswith("#"):
+            data_hex = data_hex[2:]
+        elif data_hex.startswith("R"):  # remote frame, no data
+            data_hex = ""
+        parts = [parts[0], frame_id_hex, "[]", data_hex]
+    if len(parts) < 3 or parts[0] != can_line or not parts[2].startswith("["):
+        return None
+    try:
+        frame_id = int(parts[1], 16)
+        if len(parts[1]) > CAN_SFF_ID_LEN:
+            frame_id |= CAN_EFF_FLAG
+        payload = bytes.fromhex("".join(parts[3:]))
+    except ValueError:
+        return None
+    if len(payload) > CANFD_MAX_DLEN:
+        return None
+    return frame_id, payload
+
+
+def format_frame_id(frame_id: int) -> str:
+    """Formats frame_id the way candump prints it (eg. 0x4 -> "004")"""
+    if frame_id & CAN_EFF_FLAG:
+        return f"{frame_id & ~CAN_EFF_FLAG:08X}"
+    return f"{frame_id:03X}"
+
+
+def format_candump_line(frame_id: int, payload: bytes) -> str:
+    """Inverse of parse_candump_line(): formats a frame as candump would print it"""
+    data = " ".join(f"{byte:02X}" for byte in payload)
+    return f"{can_line}  {format_frame_id(frame_id)}  [{len(payload):02d}]  {data}".rstrip()
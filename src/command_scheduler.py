@@ -0,0 +1,61 @@
+from config import cansend_coalesced_ids, cansend_urgent_ids
+
+
+class CommandScheduler:
+    """
+    Sits between the GUI controls and the cansend worker's queue\n
+    Commands for a coalesced frame id (eg. rudder 001, trim tab 002) are held and only the
+    latest one per frame id and kind (eg. a rudder angle or a desired heading, both 001) is
+    sent on each flush(), so a fast joystick sweep can't build up a backlog of stale positions.
+    Urgent frame ids (eg. power 202, 003) are sent at once with send_urgent, ahead of any
+    queued commands; every other frame id (eg. PID 200) is sent at once
+    """
+
+    def __init__(
+        self,
+        send,
+        coalesced_ids=cansend_coalesced_ids,
+        urgent_ids=cansend_urgent_ids,
+        send_urgent=None,
+    ):
+        """
+        send is called with each cansend command to send (eg. cmd_queue.put), and
+        send_urgent (send if not given) with each urgent one
+        """
+        self._send = send
+        self._send_urgent = send if send_urgent is None else send_urgent
+        self._coalesced_ids = set(coalesced_ids)
+        self._urgent_ids = set(urgent_ids)
+        self._latest = {}  # (frame_id, kind): (newest command not yet sent, its on_sent)
+        self.coalesced_count = 0  # commands replaced by a newer one before being sent
+
+    def submit(self, frame_id: str, cmd: str, on_sent=None, kind: str = None) -> bool:
+        """
+        Returns True if cmd was sent now, False if it is held until the next flush()\n
+        on_sent is called (without arguments) once cmd is sent; never if a newer command of
+        the same frame id and kind replaces it first
+        """
+        if frame_id not in self._coalesced_ids:
+            if frame_id in self._urgent_ids:
+                self._send_urgent(cmd)
+            else:
+                self._send(cmd)
+            if on_sent is not None:
+                on_sent()
+            return True
+        key = (frame_id, kind)
+        if key in self._latest:
+            self.coalesced_count += 1
+        self._latest[key] = (cmd, on_sent)
+        return False
+
+    def flush(self):
+        """Sends the latest held command for each frame id and kind"""
+        latest, self._latest = self._latest, {}
+        for cmd, on_sent in latest.values():
+            self._send(cmd)
+            if on_sent is not None:
+                on_sent()
+
+    def pending(self) -> int:
+        return len(self._latest)
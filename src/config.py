@@ -3,6 +3,19 @@ import yaml
 # ==== General Setup ====
 can_line = "can0"
 
+# ==== candump Ingest ====
+candump_recv_size = 4096  # max bytes read from the candump SSH channel at once
+candump_batch_max_frames = 256  # lines sent to the GUI per queue put (at most)
+candump_batch_max_delay = 0.005  # max secs a received line waits before it is sent
+frame_ring_capacity = 65536  # max number of received CAN frames waiting for the GUI
+batch_decoded_ids = (0x204,)  # high-rate frames decoded a GUI tick at a time
+clock_offset_window = 30.0  # secs of Pi->laptop clock offset samples kept
+synthetic_frame_rate = 200  # frames/s made by --source synthetic
+replay_status_period = 1.0  # secs between replay position and frames/s updates
+replay_max_speed_fill = 0.5  # fraction of frame ring a max speed replay fills
+replay_speed_options = ["1x", "2x", "10x", "60x", "Max"]  # replay speed dropdown
+dbc_cache_dir = ".dbc_cache"  # parsed --dbc files, keyed by file hash
+
 # SSH Credentials
 
 hostname = None
@@ -32,8 +45,28 @@ def get_SSH_credentials() -> tuple[str, str, str]:
 window_height = 450
 window_width = 1350
 
-# update_freq = 100 # frequency at which CAN messages are collected & processed - TODO: implement separation of CAN msg processing and gui updating
-gui_update_freq = 50  # frequency of UI update in millis
+gui_update_freq = 50  # frequency of UI update (CAN frame processing) in millis
+render_max_fps = 10  # max redraws per second of graph lines with new points
+session_flush_freq = 1000  # millis between writes of new points to the session store
+
+# ==== CAN Send ====
+# only the latest command of each kind for these frame ids (rudder, trim tab) is sent
+cansend_coalesced_ids = ("001", "002")
+cansend_urgent_ids = ("202", "003")  # power frames, sent ahead of any queued commands
+cansend_flush_freq = 50  # millis between sends of the latest coalesced commands
+
+# ==== Logging ====
+values_log_format = "wide"  # a row of every value per frame, or "sparse": only changes
+values_log_keyframe_interval = 60.0  # secs between snapshots of all values (sparse)
+values_log_buffer_rows = 50000  # max values log rows waiting to be written
+values_log_flush_rows = 1000  # rows waiting that trigger a write of the values log
+values_log_flush_interval = 1.0  # max secs between writes of the values log
+values_log_fsync_interval = 10.0  # secs between fsyncs of the values log
+can_log_batch_size = 1000  # max CAN log messages written per wake-up
+can_log_flush_interval = 1.0  # secs between CAN log flushes (and stats updates)
+log_compression = "none"  # of the csv logs: "none", "gzip" or "zstd" (needs zstandard)
+log_rotate_bytes = 0  # new log segment at this size on disk (eg. 2**26); 0: never
+log_rotate_secs = 0  # secs per log segment (eg. 3600.0); 0: no time limit
 
 # ==== Live Values ====
 value_label_min_width = 300
@@ -95,7 +128,34 @@ graph_y = "Time"
 graph_y_units = "s"
 graph_min_width = 250
 graph_min_height = 300
-scroll_window = 60  # in seconds
+scroll_window = (
+    60  # in seconds (initially; changed with the scroll_window_options dropdown)
+)
+scroll_window_options = {  # graph time spans
+    "1 min": 60,
+    "10 min": 600,
+    "1 h": 3600,
+    "6 h": 6 * 3600,
+    "1 day": 24 * 3600,
+}
+rollup_tiers = (  # (bucket secs, buckets kept) of each signal's min/max/mean history
+    (1, 1800),  # 30 min
+    (10, 2160),  # 6 h
+    (60, 2880),  # 2 days
+)
+decimate_points_per_pixel = 2  # lines with more points are drawn as min/max per bucket
+signal_memory_budget = 2**20  # max bytes per signal: points, rollups, decimation
+session_index_stride = 4096  # session store points per sparse time index entry
+dbc_line_colours = [
+    "r",
+    "b",
+    "g",
+    "m",
+    "c",
+    "orange",
+    "purple",
+    "brown",
+]  # --dbc graphs
 
 manual_input_obj_update_interval = 1  # Amount of time before graph is updated with current value for manually inputted values
 
@@ -1,14 +1,17 @@
-import csv
 import math
-import os
+import sys
 from enum import Enum, auto
 
+import numpy as np
 import pyqtgraph as pg
 from PyQt5 import QtCore
 from PyQt5.QtWidgets import QLabel
 
 # import project.config as cg
 import config as cg
+from decimation import MinMaxDecimator, bucket_width, min_max_points
+from ring_series import RingSeries
+from rollup import Rollups
 
 graph_margin = 0.2
 MAX_ANGLE_JUMP = 180
@@ -195,6 +198,11 @@ class GraphObject:  # struct which keeps together objects needed for a graph
 
 
 class DataObject:
+    rollup_data = (
+        True  # False if a subclass draws (and records) other values than self.data
+    )
+    stored_series = 1  # RingSeries of points kept (sharing the memory budget)
+
     def __init__(
         self,
         name,
@@ -218,9 +226,17 @@ class DataObject:
         self.graph_obj = graph  # if not graphed, doesn't need a graph
         # if (line_colour is None and graph is not None):
         #     raise ValueError("DataObject __init__: Given a graph, but not a line colour")
-        self.data = {}  # no data when initialized: of form time:value
-        self.current = None  # key of most recent data entry datapoint
+        self.current = None  # time of most recent data entry datapoint
         self.line = None
+        self.dirty = False  # True if the line needs redrawing (see RenderScheduler)
+        self.decimator = None  # MinMaxDecimator while there are too many points to draw
+        # min/max/mean of the drawn values over the session, for time spans past self.data
+        self.rollups = Rollups() if graph is not None else None
+        self.data = RingSeries.for_budget(
+            self._series_budget(cg.signal_memory_budget)
+        )  # empty when made
+        # SignalStore of the drawn values on disk, for scrolling back past self.data
+        self.store = None
         self.has_label = has_label
         self.symbol_brush = symbol_brush
         return
@@ -255,48 +271,138 @@ class DataObject:
         Return a tuple with the time:value of the most current data point collected
         """
         val = None
-        if self.current and self.data.get(self.current) is not None:
-            val = round(self.data.get(self.current), self.dp)
+        if self.current and len(self.data):
+            val = self.reported_value(self.data.last()[1])
         return (
             self.current,
             val,
         )  # returns the time, value of most recently logged datapoint
 
+    def reported_value(self, value: float):
+        """
+        A stored value as get_current() reports it: rounded to self.dp (an int if dp is None),
+        or None if it is missing (stored as nan)
+        """
+        return None if math.isnan(value) else round(value, self.dp)
+
     def add_datapoint(self, x, y):
         """
         add a datapoint to self.data
         """
-        self.data[x] = y
-        self.current = x
-        if self.graph_obj and self.graph_obj.graph.isVisible():
-            self.update_line_data()
+        value = math.nan if y is None else y
+        self._append_point(self.data, x, value)
+        if self.rollup_data:
+            self._add_line_point(x, value)
+        if self.current is None or x > self.current:
+            self.current = x
+        self.dirty = True
         return
 
-    def remove_datapoint(self, x):
-        try:
-            del self.data[x]
-        except KeyError:
-            print(
-                "ERR - trying to apply remove_datapoint() on a point which does not exist"
-            )
+    def add_datapoints(self, xs: list, ys: list):
+        """
+        add_datapoint() for many points at once (in time order)
+        """
+        if not len(xs):
+            return
+        self._append_points(self.data, xs, ys)
+        if self.rollup_data:
+            self._add_line_points(xs, ys)
+        if self.current is None or xs[-1] > self.current:
+            self.current = xs[-1]
+        self.dirty = True
+
+    def _append_point(self, series: RingSeries, x, y):
+        """
+        Appends a point to series, or inserts it in time order if it is older than the newest
+        point (eg. frames of different ids taking different routes), so series stays sorted
+        and only the decimated buckets from its time on are redone
+        """
+        last = series.last()[0]
+        if last is None or x >= last:
+            series.append(x, y)
+            return
+        series.insert(x, y)
+        if self.decimator is not None:
+            self.decimator.invalidate(x)
+
+    def _append_points(self, series: RingSeries, xs, ys):
+        """_append_point() for many points at once (in time order)"""
+        last = series.last()[0]
+        if last is None or xs[0] >= last:
+            series.extend(xs, ys)
+            return
+        for x, y in zip(xs, ys):
+            self._append_point(series, x, math.nan if y is None else y)
+
+    def _add_line_point(self, x, y):
+        """Records a drawn point in the rollups and session store (if any)"""
+        if self.rollups is not None:
+            self.rollups.add(x, y)
+        if self.store is not None:
+            self.store.append(x, y)
+
+    def _add_line_points(self, xs, ys):
+        """_add_line_point() for many points at once (in time order)"""
+        if self.rollups is not None:
+            self.rollups.extend(xs, ys)
+        if self.store is not None:
+            self.store.extend(xs, ys)
 
     def update_line_data(self):
         if self.line is not None:
-            values = []
-            for key in self.data.keys():
-                values.append(self.data[key])
-            self.line.setData(list(self.data.keys()), values)
+            self.line.setData(*self._line_points(self.data))
         return
 
-    def parse_frame(self, current_time, data_line, parsed_dict=None):
-        """NOTE: current_time becomes the key of the data dict (and x_data on the graph)"""
+    def _line_points(self, series: RingSeries) -> tuple:
+        """
+        (times, values) of series to draw: views of all its points, or if there are more than
+        cg.decimate_points_per_pixel per pixel of the graph's width, the min and max point of
+        each bucket (so the graph's time span can be long without slowing redraws)
+        """
+        graph = self.graph_obj.graph
+        pixels = graph.width()
+        start, end = graph.viewRange()[0]
+        if len(series) <= cg.decimate_points_per_pixel * pixels:
+            self.decimator = None
+            times, values = series.times, series.values  # views, not copies
+        else:
+            width = bucket_width(end - start, pixels)
+            if self.decimator is None or self.decimator.width != width:
+                self.decimator = MinMaxDecimator(width, 4 * pixels + 4)
+            times, values = self.decimator.update(series.times, series.values, start)
+
+        # Older points than these are read back from the session store while the view is
+        # zoomed in finer than the rollups, else drawn from the rollup tier that fits the span
+        first = times[0] if len(times) else math.inf
+        if self.rollups is None or first - start <= self.rollups.tiers[0].width:
+            return times, values
+        if (
+            self.store is not None
+            and end - start < self.rollups.tiers[0].width * pixels
+        ):
+            older_times, older_values = self.store.read(start, min(first, end))
+            if len(older_times) > cg.decimate_points_per_pixel * pixels:
+                older_times, older_values = min_max_points(
+                    older_times, older_values, bucket_width(end - start, pixels)
+                )
+        else:
+            tier = self.rollups.tier_for(start, end, pixels)
+            older_times, older_values = tier.points(start, first)
+        return np.concatenate((older_times, times)), np.concatenate(
+            (older_values, values)
+        )
+
+    def parse_frame(self, current_time, payload, parsed_dict=None):
+        """
+        NOTE: current_time becomes the key of the data dict (and x_data on the graph)\n
+        payload is the frame's data bytes, as decoded by candump_process
+        """
         # calls the specific parsing_fn that belongs to this object
         # calls add_datapoint to add data
         if parsed_dict is not None:  # for can frames which contain multiple data values
             data = round(parsed_dict[self.name], self.dp)
         else:  # for can frames which hold only a single value
-            raw_data = data_line.split("]")[-1].strip().split()
-            data = self.parsing_fn("".join(raw_data))
+            data = self.parsing_fn(payload)
             if (
                 self.dp is not None
             ):  # for values which do not have variable dp (ie. not salinity)
@@ -305,6 +411,16 @@ class DataObject:
         self.add_datapoint(current_time, data)
         return
 
+    def parse_frames(self, frame_times: list, columns: dict):
+        """
+        parse_frame() for a batch of frames of one id\n
+        columns is the frames' FrameSpec.decode_batch(): {name: array of values, one per frame}
+        """
+        values = columns[self.name]
+        if self.dp is not None:
+            values = np.round(values, self.dp)
+        self.add_datapoints(frame_times, values)
+
     # if there is a graph associated with this object and there are some data points outside of the graph window,
     # remove those points
     def update_data(self, current_time, scroll_window):
@@ -312,15 +428,46 @@ class DataObject:
         if there is a graph associated with this object and there are some data points outside of the graph window,
         remove those points
         """
-        keys = list(self.data.keys())
-        for key in keys:
-            if key < (
-                current_time - scroll_window - 5
-            ):  # if value is outside graph plus some margin of time
-                del self.data[key]
-        self.update_line_data()
+        if self.data.trim(
+            current_time - scroll_window - 5
+        ):  # if value is outside graph plus some margin of time
+            self.dirty = True
         return
 
+    def memory_usage(self) -> int:
+        """Bytes held by this object's stored points"""
+        return self.data.nbytes + self._line_nbytes()
+
+    def _line_nbytes(self) -> int:
+        """Bytes held for drawing the line: its decimator and rollups"""
+        return (0 if self.decimator is None else self.decimator.nbytes) + (
+            0 if self.rollups is None else self.rollups.nbytes
+        )
+
+    def _series(self) -> list:
+        """The RingSeries of points kept (stored_series of them)"""
+        return [self.data]
+
+    def _series_budget(self, budget: int) -> int:
+        """
+        Bytes of budget each RingSeries of points may hold: what the rollups (at their full
+        size) and the decimator leave, shared between the stored_series
+        """
+        line_nbytes = (0 if self.decimator is None else self.decimator.nbytes) + (
+            0 if self.rollups is None else self.rollups.max_nbytes
+        )
+        return (budget - line_nbytes) // self.stored_series
+
+    def enforce_budget(self, budget: int):
+        """
+        Shrinks the RingSeries of points (dropping their oldest) to _series_budget(), so
+        memory_usage() is at most budget bytes, eg. once a wide graph's decimator is made
+        """
+        capacity = RingSeries.capacity_for(self._series_budget(budget))
+        for series in self._series():
+            if series.capacity > capacity:
+                series.resize(capacity)
+
     def update_label(self):
         if self.label is not None:
             self.label.setText(f"{self.name}: {self.get_current()[1]} {self.units}")
@@ -335,6 +482,9 @@ class DataObject:
 # A custom DataObject class for creating a graph object with a custom AxisItem (for y-axis)
 # and calculating wrapping for IMU for smoother graph experiences
 class IMUHeadingObject(DataObject):
+    rollup_data = False  # graph_data is drawn (and rolled up) instead
+    stored_series = 2  # self.data and self.graph_data
+
     def __init__(
         self,
         name,
@@ -359,7 +509,9 @@ class IMUHeadingObject(DataObject):
         # Tracks how many full rotations the boat has made since initialization for smooth graph readings
         # positive numbers are positive rotations (358->359->0->1), negative is the other way (1->0->359->358)
         self.current_rotations = 0
-        self.graph_data = {}  # Data used for graphing only (not logging), contains data in self.data plus offset based on the number of rotations at the time
+        self.graph_data = RingSeries.for_budget(
+            self._series_budget(cg.signal_memory_budget)
+        )  # Data used for graphing only (not logging), contains data in self.data plus offset based on the number of rotations at the time
 
         return
 
@@ -397,18 +549,49 @@ class IMUHeadingObject(DataObject):
         """
         self.update_current_rotations(self.get_current()[1], y)
         # print("current_rotations = ", self.current_rotations)
-        self.graph_data[x] = y + (self.current_rotations * 360)
+        self.add_graph_datapoint(x, y + (self.current_rotations * 360))
         super().add_datapoint(x, y)
         # print("graph_data = ", self.graph_data)
         # print("self.line data = ", self.line.getData())
 
+    def add_datapoints(self, xs: list, ys: list):
+        """
+        add_datapoint() for many points at once, counting rotations over the whole batch
+        """
+        if not len(xs):
+            return
+        angles = np.asarray(ys, dtype=float)
+        previous = self.get_current()[1]
+        jumps = np.diff(angles, prepend=angles[0] if previous is None else previous)
+        rotations = self.current_rotations + np.cumsum(
+            (jumps <= -MAX_ANGLE_JUMP).astype(int) - (jumps >= MAX_ANGLE_JUMP)
+        )
+        self.current_rotations = int(rotations[-1])
+        self.add_graph_datapoints(xs, angles + rotations * 360)
+        super().add_datapoints(xs, ys)
+
+    def add_graph_datapoint(self, x, y):
+        self._append_point(self.graph_data, x, y)
+        self._add_line_point(x, y)
+
+    def add_graph_datapoints(self, xs, ys: np.ndarray):
+        self._append_points(self.graph_data, xs, ys)
+        self._add_line_points(xs, ys)
+
+    def update_data(self, current_time, scroll_window):
+        self.graph_data.trim(current_time - scroll_window - 5)
+        super().update_data(current_time, scroll_window)
+
+    def memory_usage(self) -> int:
+        return self.data.nbytes + self.graph_data.nbytes + self._line_nbytes()
+
+    def _series(self) -> list:
+        return [self.data, self.graph_data]
+
     def update_line_data(self) -> None:
         if self.line is not None:
             # if graph_data is None: graph_data = self.data
-            values = []
-            for key in self.graph_data.keys():
-                values.append(self.graph_data[key])
-            self.line.setData(list(self.graph_data.keys()), values)
+            self.line.setData(*self._line_points(self.graph_data))
         return
 
 
@@ -500,9 +683,21 @@ class DesiredHeadingObject(ContinuousUpdateMixin, IMUHeadingObject):
         """
         self.set_last_updated_time(x)
         self.current_rotations = self.imu_heading_ref_obj.current_rotations
-        self.graph_data[x] = y + (self.current_rotations * 360)
+        self.add_graph_datapoint(
+            x, math.nan if y is None else y + (self.current_rotations * 360)
+        )
         DataObject.add_datapoint(self, x, y)
 
+    def add_datapoints(self, xs: list, ys: list):
+        if not len(xs):
+            return
+        self.set_last_updated_time(xs[-1])
+        self.current_rotations = self.imu_heading_ref_obj.current_rotations
+        self.add_graph_datapoints(
+            xs, np.asarray(ys, dtype=float) + self.current_rotations * 360
+        )
+        DataObject.add_datapoints(self, xs, ys)
+
 
 # Class for object holding heading data for PID tuning - needs custom functionality for adding heading arrows to its graph
 class PIDObject(DataObject):
@@ -535,6 +730,8 @@ class PIDObject(DataObject):
             graph=graph,
         )
 
+        self.data = {}  # of form time: {x, y, arrows} (a dict, as points are removed by age or key)
+
         # Name for x data and y_data (for getting it out of the dict)
         self.x_name = x_name
         self.y_name = y_name
@@ -639,12 +836,9 @@ class PIDObject(DataObject):
             self.graph_obj.graph.addItem(actualHeadingArrow)
             # print("actualHeadingArrow added to graph")
 
-        super().add_datapoint(x, y)
-        # NOTE: below is stuff done in super().add_datapoint(x, y)
-        # self.data[x] = y
-        # self.current = x
-        # if (self.graph_obj and self.graph_obj.graph.isVisible()):
-        #     self.update_line_data()
+        self.data[x] = y
+        self.current = x
+        self.dirty = True
         return
 
     def get_current(self):
@@ -671,8 +865,6 @@ class PIDObject(DataObject):
                 points_to_delete.append(time_logged)
         for key in points_to_delete:
             self.remove_datapoint(key)
-        if self.graph_obj and self.graph_obj.graph.isVisible():
-            self.update_line_data()
         return
 
     def update_line_data(self):
@@ -697,11 +889,26 @@ class PIDObject(DataObject):
                 )
 
             del self.data[x]
+            self.dirty = True
         except KeyError:
             print(
                 "ERR - trying to apply remove_datapoint() on a point which does not exist"
             )
 
+    def memory_usage(self) -> int:
+        # Estimate: the dict and its points' dicts (which all have the same keys), not the
+        # floats and arrows they hold
+        return sys.getsizeof(self.data) + len(self.data) * self._point_size()
+
+    def _point_size(self) -> int:
+        return sys.getsizeof(next(iter(self.data.values()))) if self.data else 0
+
+    def enforce_budget(self, budget: int):
+        usage = self.memory_usage()
+        while usage > budget and self.data:
+            usage -= self._point_size()
+            self.remove_datapoint(next(iter(self.data)))  # oldest (added in time order)
+
     def clear(self):
         """
         Removes all datapoints from memory, clears initial gps "fix", clears the graph
@@ -755,12 +962,11 @@ class AISObject(DataObject):
         self.dataset_list = []  # a list of dictionaries, where each dictionary contains all data for one frame
         self.dataset = {}  # same as above but is a dictionary containing a bunch of frames instead, of the form MSID: dictionary
         self.log_value_headers = log_value_headers
+        self.data = {}  # ship positions of form longitude: latitude (replaced by key in add_frame)
+        self.ais_log = None  # ValuesLogWriter of the AIS values log, set by the window
 
     def initialize(self, timestamp=None):
         super().initialize()
-        if timestamp is None:
-            print("ERROR: AISObject.initialize received null timestamp")
-        self.init_logging(timestamp)
         # self.polaris_line = self.add_line("POLARIS", [], [], None, None, False, symbol_brush = self.polaris_brush, symbol = 'x')
         self.polaris_line = generic_create_line(
             self.graph_obj,
@@ -795,6 +1001,35 @@ class AISObject(DataObject):
     # def add_line(self, name, x_data, y_data, colour, line_width, line_dashed, symbol_brush = None, symbol = None):
     #     return create_line(self.graph_obj, name, x_data, y_data, colour, line_width, line_dashed, symbol_brush, symbol)
 
+    def add_datapoint(self, x, y):
+        self.data[x] = y
+        self.current = x
+        self.dirty = True
+
+    def remove_datapoint(self, x):
+        try:
+            del self.data[x]
+            self.dirty = True
+        except KeyError:
+            print(
+                "ERR - trying to apply remove_datapoint() on a point which does not exist"
+            )
+
+    def update_line_data(self):
+        if self.line is not None:
+            self.line.setData(list(self.data.keys()), list(self.data.values()))
+
+    def memory_usage(self) -> int:
+        # Bounded by the ships in range (removed after cg.data_timeout), so no budget is enforced
+        return (
+            sys.getsizeof(self.data)
+            + sys.getsizeof(self.dataset)
+            + sum(sys.getsizeof(frame) for frame in self.dataset.values())
+        )
+
+    def enforce_budget(self, budget: int):
+        return  # bounded by the ships in range (see memory_usage())
+
     def clear_data(self):
         self.data.clear()
 
@@ -821,51 +1056,25 @@ class AISObject(DataObject):
         for key in points_to_delete:
             self.remove_datapoint(self.dataset[key][AIS_Attributes.LONGITUDE])
             del self.dataset[key]
-        if self.graph_obj and self.graph_obj.graph.isVisible():
-            self.update_line_data()
-
-    def init_logging(self, timestamp):
-        """Initialize CSV logging files with timestamped names"""
-        # Create logs directory if it doesn't exist
-        if not os.path.exists("logs"):
-            os.makedirs("logs")
-
-        # Create timestamped filename
-        # AIS log file (log file only for AIS values)
-        self.ais_log_file = os.path.join("logs", f"ais_values_{timestamp}.csv")
-
-        # Header names
-        values_header = ["Timestamp", "Elapsed_Time_s"] + self.log_value_headers
-
-        # Write headers to file
-        with open(self.ais_log_file, "w", newline="") as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerow(values_header)
-            csv_file.flush()
-
-        print(f"AIS logging initialized: {self.ais_log_file}")
-
-    def log_data(self, timestamp, elapsed_time):
-        """log AIS data from current batch into csv file"""
-        if not self.dataset:
-            return  # No data in dataset
+
+    def log_data(self, timestamp):
+        """log AIS data from current batch, as of timestamp (secs since epoch)"""
+        if not self.dataset or self.ais_log is None:
+            return  # No data in dataset, or not logging
         try:
-            with open(self.ais_log_file, "a", newline="") as csv_file:
-                writer = csv.writer(csv_file)
-                for frame in self.dataset.values():  # for each frame in the dataset
-                    # print("frame = ", frame)
-                    values = [timestamp, elapsed_time]
-                    for key in ais_attributes:  # get the keys in data
-                        if frame[key] is None:
-                            values.append("None")
-                        else:
-                            values.append(frame[key])
-                    writer.writerow(values)
-                csv_file.flush()  # Flush immediately to prevent data loss
+            self.ais_log.submit_rows(
+                [
+                    [timestamp, *(frame[key] for key in ais_attributes)]
+                    for frame in self.dataset.values()  # for each frame in the dataset
+                ]
+            )
         except Exception as e:
             print(f"Error logging AIS values: {e}")
 
-        return
+    def close_logging(self):
+        if self.ais_log is not None:
+            self.ais_log.close()
+            self.ais_log = None
 
     def update_polaris_pos(self, lon, lat):
         if lon is None or lat is None:
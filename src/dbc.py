@@ -0,0 +1,199 @@
+import hashlib
+import json
+import math
+import os
+import re
+
+from can_frame import format_frame_id
+from config import dbc_cache_dir
+from frame_signals import FrameSpec, Signal
+
+DBC_CACHE_VERSION = (
+    1  # bump when the parsed format changes, so old cache files are ignored
+)
+INDEPENDENT_SIGNALS_ID = 0xC0000000  # pseudo message holding signals not in any frame
+
+_MESSAGE = re.compile(r"^BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)")
+_SIGNAL = re.compile(
+    r"^SG_\s+(\w+)\s*(\w*)\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*"
+    r"\(([^,]+),([^)]+)\)\s*\[([^|]+)\|([^\]]+)\]\s*\"([^\"]*)\""
+)
+_VALUE_TYPE = re.compile(r"^SIG_VALTYPE_\s+(\d+)\s+(\w+)\s*:?\s*(\d)")
+
+
+def parse_dbc(text: str) -> list[dict]:
+    """
+    Parses the frames (BO_) and signals (SG_) of a .dbc CAN database into a list of
+    {"frame_id", "name", "length", "signals"} messages; everything else in the file is ignored\n
+    Each signal is a dict of its name, start bit, size in bits, byte order, sign, factor,
+    offset, [min|max], unit, multiplexer indicator and whether it is a float (SIG_VALTYPE_)
+    """
+    messages = {}
+    message = None
+    for line in text.splitlines():
+        line = line.strip()
+        if match := _MESSAGE.match(line):
+            frame_id, name, length = match.groups()
+            message = {
+                "frame_id": int(frame_id),
+                "name": name,
+                "length": int(length),
+                "signals": [],
+            }
+            messages[message["frame_id"]] = message
+        elif (match := _SIGNAL.match(line)) and message is not None:
+            name, mux, start, size, order, sign, factor, offset, minn, maxn, unit = (
+                match.groups()
+            )
+            message["signals"].append(
+                {
+                    "name": name,
+                    "start": int(start),
+                    "size": int(size),
+                    "little_endian": order == "1",
+                    "signed": sign == "-",
+                    "factor": float(factor),
+                    "offset": float(offset),
+                    "minn": float(minn),
+                    "maxn": float(maxn),
+                    "unit": unit,
+                    "multiplexer": mux or None,
+                    "float": False,
+                }
+            )
+        elif match := _VALUE_TYPE.match(line):
+            frame_id, name, value_type = match.groups()
+            for signal in messages.get(int(frame_id), {"signals": []})["signals"]:
+                if signal["name"] == name:
+                    signal["float"] = value_type != "0"
+        elif not line.startswith("SG_"):
+            message = None
+
+    # Extended (29 bit) frame ids have bit 31 set, as can_frame's frame ids (CAN_EFF_FLAG) do
+    return [
+        message
+        for message in messages.values()
+        if message["frame_id"] != INDEPENDENT_SIGNALS_ID
+    ]
+
+
+def load_dbc(path: str, cache_dir: str = dbc_cache_dir) -> list[dict]:
+    """
+    parse_dbc() of the file at path, cached in cache_dir as JSON keyed by the file's SHA-256,
+    so an unchanged file is only parsed once
+    """
+    with open(path, "rb") as dbc_file:
+        data = dbc_file.read()
+    digest = hashlib.sha256(f"v{DBC_CACHE_VERSION}:".encode() + data).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{digest}.json")
+    try:
+        with open(cache_path) as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = data.decode("cp1252")  # what most DBC editors save as
+    messages = parse_dbc(text)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path + ".tmp", "w") as cache_file:
+            json.dump(messages, cache_file)
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError as e:
+        print(f"Warning: could not cache {path}: {e}")
+    return messages
+
+
+def signal_dp(factor: float) -> int:
+    """Decimal places a value scaled by factor needs (eg. 2 for 0.01)"""
+    return max(0, math.ceil(-math.log10(abs(factor)) - 1e-9)) if factor else 0
+
+
+def dbc_frame_spec(message: dict) -> FrameSpec:
+    """
+    Compiles a parse_dbc() message to a FrameSpec\n
+    Signals that share bytes are unpacked as one int (of 1, 2, 4 or 8 bytes) and picked out
+    with a shift and mask. Raises ValueError for what FrameSpec can't decode: big endian
+    (Motorola), float or multiplexed signals, and bit fields spanning more than 8 bytes.
+    Signals with a factor of 0 (every value would be the offset) are left out, with a warning
+    """
+    frame = f"{message['name']} ({format_frame_id(message['frame_id'])})"
+    for signal in message["signals"]:
+        if not signal["factor"]:
+            print(
+                f"Warning: {frame}: signal {signal['name']} not decoded - factor of 0"
+            )
+        elif not signal["little_endian"]:
+            raise ValueError(f"{frame}: big endian signal {signal['name']}")
+        if signal["float"]:
+            raise ValueError(f"{frame}: float signal {signal['name']}")
+        if signal["multiplexer"]:
+            raise ValueError(f"{frame}: multiplexed signal {signal['name']}")
+
+    # Group signals whose ints would overlap; each group is unpacked as one int
+    length = message["length"]
+    groups = []  # [first byte, end byte, signals]
+    decoded = [signal for signal in message["signals"] if signal["factor"]]
+    for signal in sorted(decoded, key=lambda signal: signal["start"]):
+        first = signal["start"] // 8
+        end = (signal["start"] + signal["size"] + 7) // 8
+        if groups and first < sum(_int_span(frame, *groups[-1][:2], length)):
+            groups[-1][1] = max(groups[-1][1], end)
+            groups[-1][2].append(signal)
+        else:
+            groups.append([first, end, [signal]])
+    # The last int may have been moved back to fit in the frame, onto the one before it
+    while len(groups) > 1 and _int_span(frame, *groups[-1][:2], length)[0] < sum(
+        _int_span(frame, *groups[-2][:2], length)
+    ):
+        first, end, group = groups.pop()
+        groups[-1][1] = max(groups[-1][1], end)
+        groups[-1][2] += group
+
+    signals = []
+    for first, end, group in groups:
+        start, size = _int_span(frame, first, end, length)
+        for signal in group:
+            signals.append(_dbc_signal(signal, start, size))
+    # CAN FD pads payloads up to its next valid length (eg. 25 bytes are sent as 32)
+    return FrameSpec(message["frame_id"], message["length"], signals, padded=True)
+
+
+def _int_span(frame: str, first: int, end: int, length: int) -> tuple[int, int]:
+    """(start, size) of the smallest int holding bytes [first, end) inside a length byte frame"""
+    size = next((size for size in (1, 2, 4, 8) if size >= end - first), None)
+    if size is None:
+        raise ValueError(f"{frame}: bit fields spanning {end - first} bytes")
+    start = min(first, length - size)
+    if start < 0:
+        raise ValueError(f"{frame}: {length} bytes is not an int size")
+    return start, size
+
+
+def _dbc_signal(signal: dict, start: int, size: int) -> Signal:
+    # DBC values are raw * factor + offset; a Signal's are raw / scale - offset
+    scale = 1 / signal["factor"]
+    if abs(scale - round(scale)) < 1e-9:
+        scale = round(scale)  # so eg. a factor of 0.001 divides by exactly 1000
+    minn, maxn = signal["minn"], signal["maxn"]
+    if minn == maxn == 0:  # DBC editors write [0|0] for no range
+        minn = maxn = None
+
+    shift = signal["start"] - 8 * start
+    whole = shift == 0 and signal["size"] == 8 * size
+    return Signal(
+        signal["name"],
+        start,
+        size,
+        scale,
+        -signal["offset"],
+        signal["signed"],
+        mask=None if whole else (1 << signal["size"]) - 1,
+        shift=shift,
+        minn=minn,
+        maxn=maxn,
+    )
@@ -0,0 +1,86 @@
+import math
+
+import numpy as np
+
+from ring_series import RingSeries
+
+
+def bucket_width(span: float, pixels: int) -> float:
+    """
+    Width (secs) of the min/max buckets for span secs drawn across pixels: the power of two
+    giving at most one bucket per pixel, so small changes (eg. a resize) keep the same buckets
+    """
+    return 2.0 ** math.ceil(math.log2(span / max(pixels, 1)))
+
+
+def min_max_points(times: np.ndarray, values: np.ndarray, width: float) -> tuple:
+    """
+    The points of the lowest and highest value in each width secs bucket (aligned to multiples
+    of width), in time order, so spikes survive any amount of reduction
+    """
+    if not len(times):
+        return times, values
+    buckets = np.floor(times / width)
+    order = np.lexsort((values, buckets))  # by bucket, then value (nan last)
+    starts = np.flatnonzero(np.r_[True, buckets[order][1:] != buckets[order][:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    low, high = order[starts], order[ends]
+    points = np.column_stack((np.minimum(low, high), np.maximum(low, high))).ravel()
+    points = points[np.r_[True, points[1:] != points[:-1]]]  # one point buckets
+    return times[points], values[points]
+
+
+class MinMaxDecimator:
+    """
+    Reduces a line's points to the min and max of each bucket_width() bucket, incrementally:
+    buckets are aligned to multiples of their width, so they don't move as the view scrolls.
+    Completed buckets are reduced once and kept (up to capacity points, even after their raw
+    points are trimmed); each update() only reduces the new points and the still-filling bucket.
+    A point added to a completed bucket late must be reported with invalidate()
+    """
+
+    def __init__(self, width: float, capacity: int):
+        self.width = width
+        self._done = RingSeries(capacity)  # min/max points of completed buckets
+        self._done_until = -math.inf  # start of the first bucket not in self._done
+
+    @property
+    def nbytes(self) -> int:
+        return self._done.nbytes
+
+    def update(self, times: np.ndarray, values: np.ndarray, start: float) -> tuple:
+        """
+        (times, values) to draw for the raw points given (in time order), dropping buckets
+        that end before start (the left edge of the view)
+        """
+        if len(times) and times[-1] < self._done_until:  # the points were replaced
+            self.invalidate(times[0])
+        new = int(np.searchsorted(times, self._done_until))
+        times, values = times[new:], values[new:]
+        if len(times):
+            # Points before the newest point's bucket are in completed buckets
+            filling_start = math.floor(times[-1] / self.width) * self.width
+            done = int(np.searchsorted(times, filling_start))
+            if done:
+                self._done.extend(
+                    *min_max_points(times[:done], values[:done], self.width)
+                )
+                self._done_until = filling_start
+                times, values = times[done:], values[done:]
+        self._done.trim(math.floor(start / self.width) * self.width)
+
+        filling_times, filling_values = min_max_points(times, values, self.width)
+        return (
+            np.concatenate((self._done.times, filling_times)),
+            np.concatenate((self._done.values, filling_values)),
+        )
+
+    def invalidate(self, time: float):
+        """
+        Forgets the completed buckets from the one time is in onwards (reduced again from the
+        raw points on the next update()), eg. after a late point was added at time
+        """
+        start = math.floor(time / self.width) * self.width
+        if start < self._done_until:
+            self._done.drop_from(start)
+            self._done_until = start
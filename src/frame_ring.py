@@ -0,0 +1,129 @@
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from can_frame import CANFD_MAX_DLEN
+
+# One fixed-size record per CAN frame
+FRAME_DTYPE = np.dtype(
+    [
+        ("timestamp", "<f8"),  # seconds since epoch
+        ("frame_id", "<u4"),
+        ("dlc", "u1"),  # number of valid bytes in payload
+        ("payload", "u1", (CANFD_MAX_DLEN,)),
+    ],
+    align=True,
+)
+
+# Header slots (uint64) at the start of the shared memory block
+_WRITE_IDX = 0  # total frames written (producer only)
+_READ_IDX = 1  # total frames read (consumer only)
+_OVERFLOWS = 2  # frames dropped because the ring was full (producer only)
+_HEADER_SLOTS = 8  # keeps the records 64 byte aligned
+_HEADER_SIZE = _HEADER_SLOTS * 8
+
+
+class FrameRing:
+    """
+    Single producer, single consumer ring of CAN frame records in shared memory\n
+    The producer (candump_process) pushes frames as they arrive; the consumer (GUI)
+    takes everything new with one read() per tick. When the ring is full new frames
+    are dropped (and counted) rather than overwriting frames the consumer has not read\n
+    Each index is only ever written by one side, so no lock is needed
+    """
+
+    def __init__(self, capacity: int, name: str = None):
+        """Creates a new ring if name is None, otherwise attaches to the existing ring called name"""
+        if capacity <= 0:
+            raise ValueError("FrameRing capacity must be positive")
+        self.capacity = capacity
+        self._owner = name is None
+        size = _HEADER_SIZE + capacity * FRAME_DTYPE.itemsize
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        elif sys.version_info >= (3, 13):
+            # Attaching processes must not unlink the block when they exit
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._header = np.ndarray((_HEADER_SLOTS,), np.uint64, self._shm.buf)
+        self._records = np.ndarray(
+            (capacity,), FRAME_DTYPE, self._shm.buf, offset=_HEADER_SIZE
+        )
+        if self._owner:
+            self._header[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    # Only the name is pickled, so a ring passed to a multiprocessing.Process re-attaches in the child
+    def __getstate__(self):
+        return {"capacity": self.capacity, "name": self.name}
+
+    def __setstate__(self, state):
+        self.__init__(state["capacity"], state["name"])
+
+    ### ---------- Producer ---------- ###
+    def push(self, timestamp: float, frame_id: int, payload: bytes) -> bool:
+        """Appends one frame; returns False (and counts an overflow) if the ring is full"""
+        write_idx = int(self._header[_WRITE_IDX])
+        if write_idx - int(self._header[_READ_IDX]) >= self.capacity:
+            self._header[_OVERFLOWS] += 1
+            return False
+        record = self._records[write_idx % self.capacity]
+        record["timestamp"] = timestamp
+        record["frame_id"] = frame_id
+        record["dlc"] = len(payload)
+        record["payload"][: len(payload)] = np.frombuffer(payload, np.uint8)
+        # Publish the frame only after it is fully written
+        self._header[_WRITE_IDX] = write_idx + 1
+        return True
+
+    ### ---------- Consumer ---------- ###
+    def read(self, max_frames: int = None) -> np.ndarray:
+        """Returns a copy of all unread frames (oldest first) as an array of FRAME_DTYPE records"""
+        read_idx = int(self._header[_READ_IDX])
+        count = int(self._header[_WRITE_IDX]) - read_idx
+        if max_frames is not None:
+            count = min(count, max_frames)
+        start = read_idx % self.capacity
+        end = start + count
+        if end <= self.capacity:
+            frames = self._records[start:end].copy()
+        else:  # unread frames wrap around the end of the ring
+            frames = np.concatenate(
+                (self._records[start:], self._records[: end - self.capacity])
+            )
+        # Free the slots only after they are copied out
+        self._header[_READ_IDX] = read_idx + count
+        return frames
+
+    def pending(self) -> int:
+        """Number of frames written but not yet read"""
+        return int(self._header[_WRITE_IDX]) - int(self._header[_READ_IDX])
+
+    @property
+    def overflow_count(self) -> int:
+        """Total frames dropped so far because the consumer fell a full ring behind"""
+        return int(self._header[_OVERFLOWS])
+
+    def close(self):
+        # numpy views must be released before the shared memory can be closed
+        self._header = None
+        self._records = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def iter_frames(frames: np.ndarray):
+    """Yields (timestamp, frame_id, payload) for each record returned by FrameRing.read()"""
+    for timestamp, frame_id, dlc, payload in zip(
+        frames["timestamp"].tolist(),
+        frames["frame_id"].tolist(),
+        frames["dlc"].tolist(),
+        frames["payload"],
+    ):
+        yield timestamp, frame_id, payload[:dlc].tobytes()
@@ -0,0 +1,106 @@
+from collections import Counter
+
+from can_frame import format_frame_id
+
+
+class FrameRouter:
+    """
+    Maps integer CAN frame ids to the decoder and DataObjects that handle them, so each
+    received frame is dispatched with one dict lookup. Adding a frame is one register() call\n
+    Frames with an unregistered id are only counted (and reported once per id)\n
+    A route is (decoder, objs, handler):\n
+    decoder: payload -> parsed dict shared by objs (None if each obj parses the payload itself)\n
+    objs: DataObjects given every frame, then asked to update their label\n
+    handler: called with (frame_time, parsed dict or payload) for anything else the frame drives\n
+    Routes of high-rate frames can also be given a FrameSpec to decode a tick's frames at once
+    (see dispatch_batch)
+    """
+
+    def __init__(self, on_error=None):
+        """on_error is called with (frame_id, exception) when a frame fails to parse"""
+        self._routes = {}  # frame_id: (decoder, objs, handler)
+        self.on_error = on_error
+        self.unknown_counts = Counter()  # unregistered frame_id: frames received
+        self.batch_specs = {}  # frame_id: FrameSpec for dispatch_batch()
+
+    def register(self, frame_id: int, decoder=None, objs=(), handler=None):
+        """Registers (or replaces) the route for frame_id; with no arguments, frame_id is ignored"""
+        self._routes[frame_id] = (decoder, list(objs), handler)
+
+    def add_objs(self, frame_id: int, decoder, objs) -> bool:
+        """
+        Adds objs (given decoder's parsed dict) to the route for frame_id, registering one if
+        frame_id has none or is ignored\n
+        Returns False, leaving the route as is, if its objs or handler parse the payload themselves
+        """
+        route = self._routes.get(frame_id)
+        if route is None or route == (None, [], None):
+            self.register(frame_id, decoder, objs)
+            return True
+        if route[0] is None:
+            return False
+        route[1].extend(objs)
+        return True
+
+    def set_batch_spec(self, frame_id: int, spec):
+        """
+        Lets dispatch_batch() decode frame_id's frames with spec.decode_batch(); the route must
+        only have objs (a handler is called frame by frame)
+        """
+        decoder, objs, handler = self._routes[frame_id]
+        if decoder is None or handler is not None or not spec.batchable:
+            raise ValueError(
+                f"Frames {format_frame_id(frame_id)} can't be batch decoded"
+            )
+        self.batch_specs[frame_id] = spec
+
+    def __contains__(self, frame_id: int) -> bool:
+        return frame_id in self._routes
+
+    def dispatch(self, frame_time: float, frame_id: int, payload: bytes) -> bool:
+        """Returns False if frame_id is not registered"""
+        route = self._routes.get(frame_id)
+        if route is None:
+            if not self.unknown_counts[frame_id]:
+                print(f"Frame id not recognized: {format_frame_id(frame_id)}")
+            self.unknown_counts[frame_id] += 1
+            return False
+
+        decoder, objs, handler = route
+        try:
+            parsed = None if decoder is None else decoder(payload)
+            for obj in objs:
+                obj.parse_frame(frame_time, payload, parsed)
+                obj.update_label()
+            if handler is not None:
+                handler(frame_time, payload if parsed is None else parsed)
+        except Exception as e:
+            if self.on_error is None:
+                raise
+            self.on_error(frame_id, e)
+        return True
+
+    def dispatch_batch(self, frame_times: list, frame_id: int, payloads):
+        """
+        dispatch() for many frames of a frame_id given a batch spec, with the decoding and
+        each obj's data and label updates done once for the whole batch\n
+        payloads is an (n frames, >= spec.length bytes) uint8 array; returns the decoded columns
+        ({name: array of n values}), or None if they failed to parse
+        """
+        _, objs, _ = self._routes[frame_id]
+        try:
+            columns = self.batch_specs[frame_id].decode_batch(payloads)
+            for obj in objs:
+                obj.parse_frames(frame_times, columns)
+                obj.update_label()
+        except Exception as e:
+            if self.on_error is None:
+                raise
+            self.on_error(frame_id, e)
+            return None
+        return columns
+
+    @property
+    def unknown_count(self) -> int:
+        """Total frames received with an unregistered id"""
+        return sum(self.unknown_counts.values())
@@ -0,0 +1,190 @@
+import struct
+
+import numpy as np
+
+# struct format chars for little endian (unsigned, signed) ints of each size in bytes
+_FORMATS = {1: ("B", "b"), 2: ("H", "h"), 4: ("I", "i"), 8: ("Q", "q")}
+
+
+# NOTE: Currently returns True/False, but parsing functions don't do anything with this return value as of yet - it just prints it as a notice
+# NOTE: May add functionality to also log if a given data point is out of range (ie. is sus)
+def range_check(quantity, num, minn=None, maxn=None):
+    """Prints error and returns False if given num is not within [min, max] (inclusive); if None is given for either max or min, that boundary is not checked."""
+    if num is None:
+        print(f"Warning: {quantity} passed to range_check was None")
+        return
+    if maxn is not None and num > maxn:
+        print(f"ERROR - {quantity} {num} is higher than expected range")
+        return False
+    if minn is not None and num < minn:
+        print(f"ERROR - {quantity} {num} is lower than expected range")
+        return False
+    return True
+
+
+class Signal:
+    """
+    One value packed in a CAN frame: an int of size bytes at byte start (little endian)\n
+    value = ((raw >> shift) & mask) / scale - offset, then cast (eg. int, round, bool) if given\n
+    shift, mask: pick a bit field out of the int; with a mask, signed sign-extends the masked bits\n
+    na: raw value meaning "not available", decoded as None\n
+    minn, maxn: expected range; values outside it are reported by range_check()
+    """
+
+    def __init__(
+        self,
+        name,
+        start: int,
+        size: int,
+        scale: float = 1,
+        offset: float = 0,
+        signed: bool = False,
+        mask: int = None,
+        shift: int = 0,
+        na: int = None,
+        cast=None,
+        minn: float = None,
+        maxn: float = None,
+    ):
+        if size not in _FORMATS:
+            raise ValueError(f"Signal {name}: size must be one of {list(_FORMATS)}")
+        self.name = name
+        self.start = start
+        self.size = size
+        self.scale = scale
+        self.offset = offset
+        self.signed = signed
+        self.mask = mask
+        self.shift = shift
+        self.na = na
+        self.cast = cast
+        self.minn = minn
+        self.maxn = maxn
+
+    @property
+    def field(self) -> tuple:
+        # Bit fields unpack the whole int unsigned, as their sign bit is inside it
+        return self.start, self.size, self.signed and self.mask is None
+
+    @property
+    def plain(self) -> bool:
+        """True if the value is just raw / scale - offset"""
+        return self.mask is None and self.na is None and self.cast is None
+
+
+class FrameSpec:
+    """
+    The signals of one frame id, compiled into a decode(payload) -> {name: value} that does a
+    single precomputed struct.Struct.unpack_from, then scales every value in one pass\n
+    length: payload size in bytes; with padded, longer payloads are accepted (eg. candump pads 0x060)
+    """
+
+    def __init__(self, frame_id: int, length: int, signals: list, padded: bool = False):
+        self.frame_id = frame_id
+        self.length = length
+        self.signals = signals
+        self.padded = padded
+
+        # One struct member per distinct field, so signals sharing bytes unpack them once
+        fields = sorted({signal.field for signal in signals})
+        fmt = "<"
+        end = 0
+        for start, size, signed in fields:
+            if start < end:
+                raise ValueError(f"Overlapping signals in frame 0x{frame_id:03X}")
+            fmt += "x" * (start - end) + _FORMATS[size][signed]
+            end = start + size
+        if end > length:
+            raise ValueError(f"Signals run past the end of frame 0x{frame_id:03X}")
+        self.struct = struct.Struct(fmt)
+        # The same fields as a numpy structured dtype, for decode_batch()
+        self.dtype = np.dtype(
+            {
+                "names": [f"f{i}" for i in range(len(fields))],
+                "formats": [
+                    f"<{'i' if signed else 'u'}{size}" for _, size, signed in fields
+                ],
+                "offsets": [start for start, _, _ in fields],
+                "itemsize": length,
+            }
+        )
+
+        self._field_index = index = {field: i for i, field in enumerate(fields)}
+        self._plain = [
+            (signal.name, index[signal.field], signal.scale, signal.offset)
+            for signal in signals
+            if signal.plain
+        ]
+        self._special = [
+            (signal, index[signal.field]) for signal in signals if not signal.plain
+        ]
+        self._checked = [
+            signal
+            for signal in signals
+            if signal.minn is not None or signal.maxn is not None
+        ]
+
+    def decode(self, data: bytes | str) -> dict:
+        raw_bytes = bytes.fromhex(data) if isinstance(data, str) else data
+        if len(raw_bytes) != self.length and not (
+            self.padded and len(raw_bytes) > self.length
+        ):
+            raise ValueError(
+                f"Incorrect data length (num bytes): ID 0x{self.frame_id:03X}"
+            )
+
+        raw = self.struct.unpack_from(raw_bytes)
+        parsed = {
+            name: raw[i] / scale - offset for name, i, scale, offset in self._plain
+        }
+        for signal, i in self._special:
+            value = raw[i]
+            if signal.na is not None and value == signal.na:
+                parsed[signal.name] = None
+                continue
+            if signal.mask is not None:
+                value = (value >> signal.shift) & signal.mask
+                if signal.signed and value > signal.mask >> 1:
+                    value -= signal.mask + 1
+            value = value / signal.scale - signal.offset
+            parsed[signal.name] = value if signal.cast is None else signal.cast(value)
+        for signal in self._checked:
+            range_check(signal.name, parsed[signal.name], signal.minn, signal.maxn)
+        return parsed
+
+    @property
+    def batchable(self) -> bool:
+        """True if decode_batch() can decode this frame (no N/A values or casts)"""
+        return all(signal.na is None and signal.cast is None for signal in self.signals)
+
+    def decode_batch(self, payloads: np.ndarray) -> dict:
+        """
+        decode() for many frames at once: payloads is an (n frames, >= length bytes) uint8 array
+        (eg. the payload column of FrameRing.read() records), viewed with self.dtype so each
+        signal is scaled a whole column at a time\n
+        Returns {name: float64 array of n values}; out of range values are reported once per batch
+        """
+        if not self.batchable:
+            raise ValueError(f"Frame 0x{self.frame_id:03X} can't be batch decoded")
+        records = np.ascontiguousarray(payloads[:, : self.length]).view(self.dtype)[
+            :, 0
+        ]
+        columns = {}
+        for signal in self.signals:
+            raw = records[f"f{self._field_index[signal.field]}"]
+            if signal.mask is not None:
+                raw = (raw.astype(np.int64) >> signal.shift) & signal.mask
+                if signal.signed:
+                    raw = np.where(raw > signal.mask >> 1, raw - (signal.mask + 1), raw)
+            columns[signal.name] = raw / signal.scale - signal.offset
+        for signal in self._checked:
+            column = columns[signal.name]
+            out = np.zeros(len(column), bool)
+            if signal.minn is not None:
+                out |= column < signal.minn
+            if signal.maxn is not None:
+                out |= column > signal.maxn
+            if out.any():
+                value = column[out.argmax()].item()
+                range_check(signal.name, value, signal.minn, signal.maxn)
+        return columns
@@ -0,0 +1,4 @@
+from .base import FrameSource  # noqa F401
+from .replay import ReplayEngine, ReplaySource, read_candump_log  # noqa F401
+from .ssh_candump import SSHCandumpSource  # noqa F401
+from .synthetic import SyntheticSource  # noqa F401
@@ -0,0 +1,64 @@
+import multiprocessing
+
+from can_frame import parse_candump_line
+from frame_ring import FrameRing
+
+
+class FrameSource:
+    """
+    Produces the received CAN frames the GUI displays (eg. candump over SSH, a log replay)\n
+    run() is the target of the GUI's frame source process: like candump_process, it pushes
+    frames to frame_ring and puts any other text lines (eg. errors) on queue as a batch.
+    If log_queue is given, every frame and line is also put on it (as a list per batch)
+    for can_logging_process, so the CAN log is complete however far the GUI falls behind\n
+    Sources are pickled into that process, so they should only hold simple settings (and
+    multiprocessing objects, eg. a Pipe end)
+    """
+
+    def run(
+        self,
+        queue: multiprocessing.Queue,
+        frame_ring: FrameRing,
+        log_queue: multiprocessing.Queue = None,
+    ):
+        raise NotImplementedError
+
+
+def put_lines(
+    lines: list[str],
+    queue: multiprocessing.Queue,
+    log_queue: multiprocessing.Queue = None,
+):
+    """Puts a batch of text lines (eg. errors) on queue, and on log_queue if given"""
+    queue.put(lines)
+    if log_queue is not None:
+        log_queue.put(lines)
+
+
+def push_timed_lines(
+    rows: list[tuple[float, str]],
+    frame_ring: FrameRing,
+    queue: multiprocessing.Queue,
+    log_queue: multiprocessing.Queue = None,
+):
+    """
+    Like push_candump_lines(), but for (timestamp, line) rows that already have
+    their (laptop clock) timestamp\n
+    Returns the number of frames pushed
+    """
+    pushed = 0
+    other_lines = []
+    logged = []
+    for timestamp, line in rows:
+        frame = parse_candump_line(line)
+        if frame is None:
+            other_lines.append(line)
+            logged.append(line)
+        else:
+            pushed += frame_ring.push(timestamp, *frame)
+            logged.append((timestamp, *frame))
+    if other_lines:
+        queue.put(other_lines)
+    if log_queue is not None and logged:
+        log_queue.put(logged)
+    return pushed
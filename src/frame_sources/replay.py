@@ -0,0 +1,236 @@
+import bisect
+import multiprocessing
+import time
+from datetime import datetime
+
+from config import (
+    candump_batch_max_delay,
+    replay_max_speed_fill,
+    replay_status_period,
+)
+from frame_ring import FrameRing
+from log_files import read_log_rows
+
+from .base import FrameSource, push_timed_lines, put_lines
+
+
+def read_candump_log(path: str) -> list[tuple[float, str]]:
+    """
+    Reads a CAN log written by can_logging_process into (timestamp, line) rows, oldest
+    first; timestamp is in secs since epoch\n
+    path is logs/candump_<timestamp>.csv, or its manifest or one of its (compressed) segments:
+    see log_files.log_segments()
+    """
+    rows = []
+    for row in read_log_rows(path):
+        if len(row) < 3:
+            continue
+        try:
+            timestamp = datetime.fromisoformat(row[0]).timestamp()
+        except ValueError:
+            continue
+        rows.append((timestamp, row[2]))
+    rows.sort(
+        key=lambda row: row[0]
+    )  # sent frames are logged when their response arrives
+    return rows
+
+
+class ReplayEngine:
+    """
+    Decides which rows of a candump log are due at a wall clock time, replaying at
+    speed x real time (eg. 1, 10, 60), or as fast as they can be taken if speed is 0\n
+    Due rows are stamped with the wall time they were scheduled for, so the GUI plots a
+    replay like a live session (with time squeezed by speed).
+    Pausing, seeking and changing speed re-anchor the log's clock to the wall clock
+    """
+
+    def __init__(
+        self, rows: list[tuple[float, str]], speed: float = 1.0, now: float = None
+    ):
+        """rows are (log timestamp, line), oldest first, as returned by read_candump_log()"""
+        self.rows = rows
+        self._times = [log_time for log_time, _ in rows]
+        self.index = 0  # next row to replay
+        self.speed = speed
+        self.paused = False
+        self._anchor_wall = time.time() if now is None else now
+        self._anchor_log = self.start
+
+    @property
+    def start(self) -> float:
+        return self._times[0] if self._times else 0.0
+
+    @property
+    def duration(self) -> float:
+        return self._times[-1] - self.start if self._times else 0.0
+
+    @property
+    def max_speed(self) -> bool:
+        return not self.speed
+
+    @property
+    def finished(self) -> bool:
+        return self.index >= len(self.rows)
+
+    def log_time(self, now: float) -> float:
+        """The log timestamp being played at wall time now"""
+        if self.paused or self.max_speed:
+            return self._anchor_log
+        return self._anchor_log + (now - self._anchor_wall) * self.speed
+
+    def position(self, now: float) -> float:
+        """Secs into the log being played at wall time now"""
+        return min(max(self.log_time(now) - self.start, 0.0), self.duration)
+
+    def _anchor(self, now: float, log_time: float):
+        self._anchor_wall = now
+        self._anchor_log = log_time
+
+    def pause(self, now: float):
+        if not self.paused:
+            self._anchor(now, self.log_time(now))
+            self.paused = True
+
+    def resume(self, now: float):
+        if self.paused:
+            self._anchor(now, self._anchor_log)
+            self.paused = False
+
+    def set_speed(self, speed: float, now: float):
+        """speed x real time; 0 replays as fast as possible"""
+        self._anchor(now, self.log_time(now))
+        self.speed = speed
+
+    def seek(self, offset: float, now: float):
+        """Jumps to offset secs into the log"""
+        log_time = self.start + min(max(offset, 0.0), self.duration)
+        self.index = bisect.bisect_left(self._times, log_time)
+        self._anchor(now, log_time)
+
+    def due_rows(self, now: float, max_rows: int = None) -> list[tuple[float, str]]:
+        """
+        Takes the rows due by wall time now as (scheduled wall time, line)\n
+        At max speed the next max_rows rows are all due, stamped now
+        """
+        if self.paused or self.finished:
+            return []
+        if self.max_speed:
+            end = len(self.rows) if max_rows is None else self.index + max_rows
+            rows = [(now, line) for _, line in self.rows[self.index : end]]
+            self.index += len(rows)
+            self._anchor(now, self._times[self.index - 1] if rows else self._anchor_log)
+            return rows
+
+        end = bisect.bisect_right(self._times, self.log_time(now), lo=self.index)
+        if max_rows is not None:
+            end = min(end, self.index + max_rows)
+        rows = [
+            (self._anchor_wall + (log_time - self._anchor_log) / self.speed, line)
+            for log_time, line in self.rows[self.index : end]
+        ]
+        self.index = end
+        return rows
+
+    def time_until_next(self, now: float) -> float | None:
+        """Wall secs until the next row is due, or None if nothing will be due until a control"""
+        if self.paused or self.finished:
+            return None
+        if self.max_speed:
+            return 0.0
+        return max(0.0, (self._times[self.index] - self.log_time(now)) / self.speed)
+
+
+class ReplaySource(FrameSource):
+    """
+    Replays a candump log through the GUI at speed x real time (0 = as fast as possible)\n
+    Frames keep their original spacing (divided by speed); the first one is stamped with
+    the time the replay started. If conn (a Pipe end) is given, the replay takes
+    ("pause",), ("resume",), ("speed", x) and ("seek", secs) controls from it, sends back
+    a status dict every replay_status_period secs, and waits for a seek once it finishes
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, conn=None):
+        self.path = path
+        self.speed = speed
+        self.conn = conn
+
+    def run(
+        self,
+        queue: multiprocessing.Queue,
+        frame_ring: FrameRing,
+        log_queue: multiprocessing.Queue = None,
+    ):
+        try:
+            rows = read_candump_log(self.path)
+        except OSError as e:
+            put_lines([f"[ERROR] {str(e)}"], queue, log_queue)
+            return
+        if not rows:
+            put_lines([f"[ERROR] No CAN frames in {self.path}"], queue, log_queue)
+            return
+
+        print(f"Replaying {len(rows)} lines from {self.path}")
+        engine = ReplayEngine(rows, self.speed)
+        # Max speed replays only top the ring up to this, so the GUI never falls a full ring behind
+        max_pending = int(frame_ring.capacity * replay_max_speed_fill)
+        frames = 0
+        last_status = time.time()
+        was_finished = False
+        while True:
+            while self.conn is not None and self.conn.poll():
+                self._handle_control(engine, self.conn.recv())
+            now = time.time()
+            room = max_pending - frame_ring.pending() if engine.max_speed else None
+            if room is None or room > 0:
+                frames += push_timed_lines(
+                    engine.due_rows(now, room), frame_ring, queue, log_queue
+                )
+
+            if engine.finished and not was_finished:
+                print(f"Replay of {self.path} finished")
+            was_finished = engine.finished
+            if self.conn is None:
+                if engine.finished:
+                    return
+            elif now - last_status >= replay_status_period:
+                self._send_status(engine, now, frames / (now - last_status))
+                frames = 0
+                last_status = now
+
+            wait = engine.time_until_next(now)
+            if wait is None:  # paused or finished: only a control makes rows due
+                wait = replay_status_period
+            elif wait > 0 or (room is not None and room <= 0):
+                wait = min(max(wait, candump_batch_max_delay), replay_status_period)
+            if wait > 0:
+                if self.conn is None:
+                    time.sleep(wait)
+                else:
+                    self.conn.poll(wait)  # wakes up early for a control
+
+    def _handle_control(self, engine: ReplayEngine, control: tuple):
+        now = time.time()
+        match control:
+            case ("pause",):
+                engine.pause(now)
+            case ("resume",):
+                engine.resume(now)
+            case ("speed", speed):
+                engine.set_speed(speed, now)
+            case ("seek", offset):
+                engine.seek(offset, now)
+            case _:
+                print(f"Unknown replay control: {control}")
+
+    def _send_status(self, engine: ReplayEngine, now: float, fps: float):
+        self.conn.send(
+            {
+                "position": engine.position(now),
+                "duration": engine.duration,
+                "fps": fps,
+                "speed": engine.speed,
+                "paused": engine.paused,
+                "finished": engine.finished,
+            }
+        )
@@ -0,0 +1,21 @@
+import multiprocessing
+
+from frame_ring import FrameRing
+from workers.CAN_dump_worker import candump_process
+
+from .base import FrameSource
+
+
+class SSHCandumpSource(FrameSource):
+    """Live frames from candump run on the Pi over SSH"""
+
+    def __init__(self, credentials: tuple[str, str, str]):
+        self.credentials = credentials
+
+    def run(
+        self,
+        queue: multiprocessing.Queue,
+        frame_ring: FrameRing,
+        log_queue: multiprocessing.Queue = None,
+    ):
+        candump_process(queue, frame_ring, self.credentials, log_queue)
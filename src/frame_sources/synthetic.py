@@ -0,0 +1,220 @@
+import math
+import multiprocessing
+import time
+
+from config import (
+    candump_batch_max_delay,
+    derivative_offset,
+    integral_offset,
+    synthetic_frame_rate,
+)
+from frame_ring import FrameRing
+
+from .base import FrameSource
+
+### ----------  Frame Encoders ---------- ###
+# Inverses of the parse_0x..._frame functions in utils.py: each returns a frame's payload
+# NOTE: ported from the generate_*_msg helpers in test_scripts/local_test_script.py
+
+
+def _fields(*fields: tuple[float, int]) -> bytes:
+    """Packs (value, num_bytes) fields as little endian unsigned ints"""
+    return b"".join(round(value).to_bytes(size, "little") for value, size in fields)
+
+
+def encode_rudder_frame(
+    actual_angle,
+    imu_roll,
+    imu_pitch,
+    imu_heading,
+    set_angle,
+    integral,
+    derivative,
+    spd_over_gnd,
+) -> bytes:
+    """0x204 frame"""
+    return _fields(
+        ((actual_angle + 90) * 100, 2),
+        ((imu_roll + 180) * 100, 2),
+        ((imu_pitch + 180) * 100, 2),
+        (imu_heading * 100, 2),
+        ((set_angle + 90) * 100, 2),
+        (integral + integral_offset, 2),
+        (derivative + derivative_offset, 2),
+        (spd_over_gnd * 1000, 2),
+    )
+
+
+def encode_main_heading_frame(
+    heading: float, steering_select_bit: bool, steering_enable_bit: bool
+) -> bytes:
+    """0x001 frame: a rudder angle if steering_select_bit, otherwise a desired heading"""
+    angle = (heading + 90) * 1000 if steering_select_bit else heading * 1000
+    status = (0x80 if steering_select_bit else 0) | (0x40 if steering_enable_bit else 0)
+    return _fields((angle, 4), (status, 1))
+
+
+def encode_gps_frame(lat: float, lon: float, spd_over_gnd: float) -> bytes:
+    """0x070 frame (the UTC time fields are left at 0)"""
+    return _fields(
+        ((lat + 90) * 1000000, 4),
+        ((lon + 180) * 1000000, 4),
+        (0, 8),
+        (spd_over_gnd * 1000, 4),
+    )
+
+
+def encode_ais_frame(
+    sid: int, lat: float, lon: float, idx: int, num_ships: int
+) -> bytes:
+    """0x060 frame for a stationary 10 x 30 m ship"""
+    return _fields(
+        (sid, 4),
+        ((lat + 90) * 1000000, 4),
+        ((lon + 180) * 1000000, 4),
+        (0, 2),  # sog
+        (0, 2),  # cog
+        (0, 2),  # true heading
+        (128, 1),  # rot (sent as rot + 128)
+        (10, 2),  # length
+        (30, 2),  # width
+        (idx, 1),
+        (num_ships, 1),
+    )
+
+
+def encode_wind_frame(direction: float, speed: float) -> bytes:
+    """0x040 (sail) and 0x041 (data) wind sensor frames"""
+    return _fields((direction, 2), (speed * 10, 2))
+
+
+def encode_pdb_frame(volts: list[float], temps: list[float], mppt: list[float]):
+    """0x206 frame; volts, temps and mppt currents are given as in the frame's order"""
+    volt1, volt2, volt3, volt4 = volts
+    temp1, temp2, temp3 = temps
+    return _fields(
+        (volt2 * 1000, 2),
+        (temp1 * 100, 2),
+        (volt3 * 1000, 2),
+        (temp2 * 100, 2),
+        (temp3 * 100, 2),
+        (volt4 * 1000, 2),
+        (volt1 * 1000, 2),
+        *((current * 1000, 2) for current in mppt),
+        (0, 2),  # reserved
+    )
+
+
+def encode_temp_sensor_frame(temp: float) -> bytes:
+    """0x100 frame; temp in °C"""
+    return _fields(((temp + 273.15) * 1000, 3))
+
+
+def encode_pH_frame(pH: float) -> bytes:
+    """0x110 frame"""
+    return _fields((pH * 1000, 2))
+
+
+def encode_sal_frame(conductivity: float) -> bytes:
+    """0x120 frame; conductivity in µS/cm"""
+    return _fields((conductivity * 1000, 4))
+
+
+### ----------  Synthetic Session ---------- ###
+# Each maker returns (frame_id, payload) for the boat's state t secs into the session:
+# POLARIS sails a slow sine path off Jericho Beach with its heading swinging +-45°
+
+
+def _heading(t):
+    return (90 + 45 * math.sin(t / 10)) % 360
+
+
+def _rudder_frame(t):
+    heading = _heading(t)
+    return 0x204, encode_rudder_frame(
+        20 * math.sin(t / 5), 5 * math.sin(t), 3 * math.cos(t), heading, 0, 1, -1, 2.5
+    )
+
+
+def _main_heading_frame(t):
+    return 0x001, encode_main_heading_frame(_heading(t) + 10, False, True)
+
+
+def _gps_frame(t):
+    return 0x070, encode_gps_frame(
+        49.2722 + 0.001 * math.sin(t / 60), -123.1985 + 0.00001 * t, 2.5
+    )
+
+
+def _ais_frame(t):
+    return 0x060, encode_ais_frame(int(t) % 5, 49.2722, -123.19, int(t) % 5, 5)
+
+
+def _data_wind_frame(t):
+    return 0x041, encode_wind_frame(180 + 90 * math.sin(t / 20), 8 + 2 * math.sin(t))
+
+
+def _sail_wind_frame(t):
+    return 0x040, encode_wind_frame(45 + 30 * math.sin(t / 20), 7 + 2 * math.cos(t))
+
+
+def _pdb_frame(t):
+    cell = 3.7 + 0.2 * math.sin(t / 30)
+    return 0x206, encode_pdb_frame([cell] * 4, [30, 31, 32], [1.0, 1.1, 1.2, 1.3])
+
+
+def _sensor_frames(t):
+    return [
+        (0x100, encode_temp_sensor_frame(12 + math.sin(t / 30))),
+        (0x110, encode_pH_frame(7.5 + 0.5 * math.sin(t / 30))),
+        (0x120, encode_sal_frame(40000 + 1000 * math.sin(t / 30))),
+    ]
+
+
+def synthetic_frames(t: float) -> list[tuple[int, bytes]]:
+    """One round of every frame POLARIS sends, t secs into the session"""
+    return [
+        _rudder_frame(t),
+        _main_heading_frame(t),
+        _gps_frame(t),
+        _ais_frame(t),
+        _data_wind_frame(t),
+        _sail_wind_frame(t),
+        _pdb_frame(t),
+        *_sensor_frames(t),
+        *((frame_id, b"") for frame_id in (0x130, 0x131, 0x132, 0x133)),  # heartbeats
+    ]
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generates a plausible session of frames at rate frames/s, with no boat or network needed\n
+    A high rate load tests the GUI
+    """
+
+    def __init__(self, rate: float = synthetic_frame_rate):
+        self.rate = rate
+
+    def run(
+        self,
+        queue: multiprocessing.Queue,
+        frame_ring: FrameRing,
+        log_queue: multiprocessing.Queue = None,
+    ):
+        start = time.time()
+        sent = 0
+        frames = []
+        while True:
+            time.sleep(candump_batch_max_delay)
+            now = time.time()
+            due = int((now - start) * self.rate)
+            logged = []
+            for _ in range(due - sent):
+                if not frames:
+                    frames = synthetic_frames(now - start)
+                frame = frames.pop(0)
+                frame_ring.push(now, *frame)
+                logged.append((now, *frame))
+            sent = due
+            if log_queue is not None and logged:
+                log_queue.put(logged)
@@ -0,0 +1,229 @@
+import csv
+import gzip
+import io
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for "zstd" logs
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+MANIFEST_SUFFIX = ".manifest.json"
+_SEGMENT_SUFFIX = re.compile(r"(\.\d{3})?\.csv(\.gz|\.zst)?$")
+
+
+def log_root(path: str) -> str:
+    """
+    The path of a log without its segment number, extension and compression suffix, eg.
+    logs/candump_<timestamp> for logs/candump_<timestamp>.003.csv.gz or its manifest
+    """
+    path = os.fspath(path)
+    if path.endswith(MANIFEST_SUFFIX):
+        return path.removesuffix(MANIFEST_SUFFIX)
+    return _SEGMENT_SUFFIX.sub("", path)
+
+
+class LogFile:
+    """
+    A csv log written as a series of segment files, each starting with the header\n
+    Segments are compressed as they are written ("gzip", "zstd" or "none"); a new one is
+    started once the current one holds rotate_bytes on disk or has been open for rotate_secs
+    (0 for no limit). Without rotation the only segment is path (plus the compression
+    suffix); with it they are <path root>.000.csv, .001.csv, ... <path root>.manifest.json
+    lists the segments (unless the log is just the uncompressed path), and is rewritten
+    whenever one is started or closed. read_log_rows() reads the rows back from any of these
+    """
+
+    def __init__(
+        self,
+        path: str,
+        header: list,
+        compression: str = "none",
+        rotate_bytes: int = 0,
+        rotate_secs: float = 0,
+    ):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown log compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            print("Warning: zstandard is not installed - compressing logs with gzip")
+            compression = "gzip"
+        self.root = log_root(path)
+        self.header = header
+        self.compression = compression
+        self.rotate_bytes = rotate_bytes
+        self.rotate_secs = rotate_secs
+        self.rows = 0  # rows written to all segments
+        self.segments = []  # manifest entries, oldest first
+        self._closed_bytes = 0  # on disk, of the closed segments
+        self._raw = None
+        self._text = None
+        self._open_segment()
+
+    @property
+    def path(self) -> str:
+        """The segment being written"""
+        return os.path.join(os.path.dirname(self.root), self.segments[-1]["file"])
+
+    @property
+    def manifest_path(self) -> str:
+        return self.root + MANIFEST_SUFFIX
+
+    @property
+    def bytes_written(self) -> int:
+        """Bytes written to disk (compressed), in all segments"""
+        return self._closed_bytes + self._raw.tell()
+
+    def writerow(self, row: list):
+        self.writerows([row])
+
+    def writerows(self, rows: list):
+        """Writes rows to the current segment, after starting a new one if it is full"""
+        self.rotate_if_due()
+        self._writer.writerows(rows)
+        self.rows += len(rows)
+        self.segments[-1]["rows"] += len(rows)
+
+    def rotate_if_due(self) -> bool:
+        """
+        Starts a new segment if the current one is full, returning whether it did (eg. so a
+        writer can start it with what a reader of that segment alone needs)
+        """
+        if not self._rotation_due():
+            return False
+        self._close_segment()
+        self._open_segment()
+        return True
+
+    def flush(self):
+        """Writes everything buffered (as a complete compressed block) to the file"""
+        self._text.flush()
+
+    def fsync(self):
+        self.flush()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+
+    def close(self):
+        if self._text is not None:
+            self._close_segment()
+            self._text = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _rotation_due(self) -> bool:
+        if self.rotate_bytes and self._raw.tell() >= self.rotate_bytes:
+            return True
+        return bool(self.rotate_secs) and time.monotonic() >= self._rotate_at
+
+    def _open_segment(self):
+        rotating = self.rotate_bytes or self.rotate_secs
+        number = f".{len(self.segments):03d}" if rotating else ""
+        path = f"{self.root}{number}.csv{COMPRESSION_SUFFIXES[self.compression]}"
+        self._raw = open(path, "wb")
+        if self.compression == "gzip":
+            stream = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6)
+        elif self.compression == "zstd":
+            stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            stream = self._raw
+        self._text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._text)
+        self._writer.writerow(self.header)
+        self._rotate_at = time.monotonic() + self.rotate_secs
+
+        self.segments.append(
+            {
+                "file": os.path.basename(path),
+                "start": datetime.now().isoformat(),
+                "end": None,
+                "rows": 0,
+                "bytes": None,
+            }
+        )
+        self._write_manifest()
+        self._text.flush()  # the header, so a new segment is readable straight away
+
+    def _close_segment(self):
+        if self.compression == "none":
+            self._text.flush()
+            self._text.detach()
+        else:
+            self._text.close()  # finishes the compressed stream (leaving the file open)
+        segment_bytes = self._raw.tell()
+        self._raw.close()
+        self._closed_bytes += segment_bytes
+        self.segments[-1].update(end=datetime.now().isoformat(), bytes=segment_bytes)
+        self._write_manifest()
+
+    def _write_manifest(self):
+        if self.compression == "none" and not (self.rotate_bytes or self.rotate_secs):
+            return  # a plain csv, as logs were before segments
+        manifest = {
+            "header": self.header,
+            "compression": self.compression,
+            "segments": self.segments,
+        }
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=1)
+        os.replace(temp_path, self.manifest_path)  # never leave a half written manifest
+
+
+def log_segments(path: str) -> list[str]:
+    """
+    The segment files of the log at path, oldest first: path may be a log's manifest, one of
+    its segments, or the name an uncompressed, unrotated log would have (eg.
+    logs/candump_<timestamp>.csv), which is read from its manifest if there is no such file
+    """
+    path = os.fspath(path)
+    if not path.endswith(MANIFEST_SUFFIX):
+        if os.path.exists(path):
+            return [path]
+        path = log_root(path) + MANIFEST_SUFFIX
+    with open(path) as manifest_file:
+        manifest = json.load(manifest_file)
+    directory = os.path.dirname(path)
+    return [
+        os.path.join(directory, segment["file"]) for segment in manifest["segments"]
+    ]
+
+
+def open_log_segment(path: str):
+    """A log segment opened for reading as text, decompressed as its suffix says"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(
+                f"Reading {path} needs zstandard (pip install zstandard)"
+            )
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.TextIOWrapper(reader, encoding="utf-8", newline="")
+    return open(path, newline="", encoding="utf-8")
+
+
+def read_log_rows(path: str):
+    """
+    Yields the csv rows (without headers) of every segment of the log at path (see
+    log_segments()), oldest first\n
+    A segment cut short (eg. by a crash while it was written) is read up to its last flush
+    """
+    for segment in log_segments(path):
+        try:
+            with open_log_segment(segment) as segment_file:
+                reader = csv.reader(segment_file)
+                next(reader, None)  # header
+                yield from reader
+        except (EOFError, gzip.BadGzipFile) as e:
+            print(f"Warning: {segment} is incomplete ({e}) - read up to where it ends")
+        except FileNotFoundError:
+            print(f"Warning: log segment {segment} not found - skipped")
@@ -1,4 +1,5 @@
 import argparse
+import functools
 import multiprocessing
 import multiprocessing.util
 import os
@@ -12,13 +13,27 @@ from PyQt5.QtWidgets import QApplication, QMessageBox, QWidget
 
 import config
 from config import (
+    cansend_flush_freq,
+    frame_ring_capacity,
     gui_update_freq,
+    log_compression,
+    log_rotate_bytes,
+    log_rotate_secs,
+    synthetic_frame_rate,
     max_trimtab_angle,
     min_trimtab_angle,
+    render_max_fps,
+    scroll_window,
     window_height,
     window_width,
 )
-from utils import all_objs, heartbeat_modules
+from command_scheduler import CommandScheduler
+from frame_ring import FrameRing
+from frame_sources import ReplaySource, SSHCandumpSource, SyntheticSource
+from render_scheduler import RenderScheduler
+from retention import RetentionManager
+from ssh_broker import close_ssh_clients, prewarm_ssh_client
+from utils import ais_obj, all_objs, heartbeat_modules, load_dbc_frames
 from widgets import (
     CANWindowControlsMixin,
     CANWindowLoggingMixin,
@@ -27,9 +42,10 @@ from widgets import (
     JoystickMixin,
 )
 from workers import (
+    CANLogStats,
     can_logging_process,
-    candump_process,
     cansend_worker,
+    put_urgent,
     temperature_reader,
 )
 
@@ -83,13 +99,27 @@ class CANWindow(
         response_queue,
         can_log_queue,
         timestamp,
+        frame_ring: FrameRing = None,
+        replay_conn=None,
+        can_log_stats: CANLogStats = None,
+        urgent_queue=None,
     ):
         super().__init__()
         self.queue = queue
+        self.frame_ring = frame_ring
+        self.replay_conn = replay_conn  # controls/status of a --source replay
+        self.frame_ring_overflows = 0
         self.temp_pipe = temp_pipe
         self.cansend_queue = cmd_queue
+        self.command_scheduler = CommandScheduler(
+            cmd_queue.put,
+            send_urgent=None
+            if urgent_queue is None
+            else functools.partial(put_urgent, cmd_queue, urgent_queue),
+        )
         self.cansend_response_queue = response_queue
         self.can_log_queue = can_log_queue
+        self.can_log_stats = can_log_stats  # shared by can_logging_process
 
         self.rudder_angle = 0  # degrees
         self.trimtab_angle = 0  # degrees
@@ -103,17 +133,31 @@ class CANWindow(
         self.restart_args = None  # For picking which SSH credentials to use
 
         self.time_start = time.time()
-        self.time_history = []
+        self.frames_received = 0  # CAN frames processed since the window opened
+        self.scroll_window = scroll_window  # secs shown on the graphs
+        self.view_paused = False  # True while the graphs stop following new data
+        self.retention = RetentionManager(all_objs)
 
         # Initialize logging
         self._init_logging(timestamp)
 
         self.init_ui()
+        self._init_frame_router()
 
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_status)
         self.timer.start(gui_update_freq)  # Updates every update_freq milliseconds
 
+        self.command_timer = QTimer()
+        self.command_timer.timeout.connect(self.command_scheduler.flush)
+        self.command_timer.start(cansend_flush_freq)
+
+        # Lines are redrawn on their own timer, so frame processing isn't tied to the redraw rate
+        self.render_scheduler = RenderScheduler(all_objs)
+        self.render_timer = QTimer()
+        self.render_timer.timeout.connect(self.render_scheduler.render)
+        self.render_timer.start(1000 // render_max_fps)
+
     # NOTE: Below functions are all in CANWindowLoggingMixin
     # def _init_logging(self, timestamp):
     # def _log_values(self):
@@ -121,8 +165,11 @@ class CANWindow(
     def closeEvent(self, event):
         """Handle window close event to ensure files are properly closed"""
         try:
-            if hasattr(self, "values_csv_file"):
-                self.values_csv_file.close()
+            if hasattr(self, "values_log"):
+                self.values_log.close()
+            ais_obj.close_logging()
+            if hasattr(self, "session_store"):
+                self.session_store.close()
             print("Log files closed successfully")
         except Exception as e:
             print(f"Error closing log files: {e}")
@@ -214,6 +261,7 @@ def cleanup():
 
     # Close window and log files
     try:
+        window.command_scheduler.flush()  # send the last held rudder/trim tab commands
         window.closeEvent(None)
     except:
         pass
@@ -221,25 +269,31 @@ def cleanup():
     # Clean up processes
     cmd_queue.put("__EXIT__")
     can_log_queue.put("__EXIT__")
+    cansend_proc.join(timeout=2)  # let it send what is queued
+    can_logging_proc.join(timeout=2)  # let it write and flush what is queued
 
-    candump_proc.terminate()
+    frame_source_proc.terminate()
     temp_proc.terminate()
     cansend_proc.terminate()
     can_logging_proc.terminate()
 
-    candump_proc.join(timeout=2)
+    frame_source_proc.join(timeout=2)
     temp_proc.join(timeout=2)
     cansend_proc.join(timeout=2)
-    can_logging_proc.join(timeout=2)
 
     parent_conn.close()
     child_conn.close()
+    replay_parent_conn.close()
+    replay_child_conn.close()
 
     # Optional but safe:
     queue.close()
     response_queue.close()
     cmd_queue.close()
+    urgent_queue.close()
     can_log_queue.close()
+    frame_ring.close()
+    close_ssh_clients()
 
     # Fix small memory leak when restarting.
     multiprocessing.util._exit_function()
@@ -261,7 +315,57 @@ def parse_args(argv):
     parser.add_argument(
         "-p", "--profile", default="Wifi/deployment", help="SSH credentials profile"
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "-s",
+        "--source",
+        choices=["ssh", "replay", "synthetic"],
+        default="ssh",
+        help="where received CAN frames come from: candump on the Pi, a log replay or generated",
+    )
+    parser.add_argument(
+        "--replay-file", help="logs/candump_<timestamp>.csv to replay (--source replay)"
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        help="replay speed x real time, 0 for as fast as possible (--source replay)",
+    )
+    parser.add_argument(
+        "--synthetic-rate",
+        type=float,
+        default=synthetic_frame_rate,
+        help="frames/s generated (--source synthetic)",
+    )
+    parser.add_argument(
+        "--dbc",
+        help=".dbc CAN database whose frames are decoded, graphed and logged too",
+    )
+    args = parser.parse_args(argv)
+    if args.source == "replay" and args.replay_file is None:
+        parser.error("--source replay needs --replay-file")
+    return args
+
+
+def restart_argv(args, profile: str) -> list[str]:
+    """The command line for restarting with parsed args, switched to SSH profile"""
+    argv = []
+    for name, value in vars(args).items():
+        if name == "profile":
+            value = profile
+        if value is not None:
+            argv += [f"--{name.replace('_', '-')}", str(value)]
+    return argv
+
+
+def make_frame_source(args, credentials, replay_conn=None):
+    match args.source:
+        case "replay":
+            return ReplaySource(args.replay_file, args.replay_speed, replay_conn)
+        case "synthetic":
+            return SyntheticSource(args.synthetic_rate)
+        case _:
+            return SSHCandumpSource(credentials)
 
 
 if __name__ == "__main__":
@@ -275,42 +379,68 @@ if __name__ == "__main__":
     queue = multiprocessing.Queue()
     parent_conn, child_conn = multiprocessing.Pipe()
     cmd_queue = multiprocessing.Queue()
+    urgent_queue = multiprocessing.Queue()  # cansend commands sent ahead of cmd_queue's
     response_queue = multiprocessing.Queue()
     can_log_queue = multiprocessing.Queue()
+    can_log_stats = CANLogStats()
+    frame_ring = FrameRing(frame_ring_capacity)
     current_time = datetime.now()
     timestamp = current_time.strftime("%Y%m%d_%H%M%S")
     current_time = current_time.timestamp()  # convert to seconds since epoch
     credentials = config.get_SSH_credentials()
 
-    candump_proc = multiprocessing.Process(
-        target=candump_process, args=(queue, False, credentials)
-    )  # Testing mode set to false when run from main
+    replay_parent_conn, replay_child_conn = multiprocessing.Pipe()
+    frame_source = make_frame_source(args, credentials, replay_child_conn)
+    frame_source_proc = multiprocessing.Process(
+        target=frame_source.run, args=(queue, frame_ring, can_log_queue)
+    )
     temp_proc = multiprocessing.Process(
         target=temperature_reader, args=(child_conn, credentials)
     )
     cansend_proc = multiprocessing.Process(
         target=cansend_worker,
-        args=(cmd_queue, response_queue, can_log_queue, credentials),
+        args=(cmd_queue, response_queue, can_log_queue, credentials, urgent_queue),
     )
     can_logging_proc = multiprocessing.Process(
-        target=can_logging_process, args=(queue, can_log_queue, timestamp)
+        target=can_logging_process,
+        args=(queue, can_log_queue, timestamp, can_log_stats),
+        kwargs={
+            "compression": log_compression,
+            "rotate_bytes": log_rotate_bytes,
+            "rotate_secs": log_rotate_secs,
+        },
     )
 
-    candump_proc.start()
+    frame_source_proc.start()
     temp_proc.start()
     cansend_proc.start()
     can_logging_proc.start()
 
+    # Connect the GUI's own SSH connection (Docker buttons, visualizer) while the window loads
+    prewarm_ssh_client(credentials, timeout=5)
+
     # Cleanup (CTRL + C) initialization
     signal.signal(signal.SIGINT, key_interrupt_cleanup)
 
+    if args.dbc is not None:
+        load_dbc_frames(args.dbc)
+
     app = QApplication(sys.argv)
     for obj in all_objs:
         obj.initialize(timestamp)  # create QWidgets
     for mod in heartbeat_modules:
         mod.init_time(current_time)
     window = CANWindow(
-        queue, parent_conn, cmd_queue, response_queue, can_log_queue, timestamp
+        queue,
+        parent_conn,
+        cmd_queue,
+        response_queue,
+        can_log_queue,
+        timestamp,
+        frame_ring,
+        replay_parent_conn if args.source == "replay" else None,
+        can_log_stats,
+        urgent_queue,
     )
     window.initialize_joystick()  # Joystick initialization
     window.show()
@@ -326,6 +456,6 @@ if __name__ == "__main__":
         cleanup()
 
     if window.restart_requested:
-        restart(["--profile", window.restart_args])
+        restart(restart_argv(args, window.restart_args))
 
     sys.exit(exit_code)
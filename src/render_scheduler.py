@@ -0,0 +1,28 @@
+class RenderScheduler:
+    """
+    Redraws graph lines at a capped rate, separately from CAN frame processing\n
+    DataObjects only mark themselves dirty when their points change; each render() redraws
+    (setData) the dirty lines of graphs on screen. Lines of hidden graphs stay dirty until
+    their graph is shown, so many points (or ticks) in a row cost one redraw
+    """
+
+    def __init__(self, objs):
+        self.objs = objs  # not copied, so objects added later are included
+        self.redraw_count = 0  # lines redrawn
+        self.render_count = 0  # render() calls
+
+    def render(self) -> int:
+        """Redraws the dirty lines on visible graphs, returning how many were redrawn"""
+        redrawn = 0
+        for obj in self.objs:
+            if (
+                obj.dirty
+                and obj.graph_obj is not None
+                and obj.graph_obj.graph.isVisible()
+            ):
+                obj.update_line_data()
+                obj.dirty = False
+                redrawn += 1
+        self.redraw_count += redrawn
+        self.render_count += 1
+        return redrawn
@@ -0,0 +1,28 @@
+from config import signal_memory_budget
+
+
+class RetentionManager:
+    """
+    Holds the points stored by every DataObject to a memory budget per signal, and reports
+    how much memory they use\n
+    A signal's RingSeries are preallocated to what the budget leaves after its rollups, and
+    shrunk in enforce() if its decimator grows (eg. the graph is widened); the dict stores (eg.
+    the PID path and its arrows) drop their oldest points in enforce()
+    """
+
+    def __init__(self, objs, signal_budget: int = signal_memory_budget):
+        self.objs = objs  # not copied, so objects added later are included
+        self.signal_budget = signal_budget
+
+    def enforce(self):
+        for obj in self.objs:
+            obj.enforce_budget(self.signal_budget)
+
+    def usage(self) -> dict:
+        """{object name: bytes held by its stored points}"""
+        return {obj.name: obj.memory_usage() for obj in self.objs}
+
+    @property
+    def total_usage(self) -> int:
+        """Bytes held by the stored points of all objects"""
+        return sum(obj.memory_usage() for obj in self.objs)
@@ -0,0 +1,119 @@
+import numpy as np
+
+
+class RingSeries:
+    """
+    Time series of up to capacity (time, value) points in preallocated numpy arrays\n
+    Points are appended at the tail and trimmed from the head, so both are O(1) (trim() finds
+    its cut with a binary search, as times arrive in order). The arrays hold twice capacity
+    points: when the tail reaches their end, the live points are moved back to the start,
+    so times and values are always contiguous views (eg. for PlotDataItem.setData())\n
+    Appending to a full series drops its oldest point
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("RingSeries capacity must be positive")
+        self.capacity = capacity
+        self._times = np.empty(2 * capacity)
+        self._values = np.empty(2 * capacity)
+        self._head = 0  # index of the oldest point
+        self._tail = 0  # index after the newest point
+
+    @staticmethod
+    def capacity_for(nbytes: int) -> int:
+        """Capacity of the largest RingSeries whose arrays fit in nbytes (at least 1)"""
+        return max(1, nbytes // (4 * np.dtype(float).itemsize))
+
+    @classmethod
+    def for_budget(cls, nbytes: int) -> "RingSeries":
+        """The largest RingSeries whose arrays fit in nbytes"""
+        return cls(cls.capacity_for(nbytes))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the preallocated arrays (fixed, however many points are stored)"""
+        return self._times.nbytes + self._values.nbytes
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    @property
+    def times(self) -> np.ndarray:
+        """View of the points' times, oldest first (valid until the series next changes)"""
+        return self._times[self._head : self._tail]
+
+    @property
+    def values(self) -> np.ndarray:
+        """View of the points' values, oldest first (valid until the series next changes)"""
+        return self._values[self._head : self._tail]
+
+    def _make_room(self, count: int):
+        """Drops the oldest points so count more fit, and moves the points back to the start if needed"""
+        self._head = max(self._head, self._tail + count - self.capacity)
+        if self._tail + count > len(self._times):
+            length = len(self)
+            self._times[:length] = self._times[self._head : self._tail]
+            self._values[:length] = self._values[self._head : self._tail]
+            self._head, self._tail = 0, length
+
+    def append(self, time: float, value: float):
+        self._make_room(1)
+        self._times[self._tail] = time
+        self._values[self._tail] = value
+        self._tail += 1
+
+    def extend(self, times, values):
+        """append() for many points at once (arrays or lists of the same length)"""
+        times = np.asarray(times, dtype=float)[-self.capacity :]
+        values = np.asarray(values, dtype=float)[-self.capacity :]
+        count = len(times)
+        self._make_room(count)
+        self._times[self._tail : self._tail + count] = times
+        self._values[self._tail : self._tail + count] = values
+        self._tail += count
+
+    def insert(self, time: float, value: float):
+        """
+        Adds a point in time order, eg. one that arrived after newer ones; costs a move of the
+        points newer than it, so is for the odd late point (append() the rest)
+        """
+        self._make_room(1)
+        index = self._head + int(np.searchsorted(self.times, time, side="right"))
+        self._times[index + 1 : self._tail + 1] = self._times[index : self._tail]
+        self._values[index + 1 : self._tail + 1] = self._values[index : self._tail]
+        self._times[index] = time
+        self._values[index] = value
+        self._tail += 1
+
+    def last(self) -> tuple:
+        """(time, value) of the newest point, or (None, None) if there are none"""
+        if self._tail == self._head:
+            return None, None
+        return self._times[self._tail - 1].item(), self._values[self._tail - 1].item()
+
+    def trim(self, before: float) -> int:
+        """Drops the points with times before the given time, returning how many there were"""
+        count = int(np.searchsorted(self.times, before))
+        self._head += count
+        return count
+
+    def drop_from(self, time: float) -> int:
+        """Drops the points with times at or after the given time, returning how many there were"""
+        count = len(self) - int(np.searchsorted(self.times, time))
+        self._tail -= count
+        return count
+
+    def resize(self, capacity: int):
+        """Reallocates the arrays for capacity points, dropping the oldest points that don't fit"""
+        if capacity <= 0:
+            raise ValueError("RingSeries capacity must be positive")
+        times, values = self.times[-capacity:], self.values[-capacity:]
+        self.capacity = capacity
+        self._times, self._values = np.empty(2 * capacity), np.empty(2 * capacity)
+        self._head, self._tail = 0, len(times)
+        self._times[: self._tail] = times
+        self._values[: self._tail] = values
+
+    def clear(self):
+        self._head = self._tail = 0
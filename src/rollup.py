@@ -0,0 +1,213 @@
+import math
+
+import numpy as np
+
+from config import rollup_tiers
+
+BUCKET_DTYPE = np.dtype(
+    [
+        ("start", float),
+        ("min", float),
+        ("max", float),
+        ("sum", float),
+        ("count", np.int64),
+    ]
+)
+
+
+class RollupTier:
+    """
+    min, max, sum and count of a signal's values in width secs buckets (aligned to multiples of
+    width), for drawing long time spans without their raw points\n
+    Values are added to the open (newest) bucket; when a value falls in a later bucket, the
+    open one is completed: stored in a ring of the last capacity buckets (allocated with the
+    first one, so signals that never get data cost nothing) and added to the coarser tier.
+    A late value is merged into the completed bucket it falls in, or dropped if none is stored
+    """
+
+    def __init__(self, width: float, capacity: int, coarser: "RollupTier" = None):
+        self.width = width
+        self.capacity = capacity
+        self.coarser = coarser
+        self.finer = None  # the tier whose completed buckets are added to this one
+        self._buckets = None  # ring of completed buckets
+        self._count = 0  # completed buckets stored
+        self._next = 0  # ring index of the next completed bucket
+        self._open = None  # [start, min, max, sum, count] of the bucket being filled
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self._buckets is None else self._buckets.nbytes
+
+    def add(self, time: float, minn: float, maxn: float, total: float, count: int):
+        """Adds a value (minn = maxn = total, count 1) or a finer tier's bucket starting at time"""
+        start = math.floor(time / self.width) * self.width
+        bucket = self._open
+        if bucket is not None and start == bucket[0]:
+            if minn < bucket[1]:
+                bucket[1] = minn
+            if maxn > bucket[2]:
+                bucket[2] = maxn
+            bucket[3] += total
+            bucket[4] += count
+            return
+        if bucket is not None:
+            if start < bucket[0]:  # a late value
+                self._merge(start, minn, maxn, total, count)
+                return
+            self._complete(bucket)
+        self._open = [start, minn, maxn, total, count]
+
+    def extend(self, times: np.ndarray, values: np.ndarray):
+        """add() for many values at once (in time order)"""
+        starts = np.floor(times / self.width) * self.width
+        edges = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+        buckets = zip(
+            starts[edges].tolist(),
+            np.minimum.reduceat(values, edges).tolist(),
+            np.maximum.reduceat(values, edges).tolist(),
+            np.add.reduceat(values, edges).tolist(),
+            np.diff(np.r_[edges, len(values)]).tolist(),
+        )
+        for bucket in buckets:
+            self.add(*bucket)
+
+    def _complete(self, bucket: list):
+        if self._buckets is None:
+            self._buckets = np.empty(self.capacity, BUCKET_DTYPE)
+        self._buckets[self._next] = tuple(bucket)
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        if self.coarser is not None:
+            self.coarser.add(*bucket)
+
+    def _merge(self, start: float, minn: float, maxn: float, total: float, count: int):
+        """Adds a late value to the completed bucket starting at start (and the coarser tier's)"""
+        # Newest first, as late values are rarely old
+        for age in range(1, self._count + 1):
+            bucket = self._buckets[(self._next - age) % self.capacity]
+            if bucket["start"] <= start:
+                break
+        else:
+            return
+        if bucket["start"] != start:
+            return  # no values were in that bucket's time, so it isn't stored
+        bucket["min"] = min(bucket["min"], minn)
+        bucket["max"] = max(bucket["max"], maxn)
+        bucket["sum"] += total
+        bucket["count"] += count
+        if self.coarser is not None:
+            self.coarser.add(start, minn, maxn, total, count)
+
+    def _pending(self) -> list:
+        """Buckets not completed yet: the open one, plus the values in finer tiers' open buckets"""
+        pending = [] if self._open is None else [list(self._open)]
+        for bucket in [] if self.finer is None else self.finer._pending():
+            start = math.floor(bucket[0] / self.width) * self.width
+            if pending and pending[-1][0] == start:
+                merged = pending[-1]
+                merged[1] = min(merged[1], bucket[1])
+                merged[2] = max(merged[2], bucket[2])
+                merged[3] += bucket[3]
+                merged[4] += bucket[4]
+            else:
+                pending.append([start, *bucket[1:]])
+        return pending
+
+    def buckets(self) -> np.ndarray:
+        """The stored buckets (completed, then pending), oldest first, as BUCKET_DTYPE records"""
+        if self._count == self.capacity:
+            completed = np.concatenate(
+                (self._buckets[self._next :], self._buckets[: self._next])
+            )
+        elif self._count:
+            completed = self._buckets[: self._count]
+        else:
+            completed = np.empty(0, BUCKET_DTYPE)
+        pending = [tuple(bucket) for bucket in self._pending()]
+        if not pending:
+            return completed
+        return np.concatenate((completed, np.array(pending, BUCKET_DTYPE)))
+
+    def first_start(self) -> float:
+        """Start of the oldest stored bucket (inf if there are none)"""
+        if self._count:
+            return self._buckets[self._next if self._count == self.capacity else 0][
+                "start"
+            ].item()
+        pending = self._pending()
+        return pending[0][0] if pending else math.inf
+
+    def points(self, start: float, end: float) -> tuple:
+        """
+        (times, values) to draw the buckets ending in (start, end]: each bucket's min at its
+        start and max at its middle, so spikes show however far the view is zoomed out
+        """
+        buckets = self.buckets()
+        ends = buckets["start"] + self.width
+        buckets = buckets[(ends > start) & (ends <= end)]
+        times = np.column_stack(
+            (buckets["start"], buckets["start"] + self.width / 2)
+        ).ravel()
+        values = np.column_stack((buckets["min"], buckets["max"])).ravel()
+        return times, values
+
+    def clear(self):
+        """Drops every bucket, and the coarser tiers' (made from them)"""
+        self._count = self._next = 0
+        self._open = None
+        if self.coarser is not None:
+            self.coarser.clear()
+
+
+class Rollups:
+    """
+    A signal's rollup tiers (config.rollup_tiers, eg. 1 s, 10 s and 1 min buckets), finest
+    first. Values are only added to the finest tier; each completed bucket is added to the
+    next coarser one, so keeping every tier up to date costs one bucket update per value
+    """
+
+    def __init__(self, tiers=rollup_tiers):
+        self.tiers = []
+        coarser = None
+        for width, capacity in reversed(tiers):
+            coarser = RollupTier(width, capacity, coarser)
+            self.tiers.insert(0, coarser)
+        for finer, tier in zip(self.tiers, self.tiers[1:]):
+            tier.finer = finer
+
+    @property
+    def nbytes(self) -> int:
+        return sum(tier.nbytes for tier in self.tiers)
+
+    @property
+    def max_nbytes(self) -> int:
+        """Bytes the tiers hold once every one is allocated (on their first completed bucket)"""
+        return sum(tier.capacity for tier in self.tiers) * BUCKET_DTYPE.itemsize
+
+    def add(self, time: float, value: float):
+        if not math.isnan(value):  # missing values aren't rolled up
+            self.tiers[0].add(time, value, value, value, 1)
+
+    def extend(self, times: np.ndarray, values: np.ndarray):
+        """add() for many values at once (in time order)"""
+        times = np.asarray(times, dtype=float)
+        values = np.asarray(values, dtype=float)
+        present = ~np.isnan(values)
+        if not present.all():
+            times, values = times[present], values[present]
+        if len(times):
+            self.tiers[0].extend(times, values)
+
+    def tier_for(self, start: float, end: float, pixels: int) -> RollupTier:
+        """
+        The finest tier with at most one bucket per pixel over [start, end) that still holds
+        buckets from start, or the coarsest tier if none does
+        """
+        for tier in self.tiers:
+            if (end - start) / tier.width <= pixels and tier.first_start() <= start:
+                return tier
+        return self.tiers[-1]
+
+    def clear(self):
+        self.tiers[0].clear()
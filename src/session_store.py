@@ -0,0 +1,209 @@
+import bisect
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+from config import session_flush_freq, session_index_stride
+
+POINT_DTYPE = np.dtype([("time", "<f8"), ("value", "<f8")])
+INDEX_DTYPE = np.dtype([("time", "<f8"), ("row", "<i8")])
+MANIFEST_NAME = "manifest.json"
+
+
+def load_signal(path: str) -> np.ndarray:
+    """
+    A signal file's (time, value) records, memory mapped; eg. for offline analysis:
+    points = load_signal("logs/session_20250101_120000/Rudder.f64"); points["time"], points["value"]
+    """
+    if not os.path.getsize(path):
+        return np.empty(0, POINT_DTYPE)
+    return np.memmap(path, POINT_DTYPE, mode="r")
+
+
+class SignalStore:
+    """
+    One signal's points, appended to a file of little endian float64 (time, value) records
+    (POINT_DTYPE) and read back through a memory map\n
+    Appends are buffered until flush() (on SessionStore's writing thread), which creates the
+    files on first use. The time of every index_stride-th record is also written, with its row,
+    to a .idx file (INDEX_DTYPE): a sparse index so read() only maps the part of the file
+    holding the requested times. read() takes points not yet written from memory, so it never
+    waits on disk
+    """
+
+    def __init__(self, path: str, index_stride: int = session_index_stride):
+        self.path = path
+        self.index_path = os.path.splitext(path)[0] + ".idx"
+        self.index_stride = index_stride
+        self._file = None
+        self._index_file = None
+        # Appends and reads (on the GUI thread) vs flush() (on the writing thread)
+        self._lock = threading.Lock()
+        self._times = []  # appended points not yet written
+        self._values = []
+        self._writing = None  # records being written by flush()
+        self.rows = 0  # records written
+        self._index_times = []  # in memory copy of the .idx file
+        self._index_rows = []
+
+    def append(self, time: float, value: float):
+        with self._lock:
+            self._times.append(time)
+            self._values.append(value)
+
+    def extend(self, times, values):
+        """append() for many points at once (arrays or lists of the same length)"""
+        times = np.asarray(times, dtype=float).tolist()
+        values = np.asarray(values, dtype=float).tolist()
+        with self._lock:
+            self._times.extend(times)
+            self._values.extend(values)
+
+    def flush(self):
+        """Writes the appended points (and their index entries) to the files"""
+        with self._lock:
+            if not self._times:
+                return
+            records = np.empty(len(self._times), POINT_DTYPE)
+            records["time"] = self._times
+            records["value"] = self._values
+            self._times, self._values = [], []
+            self._writing = records
+        if self._file is None:
+            self._file = open(self.path, "ab")
+            self._index_file = open(self.index_path, "ab")
+        self._file.write(records.tobytes())
+        self._file.flush()
+
+        first = -(-self.rows // self.index_stride) * self.index_stride
+        rows = np.arange(first, self.rows + len(records), self.index_stride)
+        if len(rows):
+            index = np.empty(len(rows), INDEX_DTYPE)
+            index["time"] = records["time"][rows - self.rows]
+            index["row"] = rows
+            self._index_file.write(index.tobytes())
+            self._index_file.flush()
+        with self._lock:
+            if len(rows):
+                self._index_times.extend(index["time"].tolist())
+                self._index_rows.extend(rows.tolist())
+            self.rows += len(records)
+            self._writing = None
+
+    def read(self, start: float, end: float) -> tuple:
+        """
+        (times, values) of the points with times in [start, end): memory mapped views of the
+        written ones, followed by copies of any not written yet
+        """
+        with self._lock:
+            # Rows from the last index entry before start to the first one at or after end
+            before = bisect.bisect_right(self._index_times, start) - 1
+            after = bisect.bisect_left(self._index_times, end)
+            first = self._index_rows[before] if before >= 0 else 0
+            last = (
+                self._index_rows[after] if after < len(self._index_rows) else self.rows
+            )
+            pending = np.empty(len(self._times), POINT_DTYPE)
+            pending["time"] = self._times
+            pending["value"] = self._values
+            if self._writing is not None:
+                pending = np.concatenate((self._writing, pending))
+        if last > first:
+            records = np.memmap(
+                self.path,
+                POINT_DTYPE,
+                mode="r",
+                offset=first * POINT_DTYPE.itemsize,
+                shape=(last - first,),
+            )
+        else:
+            records = np.empty(0, POINT_DTYPE)
+        if len(pending):
+            records = np.concatenate((records, pending))
+        times = records["time"]
+        records = records[np.searchsorted(times, start) : np.searchsorted(times, end)]
+        return records["time"], records["value"]
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._index_file.close()
+
+
+class SessionStore:
+    """
+    The SignalStores of one session, in directory: a <signal>.f64 and <signal>.idx per signal
+    with data, plus a manifest.json of the record formats and each of those signals' file\n
+    A background thread flush()es the stores every flush_interval secs, so the GUI thread only
+    buffers points and never waits on disk
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        index_stride: int = session_index_stride,
+        flush_interval: float = session_flush_freq / 1000,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.index_stride = index_stride
+        self.flush_interval = flush_interval
+        self.signals = {}  # signal name: SignalStore
+        self._manifest_signals = 0  # signals with files when the manifest was written
+        self._closing = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def signal(self, name: str) -> SignalStore:
+        """The store for name, created on first use"""
+        if name not in self.signals:
+            stem = re.sub(r"[^\w.-]+", "_", name)
+            files = {os.path.basename(store.path) for store in self.signals.values()}
+            file_name, n = f"{stem}.f64", 1
+            while file_name in files:
+                n += 1
+                file_name = f"{stem}_{n}.f64"
+            self.signals[name] = SignalStore(
+                os.path.join(self.directory, file_name), self.index_stride
+            )
+        return self.signals[name]
+
+    def _write_manifest(self, stored: dict):
+        manifest = {
+            "point_dtype": POINT_DTYPE.descr,
+            "index_dtype": INDEX_DTYPE.descr,
+            "index_stride": self.index_stride,
+            "signals": {
+                name: os.path.basename(store.path) for name, store in stored.items()
+            },
+        }
+        with open(os.path.join(self.directory, MANIFEST_NAME), "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+    def flush(self):
+        signals = dict(self.signals)  # signals may be added by the GUI thread meanwhile
+        for store in signals.values():
+            store.flush()
+        stored = {name: store for name, store in signals.items() if store.rows}
+        if len(stored) != self._manifest_signals:
+            self._write_manifest(stored)
+            self._manifest_signals = len(stored)
+
+    def _run(self):
+        while not self._closing.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error writing session store: {e}")
+
+    def close(self):
+        """Stops the writing thread, then writes the remaining points and closes the files"""
+        self._closing.set()
+        self._thread.join()
+        self.flush()
+        for store in self.signals.values():
+            store.close()
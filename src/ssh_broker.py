@@ -0,0 +1,75 @@
+import threading
+
+import paramiko
+
+### ----------  SSH Connection Broker ---------- ###
+# Every SSH user in a process (workers, Docker buttons, the visualizer tunnel...) shares one
+# authenticated connection per profile instead of paying for a new handshake each time.
+# Each user opens its own channel(s) on the shared Transport, eg. with client.exec_command()
+# NOTE: a paramiko Transport can't be passed to another process, so each process has its own
+
+_clients: dict[tuple[str, str, str], paramiko.SSHClient] = {}
+_lock = threading.Lock()
+
+
+def get_ssh_client(
+    credentials: tuple[str, str, str], timeout: float = None
+) -> paramiko.SSHClient:
+    """
+    Returns the connected SSHClient for credentials (hostname, username, password),
+    connecting (or reconnecting if the connection dropped) only if needed\n
+    Users must not close() the client; call close_ssh_clients() on exit instead.
+    Connecting happens outside the lock, so a slow or unreachable host never holds up
+    callers past their own timeout
+    """
+    with _lock:
+        client = _active_client(credentials)
+        if client is not None:
+            return client
+
+    hostname, username, password = credentials
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    client.connect(
+        hostname=hostname, username=username, password=password, timeout=timeout
+    )
+
+    with _lock:
+        published = _active_client(credentials)
+        if published is not None:  # another caller connected meanwhile: share theirs
+            client.close()
+            return published
+        _clients[credentials] = client
+        return client
+
+
+def _active_client(credentials: tuple[str, str, str]) -> paramiko.SSHClient:
+    """The published client for credentials if still connected (closing it if not); _lock held"""
+    client = _clients.get(credentials)
+    transport = None if client is None else client.get_transport()
+    if transport is not None and transport.is_active():
+        return client
+    if client is not None:
+        client.close()
+        del _clients[credentials]
+    return None
+
+
+def prewarm_ssh_client(credentials: tuple[str, str, str], timeout: float = None):
+    """Connects in the background so the first user does not wait for the handshake"""
+
+    def connect():
+        try:
+            get_ssh_client(credentials, timeout)
+        except Exception as e:
+            print(f"[SSH] could not connect in the background: {e}")
+
+    threading.Thread(target=connect, daemon=True).start()
+
+
+def close_ssh_clients():
+    """Closes every connection opened in this process"""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
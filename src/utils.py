@@ -1,11 +1,13 @@
 import math
 import struct
+from functools import partial
 
 # TODO: improve imports - per utils_old.py
 # '''
 from pyqtgraph import mkBrush
 
 import config as cg
+from can_frame import format_frame_id
 from data_object import (
     AIS_Attributes,
     AISObject,
@@ -16,6 +18,8 @@ from data_object import (
     PIDObject,
     ais_attributes,
 )
+from dbc import dbc_frame_spec, load_dbc, signal_dp
+from frame_signals import FrameSpec, Signal, range_check  # noqa F401
 from heartbeat_module import HeartbeatModule
 
 # '''
@@ -75,6 +79,14 @@ def val(raw_bytes, s, e, div) -> float:
     return int.from_bytes(raw_bytes[s:e], "little") / div
 
 
+def to_raw_bytes(data: bytes | str) -> bytes:
+    """
+    Frame payloads arrive from candump_process as bytes; hex strings (eg. "5e87010040")
+    are also accepted so frames can be parsed by hand
+    """
+    return bytes.fromhex(data) if isinstance(data, str) else bytes(data)
+
+
 def convert_float_to_binary32hex(val: float) -> str:
     """
     Return a 8-character lowercase hex string in big endian byte order
@@ -83,29 +95,13 @@ def convert_float_to_binary32hex(val: float) -> str:
     return f"{struct.unpack('!I', struct.pack('!f', val))[0]:08x}"
 
 
-# NOTE: Currently returns True/False, but parsing functions don't do anything with this return value as of yet - it just prints it as a notice
-# NOTE: May add functionality to also log if a given data point is out of range (ie. is sus)
-def range_check(quantity, num, minn=None, maxn=None):
-    """Prints error and returns False if given num is not within [min, max] (inclusive); if None is given for either max or min, that boundary is not checked."""
-    if num is None:
-        print(f"Warning: {quantity} passed to range_check was None")
-        return
-    if maxn is not None and num > maxn:
-        print(f"ERROR - {quantity} {num} is higher than expected range")
-        return False
-    if minn is not None and num < minn:
-        print(f"ERROR - {quantity} {num} is lower than expected range")
-        return False
-    return True
-
-
 ### ----------  Parsing Data Frames  ---------- ###
 # TODO: put type hinting for params and return type for all data parsing functions
 
 
-def parse_0x001_frame(data_hex: str) -> dict:
+def parse_0x001_frame(data: bytes | str) -> dict:
     # TODO: this first bytes length check can DEFINITELY be factored out of like all parsing functions
-    raw_bytes = bytes.fromhex(data_hex)
+    raw_bytes = to_raw_bytes(data)
     if len(raw_bytes) != 5:
         raise ValueError("Incorrect data length (num bytes): ID 0x001")
 
@@ -117,8 +113,8 @@ def parse_0x001_frame(data_hex: str) -> dict:
     }
 
 
-def parse_0x206_frame(data_hex):
-    raw_bytes = bytes.fromhex(data_hex)
+def parse_0x206_frame(data: bytes | str):
+    raw_bytes = to_raw_bytes(data)
     if len(raw_bytes) != 24:
         raise ValueError("Incorrect data length (num bytes): ID 0x206")
 
@@ -138,8 +134,8 @@ def parse_0x206_frame(data_hex):
     }
 
 
-def parse_0x204_frame(data_hex):
-    raw_bytes = bytes.fromhex(data_hex)
+def parse_0x204_frame(data: bytes | str):
+    raw_bytes = to_raw_bytes(data)
     if len(raw_bytes) != 16:
         raise ValueError("Incorrect data length (num bytes): ID 0x204")
 
@@ -167,8 +163,8 @@ def set_rudder_parsing_fn(parsed_dict):
     return parsed_dict[set_rudder_obj.name]
 
 
-def parse_wind_sensor_frame(data_hex):
-    raw_bytes = bytes.fromhex(data_hex)
+def parse_wind_sensor_frame(data: bytes | str):
+    raw_bytes = to_raw_bytes(data)
     if len(raw_bytes) != 4:
         raise ValueError("Incorrect data length (num bytes): ID 0x041")
 
@@ -179,8 +175,8 @@ def parse_wind_sensor_frame(data_hex):
     }
 
 
-def parse_sail_wind_sensor_frame(data_hex):
-    raw_bytes = bytes.fromhex(data_hex)
+def parse_sail_wind_sensor_frame(data: bytes | str):
+    raw_bytes = to_raw_bytes(data)
     if len(raw_bytes) != 4:
         raise ValueError("Incorrect data length (num bytes): ID 0x040")
 
@@ -192,19 +188,19 @@ def parse_sail_wind_sensor_frame(data_hex):
 
 
 # Salinity data frame
-def parse_0x120_frame(data_hex):
-    raw_bytes = bytes.fromhex(data_hex)
+def parse_0x120_frame(data: bytes | str):
+    raw_bytes = to_raw_bytes(data)
     if len(raw_bytes) != 4:
         raise ValueError("Incorrect data length (num bytes): ID 0x120")
 
     # Conductivity in µS/cm * 1000
     # raw = int.from_bytes(raw_bytes, "little") # is raw_bytes[0:2] really necessary?
-    raw = convert_from_little_endian_str(data_hex)
+    raw = int.from_bytes(raw_bytes, "little")
     actual = raw / (1000)
 
     if actual < 1 and actual != 0 or actual > 550000:
         print(f"[ERROR]: sal data parsed as {actual}")
-        print(f"data_hex = {data_hex}")
+        print(f"data = {raw_bytes.hex()}")
         print(f"raw = {raw}")
         raise ValueError()
 
@@ -220,23 +216,23 @@ def parse_0x120_frame(data_hex):
 
 
 # Salinity parsing function
-def sal_parsing_fn(data_hex):
+def sal_parsing_fn(data: bytes | str):
     """
     Parses data for salinity 0x12X frame\n
     In particular, this function also calculates rounding since
     accurate rounding depends on the magnitude of the value recorded
     """
-    raw_bytes = bytes.fromhex(data_hex)
+    raw_bytes = to_raw_bytes(data)
     if len(raw_bytes) != 4:
         raise ValueError("Incorrect data length (num bytes): ID 0x120")
 
     # Conductivity in µS/cm * 1000
-    raw = convert_from_little_endian_str(data_hex)
+    raw = int.from_bytes(raw_bytes, "little")
     actual = raw / (1000)
 
     if actual < 1 and actual != 0 or actual > 550000:
         print(f"[ERROR]: sal data parsed as {actual}")
-        print(f"data_hex = {data_hex}")
+        print(f"data = {raw_bytes.hex()}")
         print(f"raw = {raw}")
         raise ValueError()
 
@@ -252,40 +248,40 @@ def sal_parsing_fn(data_hex):
 
 
 # pH data frame
-def parse_0x110_frame(data_hex):
-    raw_bytes = bytes.fromhex(data_hex)
+def parse_0x110_frame(data: bytes | str):
+    raw_bytes = to_raw_bytes(data)
     if len(raw_bytes) != 2:
         raise ValueError(
             f"Incorrect data length (num bytes): ID 0x110\nExpecting: 2 bytes, Received: {len(raw_bytes)}"
         )
 
     # pH is in format of pH * 1000
-    raw = convert_from_little_endian_str(data_hex)
+    raw = int.from_bytes(raw_bytes, "little")
     actual = raw / 1000
 
     if actual < 1 and actual != 0 or actual > 14:
         print(f"[ERROR]: pH data parsed as {actual}")
-        print(f"data_hex = {data_hex}")
+        print(f"data = {raw_bytes.hex()}")
         print(f"raw = {raw}")
         raise ValueError()
 
     return {"pH": round(actual, 2)}
 
 
-def pH_parsing_fn(data_hex):
-    raw_bytes = bytes.fromhex(data_hex)
+def pH_parsing_fn(data: bytes | str):
+    raw_bytes = to_raw_bytes(data)
     if len(raw_bytes) != 2:
         raise ValueError(
             f"Incorrect data length (num bytes): ID 0x110\nExpecting: 2 bytes, Received: {len(raw_bytes)}"
         )
 
     # pH is in format of pH * 1000
-    raw = convert_from_little_endian_str(data_hex)
+    raw = int.from_bytes(raw_bytes, "little")
     actual = raw / 1000
 
     if actual < 1 and actual != 0 or actual > 14:
         print(f"[ERROR]: pH data parsed as {actual}")
-        print(f"data_hex = {data_hex}")
+        print(f"data = {raw_bytes.hex()}")
         print(f"raw = {raw}")
         raise ValueError()
 
@@ -293,54 +289,49 @@ def pH_parsing_fn(data_hex):
 
 
 # temp data frame
-def parse_0x100_frame(data_hex):
-    raw_bytes = bytes.fromhex(data_hex)
+def parse_0x100_frame(data: bytes | str):
+    raw_bytes = to_raw_bytes(data)
     if len(raw_bytes) != 3:
         raise ValueError("Incorrect data length (num bytes): ID 0x100")
 
     # temp is in format of temp * 1000
     # raw = int.from_bytes(raw_bytes, "little") # is raw_bytes[0:2] really necessary?
     # actual = raw / 1000
-    raw = convert_from_little_endian_str(data_hex)
+    raw = int.from_bytes(raw_bytes, "little")
     actual = (raw / 1000.0) - 273.15
 
     if actual < -130 and actual != 0 or actual > 1350:
         print(f"[ERROR]: temp_sensor data parsed as {actual}")
-        print(f"data_hex = {data_hex}")
+        print(f"data = {raw_bytes.hex()}")
         print(f"raw = {raw}")
         raise ValueError()
 
     return {"temp_sensor": round(actual, 3)}
 
 
-def temp_sensor_parsing_fn(data_hex):
-    raw_bytes = bytes.fromhex(data_hex)
+def temp_sensor_parsing_fn(data: bytes | str):
+    raw_bytes = to_raw_bytes(data)
     if len(raw_bytes) != 3:
         raise ValueError("Incorrect data length (num bytes): ID 0x100")
 
     # temp is in format of temp * 1000
-    raw = convert_from_little_endian_str(data_hex)
+    raw = int.from_bytes(raw_bytes, "little")
     actual = (raw / 1000.0) - 273.15
 
     if actual < -130 and actual != 0 or actual > 1350:
         print(f"[ERROR]: temp_sensor data parsed as {actual}")
-        print(f"data_hex = {data_hex}")
+        print(f"data = {raw_bytes.hex()}")
         print(f"raw = {raw}")
         raise ValueError()
 
     return actual
 
 
-def parse_0x070_frame(data_hex):
-    raw_bytes = bytes.fromhex(data_hex)
-    if len(raw_bytes) != 20:
-        raise ValueError("Incorrect data length (num bytes): ID 0x070")
-
-    # temp is in format of temp * 1000
-    # val = lambda s, e, div: int.from_bytes(raw_bytes[s:e], 'little') / div
-    gps_lat_data = val(raw_bytes, 0, 4, 1000000) - 90
-    gps_lon_data = val(raw_bytes, 4, 8, 1000000) - 180
-
+def gps_pid_offsets(gps_lat_data: float, gps_lon_data: float) -> tuple[float, float]:
+    """
+    Returns POLARIS's (NS, EW) offset in m from the first GPS fix, which is set as the
+    reference point (and gives offsets of 0)
+    """
     # Convert Decimal Degrees to offset (or first fix)
     pid_y_data = 0
     pid_x_data = 0
@@ -371,6 +362,21 @@ def parse_0x070_frame(data_hex):
     #     pid_y_data = (gps_lat_data - pid_y_obj.ref) * 110562 # change in lat multiplied by rough arc length (using conversion to km from 68.7 miles)
     #     pid_x_data = (gps_lon_data - pid_x_obj.ref) * math.cos(math.radians(pid_x_obj.ref)) * 111320 # constant from google (equatorial distance between longitude lines)
 
+    return pid_y_data, pid_x_data
+
+
+def parse_0x070_frame(data: bytes | str):
+    raw_bytes = to_raw_bytes(data)
+    if len(raw_bytes) != 20:
+        raise ValueError("Incorrect data length (num bytes): ID 0x070")
+
+    # temp is in format of temp * 1000
+    # val = lambda s, e, div: int.from_bytes(raw_bytes[s:e], 'little') / div
+    gps_lat_data = val(raw_bytes, 0, 4, 1000000) - 90
+    gps_lon_data = val(raw_bytes, 4, 8, 1000000) - 180
+
+    pid_y_data, pid_x_data = gps_pid_offsets(gps_lat_data, gps_lon_data)
+
     parsed = {
         # actual_rudder_obj.name: val(0, 2, 100.0) - 90,
         gps_lat_obj.name: gps_lat_data,
@@ -391,8 +397,8 @@ def parse_0x070_frame(data_hex):
     return parsed
 
 
-def parse_0x060_frame(data_hex, current_time):
-    raw_bytes = bytes.fromhex(data_hex)
+def parse_0x060_frame(data: bytes | str, current_time):
+    raw_bytes = to_raw_bytes(data)
     if len(raw_bytes) < 25:  # candump pads the frame to make it 32 bytes
         print("number of raw_bytes = ", len(raw_bytes))
         raise ValueError("Incorrect data length (num bytes): ID 0x060")
@@ -770,6 +776,270 @@ graph_objs = [
 ]
 
 
+### ---------- Frame Signal Table ---------- ###
+# Declarative versions of the parse_0x..._frame functions above: each FrameSpec compiles to one
+# struct unpack, and tests/test_frame_signals.py checks both give identical output
+_ais_dp = partial(round, ndigits=ais_obj.dp)
+
+frame_specs = [
+    FrameSpec(
+        0x001,
+        5,
+        [
+            Signal("steering_selection_bit", 4, 1, mask=0x80, cast=bool),
+            Signal("steering_enable_bit", 4, 1, mask=0x40, cast=bool),
+            Signal(desired_heading_obj.name, 0, 4, 1000),
+            Signal(set_rudder_obj.name, 0, 4, 1000, 90),
+        ],
+    ),
+    FrameSpec(
+        0x040,
+        4,
+        [
+            Signal(sail_wind_dir_obj.name, 0, 2, 1.0),
+            Signal(sail_wind_spd_obj.name, 2, 2, 10.0),
+        ],
+    ),
+    FrameSpec(
+        0x041,
+        4,
+        [
+            Signal(data_wind_dir_obj.name, 0, 2, 1.0),
+            Signal(data_wind_spd_obj.name, 2, 2, 10.0),
+        ],
+    ),
+    FrameSpec(
+        0x060,
+        25,
+        [
+            Signal(AIS_Attributes.SID, 0, 4, cast=int),
+            Signal(
+                AIS_Attributes.LATITUDE,
+                4,
+                4,
+                1000000,
+                90,
+                cast=_ais_dp,
+                minn=-90,
+                maxn=90,
+            ),
+            Signal(
+                AIS_Attributes.LONGITUDE,
+                8,
+                4,
+                1000000,
+                180,
+                cast=_ais_dp,
+                minn=-180,
+                maxn=180,
+            ),
+            Signal(
+                AIS_Attributes.SOG,
+                12,
+                2,
+                10,
+                na=AIS_Attributes.SOG_NA.value,
+                cast=round,
+                minn=0,
+            ),
+            Signal(
+                AIS_Attributes.COG,
+                14,
+                2,
+                10,
+                na=AIS_Attributes.COG_NA.value,
+                cast=round,
+            ),
+            Signal(
+                AIS_Attributes.HEADING,
+                16,
+                2,
+                na=AIS_Attributes.HEADING_NA.value,
+                cast=round,
+            ),
+            Signal(
+                AIS_Attributes.ROT,
+                18,
+                1,
+                1,
+                128,
+                na=AIS_Attributes.ROT_NA.value + 128,
+                cast=round,
+            ),
+            Signal(
+                AIS_Attributes.LENGTH,
+                19,
+                2,
+                na=AIS_Attributes.LENGTH_NA.value,
+                cast=int,
+            ),
+            Signal(
+                AIS_Attributes.WIDTH, 21, 2, na=AIS_Attributes.WIDTH_NA.value, cast=int
+            ),
+            Signal(AIS_Attributes.IDX, 23, 1, cast=int),
+            Signal(AIS_Attributes.TOTAL, 24, 1, cast=int),
+        ],
+        padded=True,  # candump pads the frame to make it 32 bytes
+    ),
+    FrameSpec(
+        0x070,
+        20,
+        [
+            Signal(gps_lat_obj.name, 0, 4, 1000000, 90, minn=-90, maxn=90),
+            Signal(gps_lon_obj.name, 4, 4, 1000000, 180, minn=-180, maxn=180),
+            Signal(spd_over_gnd_obj.name, 16, 4, 1000, minn=0),
+        ],
+    ),
+    FrameSpec(
+        0x204,
+        16,
+        [
+            Signal(actual_rudder_obj.name, 0, 2, 100.0, 90),
+            Signal(imu_roll_obj.name, 2, 2, 100.0, 180),
+            Signal(imu_pitch_obj.name, 4, 2, 100.0, 180),
+            Signal(imu_heading_obj.name, 6, 2, 100.0),
+            Signal(set_rudder_obj.name, 8, 2, 100.0, 90),
+            Signal(integral_obj.name, 10, 2, 1.0, cg.integral_offset),
+            Signal(derivative_obj.name, 12, 2, 1.0, cg.derivative_offset),
+            Signal(spd_over_gnd_obj.name, 14, 2, 1000.0),
+        ],
+    ),
+    FrameSpec(
+        0x206,
+        24,
+        [
+            Signal(volt2_obj.name, 0, 2, 1000.0),
+            Signal(temp1_obj.name, 2, 2, 100.0),
+            Signal(volt3_obj.name, 4, 2, 1000.0),
+            Signal(temp2_obj.name, 6, 2, 100.0),
+            Signal(temp3_obj.name, 8, 2, 100.0),
+            Signal(volt4_obj.name, 10, 2, 1000.0),
+            Signal(volt1_obj.name, 12, 2, 1000.0),
+            Signal(mppt_hp_obj.name, 14, 2, 1000.0),
+            Signal(mppt_hs_obj.name, 16, 2, 1000.0),
+            Signal(mppt_sp_obj.name, 18, 2, 1000.0),
+            Signal(mppt_ss_obj.name, 20, 2, 1000.0),
+        ],
+    ),
+]
+frame_decoders = {spec.frame_id: spec.decode for spec in frame_specs}
+# High-rate frames the GUI decodes a tick at a time, with FrameSpec.decode_batch()
+batch_specs = {
+    spec.frame_id: spec for spec in frame_specs if spec.frame_id in cg.batch_decoded_ids
+}
+
+
+def decode_0x060_frame(data: bytes | str, current_time) -> dict:
+    """Table version of parse_0x060_frame()"""
+    parsed = frame_decoders[0x060](data)
+    parsed[cg.LAST_UPDATED] = current_time
+    return parsed
+
+
+def decode_0x070_frame(data: bytes | str) -> dict:
+    """Table version of parse_0x070_frame(), adding the offsets and headings pid_obj graphs"""
+    parsed = frame_decoders[0x070](data)
+    parsed[pid_obj.y_name], parsed[pid_obj.x_name] = gps_pid_offsets(
+        parsed[gps_lat_obj.name], parsed[gps_lon_obj.name]
+    )
+    parsed[cg.desired_heading_arrow_name] = desired_heading_obj.get_current()[1]
+    parsed[cg.actual_heading_arrow_name] = imu_heading_obj.get_current()[1]
+    return parsed
+
+
+### ---------- DBC Frames ---------- ###
+dbc_frames = {}  # frame_id: DataObjects a --dbc frame feeds beyond its frame signal table ones
+
+
+def load_dbc_frames(path: str) -> dict:
+    """
+    Decodes the frames of the .dbc file at path with its layouts, replacing the frame signal
+    table's layout of any frame it redefines\n
+    Signals named after an existing DataObject feed it (as before if the frame signal table
+    has the signal for that frame, otherwise through dbc_frames); every other signal gets a
+    DataObject (graphed with the frame's other signals of the same unit, and logged in the
+    values csv file), listed in dbc_frames for the window's frame router\n
+    Must be called before the DataObjects are initialized; returns dbc_frames
+    """
+    known_objs = {obj.name: obj for obj in all_objs}
+    table_names = {
+        spec.frame_id: {signal.name for signal in spec.signals} for spec in frame_specs
+    }
+    dropdown_labels = {graph.dropdown_label for graph in graph_objs}
+    for message in load_dbc(path):
+        try:
+            spec = dbc_frame_spec(message)
+        except ValueError as e:
+            print(f"Warning: .dbc frame not decoded - {e}")
+            continue
+        missing = table_names.get(spec.frame_id, set()) - {
+            signal.name for signal in spec.signals
+        }
+        if missing:
+            print(
+                f"Warning: .dbc frame {format_frame_id(spec.frame_id)} not decoded - missing signals {sorted(missing)}"
+            )
+            continue
+        frame_decoders[spec.frame_id] = spec.decode
+        if spec.frame_id in cg.batch_decoded_ids:
+            batch_specs[spec.frame_id] = spec
+        # The message's signals the spec decodes (eg. not those with a factor of 0)
+        names = {signal.name for signal in spec.signals}
+        decoded = [signal for signal in message["signals"] if signal["name"] in names]
+
+        # Existing DataObjects this frame carries that its table route doesn't feed already
+        fed = [
+            known_objs[signal["name"]]
+            for signal in decoded
+            if signal["name"] in known_objs
+            and signal["name"] not in table_names.get(spec.frame_id, set())
+        ]
+
+        # One graph per unit, so signals sharing a y axis share a unit
+        units = {}
+        for signal in decoded:
+            if signal["name"] not in known_objs:
+                units.setdefault(signal["unit"], []).append(signal)
+        objs = []
+        for unit, signals in units.items():
+            title = (
+                f"{message['name']} {unit}"
+                if len(units) > 1 and unit
+                else message["name"]
+            )
+            if title in dropdown_labels:
+                title += f" {format_frame_id(spec.frame_id)}"
+            dropdown_labels.add(title)
+            ranged = [signal for signal in signals if signal["minn"] != signal["maxn"]]
+            graph = GraphObject(
+                title,
+                cg.graph_y,
+                unit or None,
+                cg.graph_y_units,
+                min((signal["minn"] for signal in ranged), default=None),
+                max((signal["maxn"] for signal in ranged), default=None),
+            )
+            graph_objs.append(graph)
+            for signal in signals:
+                objs.append(
+                    DataObject(
+                        signal["name"],
+                        signal_dp(signal["factor"]),
+                        unit,
+                        None,
+                        line_colour=cg.dbc_line_colours[
+                            len(objs) % len(cg.dbc_line_colours)
+                        ],
+                        graph=graph,
+                    )
+                )
+        data_objs.extend(objs)
+        all_objs.extend(objs)
+        known_objs.update((obj.name, obj) for obj in objs)
+        dbc_frames[spec.frame_id] = fed + objs
+    return dbc_frames
+
+
 # Testing val
 # if __name__ == "__main__":
 #     lst = [0x12, 0x34, 0x56, 0x78, 0x90, 0xab]
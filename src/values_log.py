@@ -0,0 +1,60 @@
+import argparse
+import csv
+import itertools
+from datetime import datetime
+
+from log_files import log_root, read_log_rows
+from workers.values_log_worker import KEYFRAME
+
+
+def expand_sparse_log(sparse_path: str, wide_path: str):
+    """
+    Writes the sparse values log at sparse_path (see SparseValuesLogWriter) to wide_path in the
+    wide values log layout: a row of every signal's value per Elapsed_Time_s in the sparse log\n
+    Rows whose values didn't change aren't in a sparse log, so aren't rebuilt; Timestamps are
+    rebuilt from the keyframes' start time and Elapsed_Time_s, so are to the ms.
+    sparse_path may also be the log's manifest or one of its (compressed) segments
+    """
+    with open(wide_path, "w", newline="") as wide_file:
+        writer = csv.writer(wide_file)
+        values = {}  # signal name: its latest value, in the wide layout's column order
+        time_start = None
+        header_written = False
+        rows = read_log_rows(sparse_path)  # any compressed segments are read in turn
+        for elapsed, records in itertools.groupby(rows, key=lambda r: r[0]):
+            for _, signal, value in records:
+                if signal == KEYFRAME:
+                    time_start = float(value)
+                elif time_start is None:
+                    raise ValueError(
+                        f"{sparse_path} has values before its first keyframe, so their "
+                        "times and the other signals' values aren't known"
+                    )
+                else:
+                    values[signal] = value
+            if not header_written:  # the first keyframe named every signal
+                writer.writerow(["Timestamp", "Elapsed_Time_s", *values])
+                header_written = True
+            timestamp = datetime.fromtimestamp(time_start + float(elapsed))
+            writer.writerow([timestamp.isoformat(), elapsed, *values.values()])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Expands a sparse values log to the wide values log layout"
+    )
+    parser.add_argument(
+        "sparse_log",
+        help="eg. logs/values_20250101_120000_sparse.csv, or its manifest or a segment",
+    )
+    parser.add_argument(
+        "wide_log",
+        nargs="?",
+        help="file to write (default: sparse_log with _sparse replaced by _wide)",
+    )
+    args = parser.parse_args()
+
+    root = log_root(args.sparse_log).removesuffix("_sparse")
+    wide_log = args.wide_log or f"{root}_wide.csv"
+    expand_sparse_log(args.sparse_log, wide_log)
+    print(f"Wrote {wide_log}")
@@ -11,9 +11,9 @@ from PyQt5.QtWidgets import (
     QTextEdit,
 )
 
-from config import pid_param_categories, pid_params
+from config import pid_param_categories, pid_params, scroll_window_options
 from data_object import DataObject, Docker_Command, Docker_Command_Type
-from utils import all_objs
+from utils import all_objs, data_objs
 from workers.docker_send_worker import (
     DockerWorkerThread,
     generate_docker_command,
@@ -124,6 +124,8 @@ class CANWindowUIMixin:
             emergency_controls_layout,
             software_controls_layout,
         )
+        if self.replay_conn is not None:
+            left_layout.insertLayout(1, elemns.init_replay_controls(self))
 
         # Graph Dropdown
         self.advanced_soft_panel = elemns.init_advanced_soft_panel(self)
@@ -223,9 +225,33 @@ class CANWindowUIMixin:
             # Check again if the 'graph' is a real graph that needs updates
             if newObj is not None and hasattr(newObj, "update_line_data"):
                 newObj.update_line_data()
+                newObj.dirty = False
 
         dropdowns[spot].clearFocus()
 
+    def set_scroll_window(self, text: str):
+        """text is a scroll_window_options entry, eg. 10 min"""
+        self.scroll_window = scroll_window_options[text]
+
+    def set_view_paused(self, paused: bool):
+        """
+        Stops (or restarts) the time graphs following new data; while paused their time axis
+        can be dragged and zoomed to scroll back through the session
+        """
+        self.view_paused = paused
+        for obj in data_objs:
+            if obj.graph_obj is not None:
+                view_box = obj.graph_obj.graph.getPlotItem().getViewBox()
+                view_box.setMouseEnabled(
+                    x=paused or obj.graph_obj.interactable,
+                    y=obj.graph_obj.interactable,
+                )
+
+    def redraw_if_paused(self, obj):
+        """Redraws obj's line (at the next render) after its paused graph is moved"""
+        if self.view_paused:
+            obj.dirty = True
+
     def run_docker_command(self, action: Docker_Command):
         container_name = self.container_text_box.text().strip()
 
@@ -14,18 +14,26 @@ class CANWindowControlsMixin:
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-    def can_send(self, frame_id, data, display_msg):
+    def can_send(self, frame_id, data, display_msg, kind=None):
         """
         Helper function for sending CAN messages\n
         frame_id: full frame id of message as a string WITHOUT 0x prefix (eg. 001, 041)\n
         data: hex string of message in little endian (assumes valid data)\n
-        display_msg: Message to be outputted on GUI CAN_DUMP display
+        display_msg: Message to be outputted on GUI CAN_DUMP display once the command is sent\n
+        kind: what the frame commands, if its frame id carries more than one (eg. rudder)\n
+        Rudder/trim tab frames are coalesced by the command_scheduler per frame id and kind
+        (those replaced by a newer command are never sent, so never displayed); the rest are
+        sent at once
         """
         try:
             # TODO: is it "##0" or "##1"?
             msg = "cansend " + can_line + " " + frame_id + "##0" + data
-            self.cansend_queue.put(msg)
-            self.output_display.append(f"[{display_msg}] {msg}")
+            self.command_scheduler.submit(
+                frame_id,
+                msg,
+                on_sent=lambda: self.output_display.append(f"[{display_msg}] {msg}"),
+                kind=kind,
+            )
         except Exception as e:
             print(f"ERROR - Command not sent: {str(e)}")
 
@@ -67,7 +75,7 @@ class CANWindowControlsMixin:
             # Note: We lose precision of decimal places if too many are entered: only keeps 3 dp
             data = convert_to_little_endian(convert_to_hex(int(heading * 1000), 4))
             status_byte = "00"  # a = 0, b = 0
-            self.can_send("001", data + status_byte, "HEADING SENT")
+            self.can_send("001", data + status_byte, "HEADING SENT", kind="heading")
             # TODO: Note that the below should only be necessary if no CAN frames are sent
             # desired_heading_obj.add_datapoint(time.time() - self.time_start, heading)
             # desired_heading_obj.update_label() # No explicit label with the other objects for this item; already have Heading Set Angle
@@ -98,7 +106,7 @@ class CANWindowControlsMixin:
             data = convert_to_little_endian(convert_to_hex(int((angle + 90) * 1000), 4))
 
             status_byte = "80"  # a = 1, b = 0, c = 0
-            self.can_send("001", data + status_byte, "RUDDER SENT")
+            self.can_send("001", data + status_byte, "RUDDER SENT", kind="rudder")
             self.rudder_display.setText(
                 f"Current Set Rudder Angle:  {self.rudder_angle} degrees"
             )
@@ -166,5 +174,29 @@ class CANWindowControlsMixin:
 
         return
 
+    # Replay controls (--source replay only)
+    def toggle_replay_pause(self):
+        paused = self.replay_pause_button.text() == "Pause"
+        self.replay_conn.send(("pause",) if paused else ("resume",))
+        self.replay_pause_button.setText("Resume" if paused else "Pause")
+
+    def set_replay_speed(self, text: str):
+        """text is a replay_speed_options entry, eg. 10x; Max replays as fast as possible"""
+        speed = 0 if text == "Max" else float(text.rstrip("x"))
+        self.replay_conn.send(("speed", speed))
+
+    def seek_replay(self):
+        try:
+            offset = 0.0
+            for part in self.replay_seek_input.text().split(
+                ":"
+            ):  # secs, m:ss or h:mm:ss
+                offset = offset * 60 + float(part)
+            if offset < 0:
+                raise ValueError("must not be negative")
+            self.replay_conn.send(("seek", offset))
+        except ValueError as e:
+            self.show_error(f"Invalid replay position: {e}")
+
 
 # TODO: these send can messages don't need to be part of the class at all really - refactor them out into their own class (like a SendCanFrameObject?)
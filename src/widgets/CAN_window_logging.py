@@ -1,9 +1,12 @@
-import csv
 import os
 import time
-from datetime import datetime
 
-from utils import data_objs
+import numpy as np
+
+from config import log_compression, log_rotate_bytes, log_rotate_secs, values_log_format
+from session_store import SessionStore
+from utils import ais_obj, all_objs, data_objs
+from workers.values_log_worker import SparseValuesLogWriter, ValuesLogWriter
 
 
 class CANWindowLoggingMixin:
@@ -18,46 +21,86 @@ class CANWindowLoggingMixin:
 
         # Create timestamped filenames
         # Values log file (CAN dump logging is now handled by separate process)
-        self.values_log_file = os.path.join("logs", f"values_{timestamp}.csv")
-        self.values_csv_file = open(self.values_log_file, "w", newline="")
-        self.values_writer = csv.writer(self.values_csv_file)
+        sparse = values_log_format == "sparse"
+        self.values_log_file = os.path.join(
+            "logs", f"values_{timestamp}{'_sparse' if sparse else ''}.csv"
+        )
 
         # Header names
         values_header = ["Timestamp", "Elapsed_Time_s"]
         for obj in data_objs:
             values_header.append(obj.name)
 
-        self.values_writer.writerow(values_header)
-        self.values_csv_file.flush()  # Ensure header is written immediately
+        # Rows are formatted, compressed and written by a background thread (a sparse log
+        # only records changed values; values_log.py expands it to the wide layout)
+        writer_class = SparseValuesLogWriter if sparse else ValuesLogWriter
+        self.values_log = writer_class(
+            self.values_log_file,
+            values_header,
+            self.time_start,
+            compression=log_compression,
+            rotate_bytes=log_rotate_bytes,
+            rotate_secs=log_rotate_secs,
+        )
 
         print(f"Values logging initialized: {self.values_log_file}")
 
-    # Makes given history the same length as time_history so it is plottable (note: this function works because lists are mutable and can be referenced through formal param)
-    def update_history(self, history: list):
-        while len(history) > len(self.time_history):
-            history.pop(0)
-        while len(history) < len(self.time_history):
-            last_val = history[-1] if history else 0
-            history.append(last_val)
+        # AIS log file (log file only for AIS values)
+        self.ais_log_file = os.path.join("logs", f"ais_values_{timestamp}.csv")
+        ais_obj.ais_log = ValuesLogWriter(
+            self.ais_log_file,
+            ["Timestamp", "Elapsed_Time_s"] + ais_obj.log_value_headers,
+            self.time_start,
+            compression=log_compression,
+            rotate_bytes=log_rotate_bytes,
+            rotate_secs=log_rotate_secs,
+        )
+        print(f"AIS logging initialized: {self.ais_log_file}")
+
+        # Every drawn point of the graphed signals, for scrolling back past the live window
+        self.session_store = SessionStore(os.path.join("logs", f"session_{timestamp}"))
+        for obj in all_objs:
+            if obj.rollups is not None:
+                obj.store = self.session_store.signal(obj.name)
+        print(f"Session store initialized: {self.session_store.directory}")
+
+    def _log_values(self, frame_timestamp: float = None):
+        """Log current values to CSV file, as of frame_timestamp (secs since epoch) if given"""
+        try:
+            if frame_timestamp is None:
+                frame_timestamp = time.time()
+            row = [frame_timestamp]
+            for obj in data_objs:
+                row.append(obj.get_current()[1])
+            self.values_log.submit(row)
+        except Exception as e:
+            print(f"Error logging values: {e}")
 
-    def _log_values(self):
-        """Log current values to CSV file"""
+    def _log_values_batch(self, frame_timestamps: list, columns: dict):
+        """
+        _log_values() for each frame of a batch: the values in columns (a decoded
+        column per name, see FrameRouter.dispatch_batch) change frame by frame, the rest
+        are their current values
+        """
         try:
-            timestamp = datetime.now().isoformat()
-            elapsed_time = time.time() - self.time_start
-            values = [timestamp, f"{elapsed_time:.3f}"]
-            # print("line 222")
+            row = [None]  # frame timestamp, then a value per DataObject
+            batched = {}  # index in row: column of values for that DataObject
             for obj in data_objs:
-                val = obj.get_current()[1]
-                # print("line 225")
-                if val is not None:
-                    values.append(str(val))
+                if obj.name in columns:
+                    values = columns[obj.name]
+                    if obj.dp is not None:  # as stored by obj.parse_frames()
+                        values = np.round(values, obj.dp)
+                    batched[len(row)] = [obj.reported_value(v) for v in values.tolist()]
+                    row.append(None)
                 else:
-                    values.append("None")
-                # print("line 230")
-            # print("line 231")
-            self.values_writer.writerow(values)
-            # print("line 233")
-            self.values_csv_file.flush()  # Flush immediately to prevent data loss
+                    row.append(obj.get_current()[1])
+
+            rows = []
+            for i, frame_timestamp in enumerate(frame_timestamps):
+                row[0] = frame_timestamp
+                for j, values in batched.items():
+                    row[j] = values[i]
+                rows.append(list(row))
+            self.values_log.submit_rows(rows)
         except Exception as e:
             print(f"Error logging values: {e}")
@@ -1,8 +1,9 @@
 import time
-from datetime import datetime
 
+import numpy as np
+
+from can_frame import format_frame_id
 from config import (
-    can_line,
     latitude_range,
     longitude_range,
     max_rudder_angle,
@@ -10,29 +11,28 @@ from config import (
     min_trimtab_angle,
     rudder_axis,
     rudder_latch,
-    scroll_window,
     trimtab_axis,
     trimtab_latch,
 )
+from frame_ring import iter_frames
+from frame_router import FrameRouter
 from utils import (
     AIS_Attributes,
     ais_obj,
     all_objs,
+    batch_specs,
     data_objs,
     data_wind_objs,
+    dbc_frames,
+    decode_0x060_frame,
+    decode_0x070_frame,
     desired_heading_obj,
+    frame_decoders,
     gps_lat_obj,
     gps_lon_obj,
     gps_objs,
     heartbeat_modules,
     manual_input_objs,
-    parse_0x001_frame,
-    parse_0x060_frame,
-    parse_0x070_frame,
-    parse_0x204_frame,
-    parse_0x206_frame,
-    parse_sail_wind_sensor_frame,
-    parse_wind_sensor_frame,
     pdb_hb_module,
     pdb_objs,
     pH_obj,
@@ -56,203 +56,39 @@ class CANWindowUpdateMixin:
         # Update time independently of CAN messages
         current_time = time.time() - self.time_start
 
-        # Process any new CAN messages
+        # Show any text lines candump printed that were not CAN frames (eg. errors); the
+        # frame source logs them (and every frame) itself
         while not self.queue.empty():
-            line = self.queue.get()
-            # self.output_display.append(line)
-
-            new_msg_to_log = False
-
-            # print(f"line parsed = {line}")
-
-            # Send to separate logging process (non-blocking)
-            # TODO: modify the nowait to ensure logging
-            try:
-                self.can_log_queue.put_nowait(line)
-            except:
-                print("line was not logged!")
-
-            if line.startswith(can_line):
-                new_msg_to_log = True
-                parts = line.split()
-                if len(parts) > 2:
-                    frame_id = parts[1].lower()
-                    self.time_history.append(current_time)
-
-                    # TODO: Use a dictionary with frame id:function - just runs the function associated with frame id?
-                    # There's definitely some abstraction that can be done here
-                    # TODO: Also probably raw_data can be taken outside of the cases for deduplication
-                    match frame_id:
-                        case "001":  # Sent frame to rudder
-                            # print("main_heading 001 frame received!")
-                            raw_data = line.split("]")[-1].strip().split()
-                            parsed = parse_0x001_frame("".join(raw_data))
-                            if parsed["steering_selection_bit"]:
-                                set_rudder_obj.parse_frame(current_time, None, parsed)
-                            else:
-                                desired_heading_obj.parse_frame(
-                                    current_time, None, parsed
-                                )
-                            pass
-
-                        case "002":  # Sent frame to trim tab
-                            pass
-                        case "040":  # Sail_Wind frame
-                            try:
-                                raw_data = line.split("]")[-1].strip().split()
-                                parsed = parse_sail_wind_sensor_frame("".join(raw_data))
-                                for obj in sail_wind_objs:
-                                    obj.parse_frame(current_time, None, parsed)
-                                    obj.update_label()
-                            except Exception as e:
-                                self.output_display.append(
-                                    f"[PARSE ERROR 0x040] {str(e)}"
-                                )
-                        case "041":  # Data_Wind frame
-                            try:
-                                raw_data = line.split("]")[-1].strip().split()
-                                parsed = parse_wind_sensor_frame("".join(raw_data))
-                                for obj in data_wind_objs:
-                                    obj.parse_frame(current_time, None, parsed)
-                                    obj.update_label()
-                            except Exception as e:
-                                self.output_display.append(
-                                    f"[PARSE ERROR 0x041] {str(e)}"
-                                )
-                        case "060":  # AIS frame
-                            try:
-                                raw_data = line.split("]")[-1].strip().split()
-                                parsed = parse_0x060_frame(
-                                    "".join(raw_data), current_time
-                                )
-                                if (
-                                    parsed[AIS_Attributes.TOTAL] != 0
-                                ):  # if ship frame is valid
-                                    ais_obj.add_frame(
-                                        parsed[AIS_Attributes.LONGITUDE],
-                                        parsed[AIS_Attributes.LATITUDE],
-                                        parsed[AIS_Attributes.SID],
-                                        parsed,
-                                        AIS_Attributes.LONGITUDE,
-                                    )
-                                    if parsed[AIS_Attributes.IDX] == (
-                                        parsed[AIS_Attributes.TOTAL] - 1
-                                    ):
-                                        ais_obj.log_data(
-                                            datetime.now().isoformat(),
-                                            time.time() - self.time_start,
-                                        )
-                            except Exception as e:
-                                self.output_display.append(
-                                    f"[PARSE ERROR 0x060] {str(e)}"
-                                )
-
-                        case "070":  # GPS frame
-                            try:
-                                raw_data = line.split("]")[-1].strip().split()
-                                parsed = parse_0x070_frame("".join(raw_data))
-                                for obj in gps_objs:
-                                    obj.parse_frame(current_time, None, parsed)
-                                    obj.update_label()
-
-                                if ais_obj.graph_obj.isVisible():  # graph POLARIS's current position if graph is visible
-                                    lon = gps_lon_obj.get_current()[1]
-                                    lat = gps_lat_obj.get_current()[1]
-                                    ais_obj.update_polaris_pos(lon, lat)
-                                    ais_obj.update_range(
-                                        lon - longitude_range,
-                                        lon + longitude_range,
-                                        lat - latitude_range,
-                                        lat + latitude_range,
-                                    )
-
-                            except Exception as e:
-                                self.output_display.append(
-                                    f"[PARSE ERROR 0x070] {str(e)}"
-                                )
-
-                        case "100":  # water_temp sensor frame
-                            try:
-                                temp_sensor_obj.parse_frame(current_time, line)
-                                temp_sensor_obj.update_label()
-                            except Exception as e:
-                                self.output_display.append(
-                                    f"[PARSE ERROR 0x100] {str(e)}"
-                                )
+            for line in self.queue.get():
+                self.output_display.append(line)
 
-                        case "110":  # pH sensor frame
-                            try:
-                                pH_obj.parse_frame(current_time, line)
-                                pH_obj.update_label()
-                            except Exception as e:
-                                self.output_display.append(
-                                    f"[PARSE ERROR 0x110] {str(e)}"
-                                )
-
-                        case "120":  # salinity sensor frame
-                            try:
-                                sal_obj.parse_frame(current_time, line)
-                                sal_obj.update_label()
-                            except Exception as e:
-                                self.output_display.append(
-                                    f"[PARSE ERROR 0x120] {str(e)}"
-                                )
-
-                        case "130":  # PDB Heartbeat frame
-                            pdb_hb_module.set_alive(current_time)
-                        case "131":
-                            rudr_hb_module.set_alive(current_time)
-                        case "132":  # SAIL Heartbeat frame
-                            sail_hb_module.set_alive(current_time)
-                        case "133":
-                            sense_hb_module.set_alive(current_time)
-
-                        case "204":  # Handle 0x204 frame (actual rudder angle)
-                            try:
-                                raw_data = line.split("]")[-1].strip().split()
-                                parsed = parse_0x204_frame("".join(raw_data))
-                                for obj in rudder_objs:
-                                    obj.parse_frame(current_time, None, parsed)
-                                    obj.update_label()
-                            except Exception as e:
-                                self.output_display.append(
-                                    f"[PARSE ERROR 0x204] {str(e)}"
-                                )
-
-                        case "206":
-                            try:
-                                raw_data = line.split("]")[-1].strip().split()
-                                parsed = parse_0x206_frame("".join(raw_data))
-                                for obj in pdb_objs:
-                                    obj.parse_frame(current_time, None, parsed)
-                                    obj.update_label()
-                            except Exception as e:
-                                self.output_display.append(
-                                    f"[PARSE ERROR 0x206] {str(e)}"
-                                )
-
-                        case "214":
-                            # NOTE: This frame sends accel/gyro data that is useful to have logged, GUI doesn't do anything with this data currently
-                            pass
-
-                        case _:
-                            print(f"Frame id not recognized: {frame_id}")
-
-                # Log current values
-                if new_msg_to_log and (len(self.time_history) > 0):
-                    # actual_rudder = self.actual_rudder_history[-1] if self.actual_rudder_history else None
-                    self._log_values()
+        # Process all CAN frames received since the last update in one read
+        if self.frame_ring is not None:
+            self._process_frames(self.frame_ring.read())
+            self._check_frame_ring_overflow()
 
         # trim values no longer being graphed
         for obj in all_objs:
-            obj.update_data(current_time, scroll_window)
+            obj.update_data(current_time, self.scroll_window)
+        self.retention.enforce()
+        self.memory_label.setText(f"Data: {self.retention.total_usage / 2**20:.1f} MiB")
+        self.values_log_label.setText(
+            f"Log: {self.values_log.lag:.1f} s behind, {self.values_log.dropped} rows dropped"
+        )
+        if self.can_log_stats is not None:
+            stats = self.can_log_stats
+            queued = stats.queued if stats.queued >= 0 else "?"
+            self.can_log_label.setText(
+                f"CAN log: {stats.messages_per_s:.0f} msg/s"
+                f" ({stats.bytes_per_s / 1024:.0f} KiB/s), {queued} queued"
+            )
 
         # Update heartbeat displays
         for mod in heartbeat_modules:
             mod.update_status(current_time)
 
-        # Always update plots and continuously graphed objs (those allowing manual input) every timer cycle (independent of CAN messages) # TODO: Modify this - batch plot updates?
-        if len(self.time_history) > 0:
+        # Always update plots and continuously graphed objs (those allowing manual input) every timer cycle (independent of CAN messages); lines are redrawn by render_scheduler
+        if self.frames_received > 0:
             for obj in manual_input_objs:
                 if obj.needs_update(current_time):
                     obj.add_datapoint(current_time, obj.get_current()[1])
@@ -276,10 +112,17 @@ class CANWindowUpdateMixin:
                 self.status_label.setText("DISCONNECTED")
                 self.status_label.setStyleSheet("color: red")
 
+        # Replay position and frames/s from the replay frame source
+        if self.replay_conn is not None:
+            while self.replay_conn.poll():
+                self._update_replay_status(self.replay_conn.recv())
+
         # Handle CAN send responses
         while not self.cansend_response_queue.empty():
             print()
-            cmd, out, err = self.cansend_response_queue.get()
+            cmd, out, err, latency = self.cansend_response_queue.get()
+            if latency is not None:
+                self.cansend_latency_label.setText(f"cansend: {latency * 1000:.0f} ms")
             if err:
                 self.output_display.append(f"[ERR] {err.strip()}")
             elif out:
@@ -299,11 +142,170 @@ class CANWindowUpdateMixin:
                 )
                 self.send_trim_tab(set_angle=trimtab_angle)
 
+    def _update_replay_status(self, status: dict):
+        """status is sent by ReplaySource every replay_status_period secs"""
+        position = time.strftime("%H:%M:%S", time.gmtime(status["position"]))
+        duration = time.strftime("%H:%M:%S", time.gmtime(status["duration"]))
+        speed = "Max" if not status["speed"] else f"{status['speed']:g}x"
+        if status["finished"]:
+            state = "finished"
+        elif status["paused"]:
+            state = "paused"
+        else:
+            state = speed
+        self.replay_status_label.setText(
+            f"Replay: {position} / {duration} | {state} | {status['fps']:.0f} frames/s"
+        )
+        self.replay_pause_button.setText("Resume" if status["paused"] else "Pause")
+
+    def _check_frame_ring_overflow(self):
+        """Reports frames dropped because the GUI fell too far behind candump_process"""
+        overflow_count = self.frame_ring.overflow_count
+        if overflow_count > self.frame_ring_overflows:
+            self.output_display.append(
+                f"[FRAME RING FULL] {overflow_count - self.frame_ring_overflows} CAN frames dropped"
+            )
+            self.frame_ring_overflows = overflow_count
+
+    def _init_frame_router(self):
+        """Registers what each received frame id updates; unregistered ids are only counted"""
+        self.frame_router = router = FrameRouter(on_error=self._report_parse_error)
+        router.register(
+            0x001, frame_decoders[0x001], handler=self._handle_main_heading_frame
+        )
+        router.register(0x002)  # Sent frame to trim tab
+        router.register(0x040, frame_decoders[0x040], sail_wind_objs)
+        router.register(0x041, frame_decoders[0x041], data_wind_objs)
+        router.register(0x060, handler=self._handle_ais_frame)
+        router.register(
+            0x070, decode_0x070_frame, gps_objs, self._update_polaris_position
+        )
+        router.register(0x100, objs=[temp_sensor_obj])  # water_temp sensor frame
+        router.register(0x110, objs=[pH_obj])
+        router.register(0x120, objs=[sal_obj])
+        for frame_id, module in (
+            (0x130, pdb_hb_module),
+            (0x131, rudr_hb_module),
+            (0x132, sail_hb_module),
+            (0x133, sense_hb_module),
+        ):
+            router.register(
+                frame_id, handler=lambda t, _, module=module: module.set_alive(t)
+            )
+        router.register(
+            0x204, frame_decoders[0x204], rudder_objs
+        )  # actual rudder angle
+        router.register(0x206, frame_decoders[0x206], pdb_objs)
+        # NOTE: 0x214 sends accel/gyro data that is useful to have logged, GUI doesn't do anything with this data currently
+        router.register(0x214)
+
+        # Frames (and new signals of known frames) from a --dbc file
+        for frame_id, objs in dbc_frames.items():
+            if not router.add_objs(frame_id, frame_decoders[frame_id], objs):
+                print(
+                    f"Warning: .dbc signals of {format_frame_id(frame_id)} not graphed - the GUI parses this frame itself"
+                )
+
+        for frame_id, spec in batch_specs.items():
+            if frame_id in router:
+                router.set_batch_spec(frame_id, spec)
+
+    def _report_parse_error(self, frame_id: int, e: Exception):
+        self.output_display.append(
+            f"[PARSE ERROR 0x{format_frame_id(frame_id)}] {str(e)}"
+        )
+
+    def _handle_main_heading_frame(self, frame_time: float, parsed: dict):
+        """0x001 (sent to rudder) carries either a set rudder angle or a desired heading"""
+        if parsed["steering_selection_bit"]:
+            set_rudder_obj.parse_frame(frame_time, None, parsed)
+        else:
+            desired_heading_obj.parse_frame(frame_time, None, parsed)
+
+    def _handle_ais_frame(self, frame_time: float, payload: bytes):
+        parsed = decode_0x060_frame(payload, frame_time)
+        if parsed[AIS_Attributes.TOTAL] != 0:  # if ship frame is valid
+            ais_obj.add_frame(
+                parsed[AIS_Attributes.LONGITUDE],
+                parsed[AIS_Attributes.LATITUDE],
+                parsed[AIS_Attributes.SID],
+                parsed,
+                AIS_Attributes.LONGITUDE,
+            )
+            if parsed[AIS_Attributes.IDX] == (parsed[AIS_Attributes.TOTAL] - 1):
+                ais_obj.log_data(self.time_start + frame_time)
+
+    def _update_polaris_position(self, frame_time: float, parsed: dict):
+        """Graphs POLARIS's current position (from a 0x070 GPS frame) if the AIS graph is visible"""
+        if ais_obj.graph_obj.isVisible():
+            lon = gps_lon_obj.get_current()[1]
+            lat = gps_lat_obj.get_current()[1]
+            ais_obj.update_polaris_pos(lon, lat)
+            ais_obj.update_range(
+                lon - longitude_range,
+                lon + longitude_range,
+                lat - latitude_range,
+                lat + latitude_range,
+            )
+
+    def _process_frames(self, frames: np.ndarray):
+        """
+        Processes the FrameRing.read() records of one tick, in the order they were received\n
+        Runs of consecutive frames of an id with a batch spec (config.batch_decoded_ids) are
+        decoded and graphed a run at a time; other frames are processed one by one. Keeping
+        the order matters as some DataObjects are fed by frames of several ids
+        """
+        batch_specs = self.frame_router.batch_specs
+        if not batch_specs:
+            for timestamp, frame_id, payload in iter_frames(frames):
+                self._process_frame(timestamp, frame_id, payload)
+            return
+
+        # Run key per frame: its id if it is batch decoded, else -1
+        keys = np.full(len(frames), -1, dtype=np.int64)
+        for frame_id, spec in batch_specs.items():
+            selected = (frames["frame_id"] == frame_id) & (frames["dlc"] == spec.length)
+            keys[selected] = frame_id
+        starts = np.flatnonzero(np.diff(keys, prepend=-2)).tolist()
+        for start, end in zip(starts, starts[1:] + [len(frames)]):
+            run = frames[start:end]
+            if keys[start] < 0:
+                for timestamp, frame_id, payload in iter_frames(run):
+                    self._process_frame(timestamp, frame_id, payload)
+            else:
+                self._process_frame_batch(run)
+
+    def _process_frame_batch(self, frames: np.ndarray):
+        """_process_frame() for FrameRing.read() records of one batch decoded frame id"""
+        timestamps = frames["timestamp"].tolist()
+        frame_times = (frames["timestamp"] - self.time_start).tolist()
+        self.frames_received += len(frames)
+
+        columns = self.frame_router.dispatch_batch(
+            frame_times, int(frames["frame_id"][0]), frames["payload"]
+        )
+        self._log_values_batch(timestamps, columns or {})
+
+    def _process_frame(self, timestamp: float, frame_id: int, payload: bytes):
+        """
+        Parses and graphs a single CAN frame decoded by candump_process (which logs it)\n
+        Data points are keyed by when the frame was received on the Pi (timestamp mapped
+        onto this clock), not by when the GUI got around to processing it
+        """
+        frame_time = timestamp - self.time_start
+        self.frames_received += 1
+
+        self.frame_router.dispatch(frame_time, frame_id, payload)
+
+        # Log current values
+        # actual_rudder = self.actual_rudder_history[-1] if self.actual_rudder_history else None
+        self._log_values(timestamp)
+
     def _update_plot_ranges(self, current_time):
         # === Auto-scale and scroll X axis ===
-        if len(self.time_history) > 1:
+        if self.frames_received > 1 and not self.view_paused:
             for obj in data_objs:
                 if obj.graph_obj is not None:
                     obj.graph_obj.update_xlim(
-                        max(0, current_time - scroll_window), current_time
+                        max(0, current_time - self.scroll_window), current_time
                     )
@@ -35,6 +35,10 @@ def init_top_bar(self):
     self.temp_label = QLabel("RPI Temp: --")
     self.status_label = QLabel("DISCONNECTED")
     self.status_label.setStyleSheet("color: red")
+    self.cansend_latency_label = QLabel("cansend: -- ms")
+    self.memory_label = QLabel("Data: -- MiB")
+    self.values_log_label = QLabel("Log: -- s behind")
+    self.can_log_label = QLabel("CAN log: -- msg/s")
 
     top_bar_layout = QHBoxLayout()
     top_bar_layout.addWidget(self.logo_label)
@@ -42,6 +46,14 @@ def init_top_bar(self):
     top_bar_layout.addWidget(self.temp_label)
     top_bar_layout.addSpacing(10)
     top_bar_layout.addWidget(self.status_label)
+    top_bar_layout.addSpacing(10)
+    top_bar_layout.addWidget(self.cansend_latency_label)
+    top_bar_layout.addSpacing(10)
+    top_bar_layout.addWidget(self.memory_label)
+    top_bar_layout.addSpacing(10)
+    top_bar_layout.addWidget(self.values_log_label)
+    top_bar_layout.addSpacing(10)
+    top_bar_layout.addWidget(self.can_log_label)
     top_bar_layout.addStretch()
     return top_bar_layout
 
@@ -204,6 +216,29 @@ def init_pid_input_layout(self):
     return self.pid_param_input_layout
 
 
+def init_replay_controls(self):
+    """Pause, speed and seek controls for a --source replay session"""
+    self.replay_status_label = QLabel("Replay: --")
+    self.replay_pause_button = QPushButton("Pause")
+    self.replay_pause_button.clicked.connect(self.toggle_replay_pause)
+    self.replay_speed_dropdown = QComboBox()
+    self.replay_speed_dropdown.addItems(cg.replay_speed_options)
+    self.replay_speed_dropdown.textActivated.connect(self.set_replay_speed)
+    self.replay_seek_input = QLineEdit()
+    self.replay_seek_input.setPlaceholderText("secs or h:mm:ss")
+    self.replay_seek_button = QPushButton("Seek")
+    self.replay_seek_button.clicked.connect(self.seek_replay)
+
+    replay_controls_layout = QHBoxLayout()
+    replay_controls_layout.addWidget(self.replay_status_label)
+    replay_controls_layout.addStretch()
+    replay_controls_layout.addWidget(self.replay_pause_button)
+    replay_controls_layout.addWidget(self.replay_speed_dropdown)
+    replay_controls_layout.addWidget(self.replay_seek_input)
+    replay_controls_layout.addWidget(self.replay_seek_button)
+    return replay_controls_layout
+
+
 def init_emergency_controls(self):
     self.emergency_checkbox = QCheckBox("Enable Emergency Controls")
     self.emergency_checkbox.stateChanged.connect(self.toggle_emergency_buttons)
@@ -470,6 +505,23 @@ def init_right_layout(self):
         d.setVisible(False)
         dropdown_layout.addWidget(d)
 
+    self.scroll_window_dropdown = QComboBox()
+    self.scroll_window_dropdown.setFont(QFont(cg.d_font_type, cg.d_font_size))
+    self.scroll_window_dropdown.addItems(cg.scroll_window_options)
+    self.scroll_window_dropdown.textActivated.connect(self.set_scroll_window)
+    dropdown_layout.addWidget(self.scroll_window_dropdown)
+
+    # Paused graphs stop following new data; dragging/zooming them scrolls back
+    # through the session (see DataObject.store)
+    self.pause_graphs_checkbox = QCheckBox("Pause graphs")
+    self.pause_graphs_checkbox.toggled.connect(self.set_view_paused)
+    dropdown_layout.addWidget(self.pause_graphs_checkbox)
+    for obj in all_objs:
+        if obj.store is not None:
+            obj.graph_obj.graph.sigXRangeChanged.connect(
+                lambda *_, obj=obj: self.redraw_if_paused(obj)
+            )
+
     # show a maximum of three graphs initially
     for i in range(0, 3):
         if i < len(graph_objs):
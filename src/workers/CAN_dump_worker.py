@@ -1,41 +1,182 @@
 import multiprocessing
+import select
 import time
+from collections import deque
 
 import paramiko
 
-from config import can_line
+from can_frame import parse_candump_line, split_candump_timestamp
+from config import (
+    can_line,
+    candump_batch_max_delay,
+    candump_batch_max_frames,
+    candump_recv_size,
+    clock_offset_window,
+)
+from frame_ring import FrameRing
+from ssh_broker import close_ssh_clients, get_ssh_client
+
+
+class CandumpLineFramer:
+    """
+    Reassembles newline-terminated candump lines from arbitrarily sized reads\n
+    A line split across two reads is held back until its newline arrives, so
+    no partial (corrupt) lines are ever emitted
+    """
+
+    def __init__(self):
+        self._pending = b""
+
+    def feed(self, data: bytes) -> list[str]:
+        """Add raw bytes from the channel; returns the complete lines they finish"""
+        chunks = (self._pending + data).split(b"\n")
+        self._pending = chunks.pop()  # last chunk has no newline yet (may be b"")
+        lines = []
+        for chunk in chunks:
+            line = chunk.decode(errors="replace").strip()
+            if line:
+                lines.append(line)
+        return lines
+
+
+class ClockOffsetEstimator:
+    """
+    Maps frame timestamps from the Pi's clock onto this laptop's clock\n
+    Every frame gives one sample of (local receive time - Pi timestamp), which is the
+    clock offset plus however long the frame took to get here. The smallest sample seen
+    in the last window seconds is the best estimate of the offset alone; the window
+    lets the estimate follow clock drift (or the Pi's clock being set)
+    """
+
+    def __init__(self, window: float = clock_offset_window):
+        self.window = window
+        self._samples = deque()  # (local_time, offset), offsets increasing
+
+    def update(self, source_time: float, local_time: float):
+        offset = local_time - source_time
+        # Samples with a larger offset can never be the minimum again
+        while self._samples and self._samples[-1][1] >= offset:
+            self._samples.pop()
+        self._samples.append((local_time, offset))
+        while self._samples[0][0] < local_time - self.window:
+            self._samples.popleft()
+
+    @property
+    def offset(self) -> float | None:
+        """Current estimate of (laptop clock - Pi clock) in secs, None before the first sample"""
+        return self._samples[0][1] if self._samples else None
+
+    def to_local(self, source_time: float, local_time: float) -> float:
+        """Updates the estimate with a frame received at local_time, then maps its source_time"""
+        self.update(source_time, local_time)
+        return source_time + self.offset
+
+
+def read_candump_batches(
+    session: paramiko.Channel,
+    sink,
+    max_frames: int = candump_batch_max_frames,
+    max_delay: float = candump_batch_max_delay,
+):
+    """
+    Streams candump output from session to sink (a function taking a list of lines)\n
+    Blocks on channel readiness instead of polling; a batch is passed on as soon as it
+    holds max_frames lines or its oldest line is max_delay seconds old\n
+    Returns when the remote candump exits or the channel closes
+    """
+    framer = CandumpLineFramer()
+    batch = []
+    deadline = None
+    while True:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        readable, _, _ = select.select([session], [], [], timeout)
+        if readable:
+            data = session.recv(candump_recv_size)
+            if not data:  # channel closed
+                break
+            lines = framer.feed(data)
+            if lines and not batch:
+                deadline = time.monotonic() + max_delay
+            batch.extend(lines)
+
+        while len(batch) >= max_frames:
+            sink(batch[:max_frames])
+            batch = batch[max_frames:]
+        if not batch:
+            deadline = None
+        elif time.monotonic() >= deadline:
+            sink(batch)
+            batch = []
+            deadline = None
+
+    if batch:
+        sink(batch)
+
+
+def push_candump_lines(
+    lines: list[str],
+    frame_ring: FrameRing,
+    queue: multiprocessing.Queue,
+    clock: ClockOffsetEstimator = None,
+    log_queue: multiprocessing.Queue = None,
+):
+    """
+    Pushes the CAN frames in lines to frame_ring; anything else candump printed
+    (eg. error messages) is put on queue as a batch of text lines\n
+    Frames carrying a candump timestamp are stamped with it (mapped onto this clock
+    by clock); other frames are stamped with the time they were received\n
+    If log_queue is given, the batch's (timestamp, frame_id, payload) frames and other
+    lines are also put on it, in order, as one list for can_logging_process
+    """
+    received = time.time()
+    other_lines = []
+    logged = []
+    for line in lines:
+        source_time, frame_line = split_candump_timestamp(line)
+        frame = parse_candump_line(frame_line)
+        if frame is None:
+            other_lines.append(line)
+            logged.append(line)
+            continue
+        if source_time is None or clock is None:
+            timestamp = received
+        else:
+            timestamp = clock.to_local(source_time, received)
+        frame_ring.push(timestamp, *frame)
+        logged.append((timestamp, *frame))
+    if other_lines:
+        queue.put(other_lines)
+    if log_queue is not None and logged:
+        log_queue.put(logged)
 
 
 def candump_process(
-    queue: multiprocessing.Queue, testing: bool, credentials: tuple[str, str, str]
+    queue: multiprocessing.Queue,
+    frame_ring: FrameRing,
+    credentials: tuple[str, str, str],
+    log_queue: multiprocessing.Queue = None,
 ):
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    hostname, username, password = credentials
-    if testing:
-        # TODO
-        print("TESTING MODE ON")
-    else:
-        try:
-            client.connect(
-                hostname=hostname,
-                username=username,
-                password=password,
-            )
-            transport = client.get_transport()
-            # session = transport.open_session()
-            # session.exec_command("bash sailbot_workspace/scripts/canup.sh -l")
-            session = transport.open_session()
-            session.exec_command(f"candump {can_line}")
-            while True:
-                if session.recv_ready():
-                    line = session.recv(1024).decode()
-                    lines = line.split("\n")
-                    for l in lines:
-                        if l != "":
-                            queue.put(l.strip())
-                time.sleep(0.1)
-        except Exception as e:
-            queue.put(f"[ERROR] {str(e)}")
-        finally:
-            client.close()
+    """
+    Streams candump on the Pi into frame_ring (see push_candump_lines()); every frame
+    and line also goes to log_queue if given, so logging never waits on the GUI
+    """
+    try:
+        transport = get_ssh_client(credentials).get_transport()
+        # session = transport.open_session()
+        # session.exec_command("bash sailbot_workspace/scripts/canup.sh -l")
+        session = transport.open_session()
+        # -ta: prefix each frame with the (absolute) time the Pi's kernel received it
+        session.exec_command(f"candump -ta {can_line}")
+        clock = ClockOffsetEstimator()
+        read_candump_batches(
+            session,
+            lambda lines: push_candump_lines(
+                lines, frame_ring, queue, clock, log_queue
+            ),
+        )
+    except Exception as e:
+        queue.put([f"[ERROR] {str(e)}"])
+        if log_queue is not None:
+            log_queue.put([f"[ERROR] {str(e)}"])
+    finally:
+        close_ssh_clients()
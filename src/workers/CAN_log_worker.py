@@ -1,14 +1,112 @@
-import csv
+import math
 import multiprocessing
 import os
 import time
 from datetime import datetime
+from queue import Empty
+
+from can_frame import format_candump_line
+from config import can_log_batch_size, can_log_flush_interval
+from log_files import LogFile
+
+# CANLogStats fields
+_QUEUED, _WRITTEN, _MESSAGES_PER_S, _BYTES_PER_S = range(4)
+
+
+class CANLogStats:
+    """
+    Counters can_logging_process shares with the GUI, in shared memory (so reading them
+    never waits on the process); updated every can_log_flush_interval secs
+    """
+
+    def __init__(self):
+        self._values = multiprocessing.Array("d", 4, lock=False)
+
+    @property
+    def queued(self) -> int:
+        """Messages (or batches of them) waiting in the log queue; -1 if the platform can't tell"""
+        return int(self._values[_QUEUED])
+
+    @property
+    def written(self) -> int:
+        return int(self._values[_WRITTEN])
+
+    @property
+    def messages_per_s(self) -> float:
+        return self._values[_MESSAGES_PER_S]
+
+    @property
+    def bytes_per_s(self) -> float:
+        return self._values[_BYTES_PER_S]
+
+    def update(self, queued, written, messages_per_s, bytes_per_s):
+        self._values[:] = [queued, written, messages_per_s, bytes_per_s]
+
+
+class TimestampFormatter:
+    """
+    datetime.fromtimestamp(t).isoformat(), with the date and time to the second cached: CAN
+    messages are logged many times a second, and only their microseconds differ
+    """
+
+    def __init__(self):
+        self._second = None
+        self._prefix = None
+
+    def __call__(self, t: float) -> str:
+        second = math.floor(t)
+        micros = round((t - second) * 1e6)  # as datetime rounds them
+        if micros == 1_000_000:
+            second, micros = second + 1, 0
+        if second != self._second:
+            self._second = second
+            self._prefix = datetime.fromtimestamp(second).isoformat()
+        return f"{self._prefix}.{micros:06d}" if micros else self._prefix
+
+
+def _log_rows(messages: list, start_time: float, format_timestamp) -> list:
+    """The csv rows of messages: (timestamp, frame_id, payload) frames or text lines"""
+    rows = []
+    for message in messages:
+        try:
+            if isinstance(message, tuple):
+                # (timestamp, frame_id, payload) frame from candump_process
+                received, frame_id, payload = message
+                message = format_candump_line(frame_id, payload)
+            else:
+                received = time.time()
+            rows.append(
+                [format_timestamp(received), f"{received - start_time:.3f}", message]
+            )
+        except Exception as e:
+            print(f"Error in CAN logging: {e}")
+    return rows
+
+
+def _queue_size(log_queue) -> int:
+    try:
+        return log_queue.qsize()
+    except NotImplementedError:  # macOS
+        return -1
 
 
 def can_logging_process(
-    queue: multiprocessing.Queue, log_queue: multiprocessing.Queue, timestamp
+    queue: multiprocessing.Queue,
+    log_queue: multiprocessing.Queue,
+    timestamp,
+    stats: CANLogStats = None,
+    compression: str = "none",
+    rotate_bytes: int = 0,
+    rotate_secs: float = 0,
 ):
-    """Dedicated process for logging CAN messages without blocking graphics"""
+    """
+    Dedicated process for logging CAN messages without blocking graphics\n
+    Messages are (timestamp, frame_id, payload) frames, text lines, or lists of them (as
+    the frame source puts them). Waits for messages (without spinning), then writes about
+    can_log_batch_size of them at once; the file is flushed, and stats updated, every
+    can_log_flush_interval secs. The log is compressed and rotated here (see LogFile), so
+    never by the GUI
+    """
     try:
         # Create logs directory if it doesn't exist
         if not os.path.exists("logs"):
@@ -18,31 +116,61 @@ def can_logging_process(
         # timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         candump_log_file = os.path.join("logs", f"candump_{timestamp}.csv")
 
-        with open(candump_log_file, "w", newline="") as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerow(["Timestamp", "Elapsed_Time_s", "CAN_Message"])
-            csv_file.flush()
-
+        with LogFile(
+            candump_log_file,
+            ["Timestamp", "Elapsed_Time_s", "CAN_Message"],
+            compression,
+            rotate_bytes,
+            rotate_secs,
+        ) as log_file:
             start_time = time.time()
+            format_timestamp = TimestampFormatter()
             print(f"CAN Logging started: {candump_log_file}")
 
-            while True:
+            written = 0
+            last_flush = time.monotonic()
+            flushed_written, flushed_bytes = written, log_file.bytes_written
+            running = True
+            while running:
+                batch = []
                 try:
-                    # Get message from queue with timeout
-                    if not log_queue.empty():
-                        message = log_queue.get(timeout=1.0)
-                        if message == "__EXIT__":
+                    message = log_queue.get(timeout=can_log_flush_interval)
+                    while True:
+                        if isinstance(message, list):  # a frame source's batch
+                            batch.extend(message)
+                        else:
+                            batch.append(message)
+                        if len(batch) >= can_log_batch_size:
                             break
-                        # Log the message
-                        timestamp = datetime.now().isoformat()
-                        elapsed_time = time.time() - start_time
-                        writer.writerow([timestamp, f"{elapsed_time:.3f}", message])
-                        csv_file.flush()
-                # except queue.empty as empty:
-                #     print(f"CAN logging queue empty")
+                        message = log_queue.get_nowait()
+                except Empty:
+                    pass
+                if "__EXIT__" in batch:
+                    batch = batch[: batch.index("__EXIT__")]
+                    running = False
+
+                try:
+                    rows = _log_rows(batch, start_time, format_timestamp)
+                    log_file.writerows(rows)
+                    written += len(rows)
+
+                    now = time.monotonic()
+                    if running and now - last_flush < can_log_flush_interval:
+                        continue
+                    log_file.flush()
+                    if stats is not None:
+                        elapsed = now - last_flush
+                        file_bytes = log_file.bytes_written
+                        stats.update(
+                            _queue_size(log_queue),
+                            written,
+                            (written - flushed_written) / elapsed,
+                            (file_bytes - flushed_bytes) / elapsed,
+                        )
+                        flushed_written, flushed_bytes = written, file_bytes
+                    last_flush = now
                 except Exception as e:
                     print(f"Error in CAN logging: {e}")
-                    continue
 
     except Exception as e:
         print(f"Failed to initialize CAN logging: {e}")
@@ -1,50 +1,177 @@
 import multiprocessing
+import queue
+import re
+import shlex
+import threading
+import time
+from collections import deque
 
 import paramiko
 
+from ssh_broker import close_ssh_clients, get_ssh_client
 from utils import make_pretty
 
+# Runs on the Pi: executes one command per line read from stdin and answers each with one
+# line "@cansend <exit status> <output>" (output newlines replaced by spaces), in the same order
+CANSEND_SHELL = r"""while IFS= read -r cmd; do
+    out=$(eval "$cmd" 2>&1 </dev/null)
+    status=$?
+    echo "@cansend $status ${out//$'\n'/ }"
+done"""
+RESPONSE = re.compile(r"@cansend (\d+) (.*)")  # a line answering a command
+
+
+class CansendShell:
+    """
+    Long-lived shell on the Pi that cansend commands are written to\n
+    Unlike exec_command(), no channel or remote process is started per frame, and a
+    command is written without waiting for the previous one to finish: responses are
+    read (in order) by a background thread, which passes each one to
+    on_response(cmd, out, err, latency) where latency is the round trip in secs
+    """
+
+    def __init__(self, channel, on_response):
+        self._channel = channel
+        self._on_response = on_response
+        self._pending = deque()  # (cmd, time sent) waiting for a response, oldest first
+        self._reader = threading.Thread(target=self._read_responses, daemon=True)
+        self._reader.start()
+
+    @classmethod
+    def open(cls, client: paramiko.SSHClient, on_response):
+        channel = client.get_transport().open_session()
+        channel.exec_command(f"bash -c {shlex.quote(CANSEND_SHELL)}")
+        return cls(channel, on_response)
+
+    @property
+    def alive(self) -> bool:
+        return self._reader.is_alive()
+
+    def send(self, cmd: str):
+        """
+        Writes cmd to the shell\n
+        If writing fails, cmd is not left waiting for a response and the channel is closed,
+        so no later response can be matched to the wrong command (alive turns False, and
+        the worker reopens the shell for the next command)
+        """
+        entry = (cmd, time.perf_counter())
+        # queued before sending, as the response can arrive straight away
+        self._pending.append(entry)
+        try:
+            self._channel.sendall(f"{cmd}\n".encode())
+        except Exception:
+            self._pending.remove(entry)
+            self.close()
+            raise
+
+    def close(self):
+        self._channel.close()
+
+    def _read_responses(self):
+        for line in self._channel.makefile("r"):
+            line = line.rstrip("\n")
+            response = RESPONSE.fullmatch(line)
+            if response is None:  # eg. a login message or an error from bash itself
+                print(f"Unexpected cansend shell output: {line}")
+                continue
+            try:
+                cmd, sent = self._pending.popleft()
+            except IndexError:
+                print(f"cansend shell answered no command: {line}")
+                continue
+            status, out = response.groups()
+            latency = time.perf_counter() - sent
+            if status == "0":
+                self._on_response(cmd, out, "", latency)
+            else:
+                self._on_response(cmd, "", out or f"exit status {status}", latency)
+        # The shell exited (or the connection dropped) before answering these
+        while self._pending:
+            cmd, _ = self._pending.popleft()
+            self._on_response(cmd, "", "cansend shell closed", None)
+
+
+def _exec_sudo_command(client: paramiko.SSHClient, cmd: str, password: str):
+    """Runs a sudo command in its own channel, typing in password; returns (out, err)"""
+    stdin, stdout, stderr = client.exec_command(cmd, get_pty=True)
+    buf = ""
+    while not buf.endswith("[sudo] password for sailbot: "):
+        buf += stdout.channel.recv(1024).decode()
+    stdin.write(f"{password}\n")
+    stdin.flush()
+    return stdout.read().decode(), stderr.read().decode()
+
+
+URGENT = "__URGENT__"  # put on cmd_queue by put_urgent(), to wake the worker
+
+
+def put_urgent(cmd_queue, urgent_queue, cmd: str):
+    """Queues cmd to be sent by cansend_worker ahead of the commands already on cmd_queue"""
+    urgent_queue.put(cmd)
+    cmd_queue.put(URGENT)
+
 
 def cansend_worker(
     cmd_queue: multiprocessing.Queue,
     response_queue: multiprocessing.Queue,
     can_log_queue: multiprocessing.Queue,
     credentials: tuple[str, str, str],
+    urgent_queue: multiprocessing.Queue = None,
 ):
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    hostname, username, password = credentials
+    """
+    Sends the commands put on cmd_queue to the Pi; responses are put on response_queue
+    as (cmd, out, err, latency) where latency is the round trip in secs (None if unknown)\n
+    The commands on urgent_queue (see put_urgent()) are sent first whenever the worker
+    takes a command from cmd_queue
+    """
+
+    def on_response(cmd, out, err, latency):
+        response_queue.put((cmd, out, err, latency))
+        if not err:
+            can_log_queue.put_nowait(make_pretty(cmd))
+
+    def send(cmd):
+        nonlocal shell
+        try:
+            if cmd[0:4] == "sudo":
+                start = time.perf_counter()
+                out, err = _exec_sudo_command(
+                    get_ssh_client(credentials), cmd, password
+                )
+                on_response(cmd, out, err, time.perf_counter() - start)
+            else:
+                if not shell.alive:  # reopen (reconnecting if the link dropped)
+                    shell = CansendShell.open(get_ssh_client(credentials), on_response)
+                shell.send(cmd)
+        except Exception as e:
+            response_queue.put((cmd, "", f"Exec error: {str(e)}", None))
+
+    password = credentials[2]
+    shell = None
     try:
-        client.connect(hostname=hostname, username=username, password=password)
+        shell = CansendShell.open(get_ssh_client(credentials), on_response)
+        early = 0  # urgent commands sent before the URGENT put with them was taken
         while True:
             cmd = cmd_queue.get()
+            if cmd == URGENT:
+                if early:
+                    early -= 1
+                    continue
+                cmd = urgent_queue.get()  # the one put with it
+            # Urgent commands queued since go ahead of cmd
+            while urgent_queue is not None:
+                try:
+                    urgent = urgent_queue.get_nowait()
+                except queue.Empty:
+                    break
+                early += 1
+                send(urgent)
             if cmd == "__EXIT__":
                 break
-            try:
-                out = ""
-                err = ""
-                if cmd[0:4] == "sudo":
-                    stdin, stdout, stderr = client.exec_command(cmd, get_pty=True)
-                    buf = ""
-                    while not buf.endswith("[sudo] password for sailbot: "):
-                        buf += stdout.channel.recv(1024).decode()
-                    stdin.write(f"{password}\n")
-                    stdin.flush()
-                    out = stdout.read().decode()
-                    err = stderr.read().decode()
-                else:
-                    stdin, stdout, stderr = client.exec_command(cmd)
-                    out = stdout.read().decode()
-                    err = stderr.read().decode()
-
-                response_queue.put((cmd, out, err))
-                if not err:
-                    can_log_queue.put_nowait(make_pretty(cmd))
-                else:
-                    raise Exception(f"Command not logged: {cmd}")
-            except Exception as e:
-                response_queue.put((cmd, "", f"Exec error: {str(e)}"))
+            send(cmd)
     except Exception as e:
-        response_queue.put(("ERROR", "", f"SSH error: {str(e)}"))
+        response_queue.put(("ERROR", "", f"SSH error: {str(e)}", None))
     finally:
-        client.close()
+        if shell is not None:
+            shell.close()
+        close_ssh_clients()
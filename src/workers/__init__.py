@@ -1,4 +1,5 @@
 from .CAN_dump_worker import candump_process  # noqa F401
-from .CAN_log_worker import can_logging_process  # noqa F401
-from .CAN_send_worker import cansend_worker  # noqa F401
+from .CAN_log_worker import CANLogStats, can_logging_process  # noqa F401
+from .CAN_send_worker import cansend_worker, put_urgent  # noqa F401
 from .temp_read_worker import temperature_reader  # noqa F401
+from .values_log_worker import ValuesLogWriter  # noqa F401
@@ -3,6 +3,7 @@ from PyQt5.QtCore import QThread, pyqtSignal
 
 from config import get_SSH_credentials
 from data_object import Docker_Command, Docker_Command_Type
+from ssh_broker import get_ssh_client
 
 
 class DockerWorkerThread(QThread):
@@ -40,19 +41,9 @@ def generate_docker_command(action: Docker_Command, container_name: str):
 
 
 def send_docker_command(command: str):
-    # Set up the SSH Client
-    ssh = paramiko.SSHClient()
-    # Automatically add the server's SSH key (prevents "unknown host" errors)
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    hostname, username, password = get_SSH_credentials()
     try:
-        # Connect to the remote server
-        ssh.connect(
-            hostname=hostname,
-            username=username,
-            password=password,
-            timeout=5,
-        )
+        # Reuse the GUI's SSH connection (connects only if there isn't one yet)
+        ssh = get_ssh_client(get_SSH_credentials(), timeout=5)
 
         # Execute the command over SSH
         _, stdout, stderr = ssh.exec_command(command)
@@ -73,23 +64,11 @@ def send_docker_command(command: str):
     except paramiko.AuthenticationException:
         raise RuntimeError("Authentication failed. Check your username and password.")
 
-    finally:
-        # Always close the connection when done!
-        ssh.close()
-
 
 # Add as a separate method to avoid blocking.
 def kill_software():
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    hostname, username, password = get_SSH_credentials()
     try:
-        ssh.connect(
-            hostname=hostname,
-            username=username,
-            password=password,
-            timeout=2,
-        )
+        ssh = get_ssh_client(get_SSH_credentials(), timeout=2)
         command = "docker kill $(docker ps -q)"
         ssh.exec_command(command)
 
@@ -98,6 +77,3 @@ def kill_software():
 
     except Exception as e:
         raise RuntimeError(f"Failed to kill software: {str(e)}")
-
-    finally:
-        ssh.close()
@@ -1,6 +1,6 @@
 import time
 
-import paramiko
+from ssh_broker import close_ssh_clients, get_ssh_client
 
 
 def _send_status(pipe, connected, value):
@@ -12,13 +12,12 @@ def _send_status(pipe, connected, value):
 
 
 def temperature_reader(pipe, credentials: tuple[str, str, str]):
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    hostname, username, password = credentials
     try:
-        client.connect(hostname=hostname, username=username, password=password)
+        get_ssh_client(credentials)
         while True:
             try:
+                # reconnects if the link dropped
+                client = get_ssh_client(credentials)
                 stdin, stdout, stderr = client.exec_command(
                     "cat /sys/class/thermal/thermal_zone0/temp"
                 )
@@ -42,4 +41,4 @@ def temperature_reader(pipe, credentials: tuple[str, str, str]):
             pipe.close()
         except Exception:
             pass
-        client.close()
+        close_ssh_clients()
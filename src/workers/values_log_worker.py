@@ -0,0 +1,205 @@
+import math
+import threading
+import time
+from datetime import datetime
+
+from config import (
+    values_log_buffer_rows,
+    values_log_flush_interval,
+    values_log_flush_rows,
+    values_log_fsync_interval,
+    values_log_keyframe_interval,
+)
+from log_files import LogFile
+
+SPARSE_HEADER = ["Elapsed_Time_s", "Signal", "Value"]
+KEYFRAME = "*"  # Signal of the record starting a keyframe; its Value is the start time
+
+
+def format_value(value) -> str:
+    return "None" if value is None else str(value)
+
+
+class ValuesLogWriter:
+    """
+    Writes the values log csv from a background thread, so the GUI thread never waits on disk\n
+    submit() only buffers a row of raw values: [timestamp (secs since epoch), value or None, ...].
+    The thread formats and writes the buffered rows once flush_rows are waiting or every
+    flush_interval secs, and fsyncs the file every fsync_interval secs. At most capacity rows
+    are buffered: rows submitted while it is full are dropped (and counted in dropped).
+    compression, rotate_bytes and rotate_secs are passed to the LogFile written
+    """
+
+    def __init__(
+        self,
+        path: str,
+        header: list,
+        time_start: float,
+        capacity: int = values_log_buffer_rows,
+        flush_rows: int = values_log_flush_rows,
+        flush_interval: float = values_log_flush_interval,
+        fsync_interval: float = values_log_fsync_interval,
+        compression: str = "none",
+        rotate_bytes: int = 0,
+        rotate_secs: float = 0,
+    ):
+        self.path = path
+        self.time_start = time_start
+        self.capacity = capacity
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.dropped = 0  # rows dropped because the buffer was full
+        self.written = 0  # rows written to the file
+
+        # compressed (and rotated) on the writing thread, so never on the GUI thread
+        self._file = LogFile(
+            path, self._header(header), compression, rotate_bytes, rotate_secs
+        )
+
+        self._ready = threading.Condition()
+        self._rows = []  # buffered rows, oldest first
+        self._oldest = None  # time.monotonic() the oldest buffered row was submitted
+        self._writing_since = None  # the same, for the rows being written
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def lag(self) -> float:
+        """Secs the oldest row not yet written has waited"""
+        with self._ready:
+            waiting = [t for t in (self._writing_since, self._oldest) if t is not None]
+        return time.monotonic() - min(waiting) if waiting else 0.0
+
+    def submit(self, row: list):
+        with self._ready:
+            if len(self._rows) >= self.capacity:
+                self.dropped += 1
+                return
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._rows.append(row)
+            if len(self._rows) == self.flush_rows:
+                self._ready.notify()
+
+    def submit_rows(self, rows: list):
+        """submit() for many rows at once (in time order)"""
+        with self._ready:
+            room = self.capacity - len(self._rows)
+            if len(rows) > room:
+                self.dropped += len(rows) - room
+                rows = rows[:room]
+            if not rows:
+                return
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._rows.extend(rows)
+            if len(self._rows) >= self.flush_rows:
+                self._ready.notify()
+
+    def close(self):
+        """Writes the buffered rows, fsyncs and closes the file"""
+        with self._ready:
+            self._closing = True
+            self._ready.notify()
+        self._thread.join()
+
+    def _run(self):
+        last_fsync = time.monotonic()
+        while True:
+            with self._ready:
+                self._ready.wait_for(
+                    lambda: self._closing or len(self._rows) >= self.flush_rows,
+                    timeout=self.flush_interval,
+                )
+                rows, self._rows = self._rows, []
+                self._writing_since, self._oldest = self._oldest, None
+                closing = self._closing
+            try:
+                if rows:
+                    self._write(rows)
+                if closing or time.monotonic() - last_fsync >= self.fsync_interval:
+                    self._file.fsync()
+                    last_fsync = time.monotonic()
+            except Exception as e:
+                print(f"Error logging values: {e}")
+            with self._ready:
+                self._writing_since = None
+            if closing:
+                break
+        self._file.close()
+
+    def _header(self, header: list) -> list:
+        return header
+
+    def _format(self, rows: list) -> list:
+        """The csv rows to write for submitted rows"""
+        return [
+            [
+                datetime.fromtimestamp(row[0]).isoformat(),
+                f"{row[0] - self.time_start:.3f}",
+                *(format_value(value) for value in row[1:]),
+            ]
+            for row in rows
+        ]
+
+    def _write(self, rows: list):
+        self._file.writerows(self._format(rows))
+        self._file.flush()
+        self.written += len(rows)
+
+
+class SparseValuesLogWriter(ValuesLogWriter):
+    """
+    ValuesLogWriter that only records the values that changed since the previous row, as
+    (Elapsed_Time_s, Signal, Value) records\n
+    Every keyframe_interval secs (from the first row), and at the start of every segment, a
+    keyframe records every value instead: a (time, KEYFRAME, start time) record, then one per
+    signal in the wide layout's column order, so the values at any time can be rebuilt from the
+    keyframe before it (in the same segment).
+    values_log.expand_sparse_log() converts a sparse log back to the wide layout
+    """
+
+    def __init__(
+        self,
+        path: str,
+        header: list,
+        time_start: float,
+        keyframe_interval: float = values_log_keyframe_interval,
+        **kwargs,
+    ):
+        self.names = header[2:]  # a signal per value of a submitted row
+        self.keyframe_interval = keyframe_interval
+        self._last = None  # values of the previous row
+        self._next_keyframe = -math.inf  # time of the next keyframe
+        super().__init__(path, header, time_start, **kwargs)
+
+    def _header(self, header: list) -> list:
+        return SPARSE_HEADER
+
+    def _format(self, rows: list) -> list:
+        records = []
+        for row in rows:
+            elapsed = f"{row[0] - self.time_start:.3f}"
+            values = row[1:]
+            if row[0] >= self._next_keyframe:
+                records.append([elapsed, KEYFRAME, repr(self.time_start)])
+                records.extend(
+                    [elapsed, name, format_value(value)]
+                    for name, value in zip(self.names, values)
+                )
+                self._next_keyframe = row[0] + self.keyframe_interval
+            else:
+                records.extend(
+                    [elapsed, name, format_value(value)]
+                    for name, value, last in zip(self.names, values, self._last)
+                    if value != last
+                )
+            self._last = values
+        return records
+
+    def _write(self, rows: list):
+        if self._file.rotate_if_due():
+            self._next_keyframe = -math.inf  # so each segment can be read on its own
+        super()._write(rows)
@@ -7,6 +7,7 @@ import paramiko
 from PyQt5.QtCore import QThread, pyqtSignal
 
 from config import get_SSH_credentials
+from ssh_broker import get_ssh_client
 
 # Port the Dash visualizer binds to on the Pi and locally after forwarding.
 VISUALIZER_PORT = 8050
@@ -176,17 +177,9 @@ class VisualizerTunnelThread(QThread):
         self._cleanup()
 
     def _connect_to_pi(self) -> paramiko.SSHClient | None:
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        hostname, username, password = get_SSH_credentials()
+        """Returns the GUI's shared SSH connection (see ssh_broker)"""
         try:
-            ssh.connect(
-                hostname=hostname,
-                username=username,
-                password=password,
-                timeout=5,
-            )
-            return ssh
+            return get_ssh_client(get_SSH_credentials(), timeout=5)
 
         except paramiko.AuthenticationException:
             self.error.emit("Authentication failed. Check username/password.")
@@ -261,8 +254,5 @@ class VisualizerTunnelThread(QThread):
             server.shutdown()
             server.server_close()
 
-        ssh = self._ssh
+        # The SSH connection is shared with the rest of the GUI, so it is left open
         self._ssh = None
-
-        if ssh is not None:
-            ssh.close()
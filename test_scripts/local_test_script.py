@@ -23,6 +23,9 @@ from main import (
     CANWindow
 )
 from widgets import *
+from config import frame_ring_capacity
+from frame_ring import FrameRing
+from workers.CAN_dump_worker import push_candump_lines
 
 
 can_line = "can0"
@@ -312,13 +315,14 @@ def send_message(client, can_message):
 #         js = None
 #         print(f"Joystick Connection Error: {e}")
 
-def get_can_sent_msgs(from_queue: multiprocessing.Queue, to_queue: multiprocessing.Queue): 
-    '''Puts messages from the from_queue into the to_queue'''
+def get_can_sent_msgs(from_queue: multiprocessing.Queue, sent_queue: multiprocessing.Queue):
+    '''
+    Forwards messages from the from_queue to sent_queue as candump lines\n
+    run_local_test puts them in the frame_ring: a FrameRing has a single producer'''
     print("get_can_sent_msgs() process started!")
     while True:
         try:
-            msg = format_as_candump(from_queue.get())
-            to_queue.put(msg)
+            sent_queue.put(format_as_candump(from_queue.get()))
             sleep(delay)
         except KeyboardInterrupt:
             print("get_can_sent_msgs() process closed!")
@@ -338,13 +342,13 @@ def simple_consumer(queue: multiprocessing.Queue, delay):
         except Exception as e:
             print(f"ERROR - simple_consumer() threw exception {e}")
 
-def start_remote_debugger(current_time: float, timestamp: str, queue, parent_conn, cmd_queue, response_queue, can_log_queue):
+def start_remote_debugger(current_time: float, timestamp: str, queue, parent_conn, cmd_queue, response_queue, can_log_queue, frame_ring):
     app = QApplication(sys.argv)
     for obj in util.all_objs:
         obj.initialize(timestamp) # create QWidgets
     for mod in util.heartbeat_modules:
         mod.init_time(current_time)
-    window = CANWindow(queue, parent_conn, cmd_queue, response_queue, can_log_queue, timestamp)
+    window = CANWindow(queue, parent_conn, cmd_queue, response_queue, can_log_queue, timestamp, frame_ring)
     window.show()
 
     print("Remote debugger has been setup!")
@@ -357,10 +361,11 @@ def start_remote_debugger(current_time: float, timestamp: str, queue, parent_con
         print(f"Unexpected error: {e}")
 
 
-def run_local_test(msg_queue: multiprocessing.Queue, delay, data = None):
+def run_local_test(msg_queue: multiprocessing.Queue, frame_ring: FrameRing, delay, data = None, sent_queue: multiprocessing.Queue = None):
     '''
-    msg_queue is the queue in which to put the data\n
+    frame_ring is the ring in which to put the data (msg_queue gets any lines that are not CAN frames)\n
     delay is the delay between messages\n
+    sent_queue has the candump lines of sent messages (from get_can_sent_msgs), put in the frame_ring here as this is its only producer\n
     data is not yet defined but I'm thinking it could be smth that's just sent?'''
     # TODO
     # take data as an input and feed it into can_dump process with testing = true,
@@ -398,6 +403,13 @@ def run_local_test(msg_queue: multiprocessing.Queue, delay, data = None):
         try:
             cycle += 1
             print(f"--- CYCLE {cycle} ---")
+
+            # Sent messages, as if candump saw them on the bus
+            sent_msgs = []
+            while sent_queue is not None and not sent_queue.empty():
+                sent_msgs.append(sent_queue.get())
+            if sent_msgs:
+                push_candump_lines(sent_msgs, frame_ring, msg_queue)
             
             # ais_msg = make_pretty(generate_ais_msgs(1, 0, 49.9999, 181.35))
             # msg_queue.put(ais_msg)
@@ -429,13 +441,13 @@ def run_local_test(msg_queue: multiprocessing.Queue, delay, data = None):
                     heading = ((math.sin(0.1 * cycle) * 100) + 270) % 360
                     rudder_data = generate_rudder_msg(50, 12, 13, heading, 0, 30001, 29999, 3)
                     msg = format_as_candump(rudder_data)
-                    msg_queue.put(msg)
+                    push_candump_lines([msg], frame_ring, msg_queue)
                     print(f"Message: {msg}")
 
                     # heading = (cycle * -10) % 360
                     heading_data = generate_main_heading_msg(heading + 10, 0, 0)
                     msg = format_as_candump(heading_data)
-                    msg_queue.put(msg)
+                    push_candump_lines([msg], frame_ring, msg_queue)
                     print(f"Message: {msg}")
                     
                     # ==== PLRS PATH + Heading Test ====
@@ -467,7 +479,9 @@ def main():
 
     # Queue initialization
     msg_queue = multiprocessing.Queue()
+    frame_ring = FrameRing(frame_ring_capacity)
     send_queue = multiprocessing.Queue() # queue for sent can msgs
+    sent_queue = multiprocessing.Queue() # sent can msgs, as candump lines for data_proc to put in the frame_ring
     dump_queue = multiprocessing.Queue() # here goes all the stuff I don't want to deal with
     empty_queue = multiprocessing.Queue() # here is an empty queue for functions that take input from a queue
     parent_conn, child_conn = multiprocessing.Pipe() # TODO: do I need a simple_pipe_consumer() ? Will there be a problem if I don't connect the child end?
@@ -487,8 +501,8 @@ def main():
 
     dump_proc = multiprocessing.Process(target=simple_consumer, args=(dump_queue, delay / 2))
     # TODO: I would like to implement a keyboard-press thing that can pause and unpause sending data
-    data_proc = multiprocessing.Process(target=run_local_test, args=(msg_queue, delay))
-    post_sent_msgs_proc = multiprocessing.Process(target=get_can_sent_msgs, args=(send_queue, msg_queue))
+    data_proc = multiprocessing.Process(target=run_local_test, args=(msg_queue, frame_ring, delay, None, sent_queue))
+    post_sent_msgs_proc = multiprocessing.Process(target=get_can_sent_msgs, args=(send_queue, sent_queue))
 
     dump_proc.start()
     data_proc.start()
@@ -501,22 +515,26 @@ def main():
     print("Local test script - Sets up and passes sample data into an instance of a CANWindow application")
     print("=" * 60)
 
-    start_remote_debugger(current_time, timestamp, msg_queue, parent_conn, send_queue, empty_queue, dump_queue)
+    start_remote_debugger(current_time, timestamp, msg_queue, parent_conn, send_queue, empty_queue, dump_queue, frame_ring)
 
     # Clean up all processes etc. here
     print("Cleaning up...")
     dump_proc.terminate()
     data_proc.terminate()
+    post_sent_msgs_proc.terminate()
 
     dump_proc.join(timeout=2)
     data_proc.join(timeout=2)
+    post_sent_msgs_proc.join(timeout=2)
 
     parent_conn.close()
     child_conn.close()
 
     msg_queue.close()
+    sent_queue.close()
     dump_queue.close()
     empty_queue.close()
+    frame_ring.close()
 
     print("Cleanup complete.")
 
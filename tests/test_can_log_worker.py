@@ -0,0 +1,94 @@
+import csv
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from src.can_frame import format_candump_line
+from src.workers.CAN_log_worker import (
+    CANLogStats, TimestampFormatter, can_logging_process
+)
+
+
+def read_log(tmp_path):
+    with open(tmp_path / "logs" / "candump_test.csv", newline="") as csv_file:
+        return list(csv.reader(csv_file))
+
+
+@pytest.fixture
+def logger(tmp_path, monkeypatch):
+    """can_logging_process, run on a thread, writing logs/candump_test.csv in tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    log_queue = queue.Queue()
+    stats = CANLogStats()
+    thread = threading.Thread(
+        target=can_logging_process, args=(None, log_queue, "test", stats)
+    )
+    thread.start()
+    yield log_queue, stats, thread
+    log_queue.put("__EXIT__")
+    thread.join(timeout=5)
+
+
+def test_messages_are_written_in_order(logger, tmp_path):
+    log_queue, stats, thread = logger
+    frames = [(time.time() + i / 100, 0x204, bytes([i % 256, 0x27])) for i in range(2500)]
+    for frame in frames[:1200]:
+        log_queue.put(frame)
+    log_queue.put("[ERROR] test message")
+    for frame in frames[1200:]:
+        log_queue.put(frame)
+    log_queue.put("__EXIT__")
+    thread.join(timeout=5)
+
+    rows = read_log(tmp_path)[1:]
+    assert [row[2] for row in rows] == [
+        *(format_candump_line(f[1], f[2]) for f in frames[:1200]),
+        "[ERROR] test message",
+        *(format_candump_line(f[1], f[2]) for f in frames[1200:]),
+    ]
+    assert rows[0][0] == datetime.fromtimestamp(frames[0][0]).isoformat()
+    assert stats.written == 2501  # updated when exiting
+
+
+def test_frame_source_batches_are_logged_in_order(logger, tmp_path):
+    log_queue, stats, thread = logger
+    now = time.time()
+    log_queue.put([(now, 0x130, b""), "[ERROR] bus off", (now + 0.01, 0x204, b"\x01\x02")])
+    log_queue.put("can0  001  [05]  5E 87 01 00 40")  # eg. a sent command
+    log_queue.put("__EXIT__")
+    thread.join(timeout=5)
+
+    assert [row[2] for row in read_log(tmp_path)[1:]] == [
+        format_candump_line(0x130, b""),
+        "[ERROR] bus off",
+        format_candump_line(0x204, b"\x01\x02"),
+        "can0  001  [05]  5E 87 01 00 40",
+    ]
+
+
+def test_waits_for_messages_without_spinning(logger, tmp_path):
+    log_queue, stats, thread = logger
+    start = time.process_time()
+    time.sleep(0.5)
+    log_queue.put("late line")
+
+    deadline = time.monotonic() + 3
+    while stats.written < 1 and time.monotonic() < deadline:  # flushed within a second
+        time.sleep(0.05)
+
+    assert stats.written == 1 and read_log(tmp_path)[1][2] == "late line"
+    assert time.process_time() - start < 0.25  # mostly blocked, not busy waiting
+
+
+def test_timestamp_formatter_matches_datetime():
+    format_timestamp = TimestampFormatter()
+    rng = random.Random(0)
+    times = [1_700_000_000 + rng.uniform(0, 5) for _ in range(2000)]
+    times += [1_700_000_001.0, 1_700_000_001.9999996, 1_700_000_002.0000004]
+
+    for t in sorted(times):
+        assert format_timestamp(t) == datetime.fromtimestamp(t).isoformat()
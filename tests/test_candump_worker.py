@@ -0,0 +1,100 @@
+import time
+from queue import Queue
+
+import pytest
+
+from src.frame_ring import FrameRing, iter_frames
+from src.workers.CAN_dump_worker import (
+    CandumpLineFramer,
+    ClockOffsetEstimator,
+    push_candump_lines,
+)
+
+
+@pytest.mark.parametrize(
+    "reads, expected_lines",
+    [
+        ([b"can0  100  [03]  01 02 03\n"], ["can0  100  [03]  01 02 03"]),
+        ([b"can0  100  [03]  01 0", b"2 03\n"], ["can0  100  [03]  01 02 03"]),
+        ([b"can0  130  [00]\ncan0  131", b"  [00]\n"], ["can0  130  [00]", "can0  131  [00]"]),
+        ([b"can0  130  [00]", b"", b"\n"], ["can0  130  [00]"]),
+        ([b"\n\n  \n"], []),
+        ([b"no newline yet"], []),
+    ]
+)
+def test_feed_reassembles_lines(reads, expected_lines):
+    framer = CandumpLineFramer()
+    lines = []
+    for data in reads:
+        lines += framer.feed(data)
+    assert lines == expected_lines
+
+
+def test_feed_split_at_every_byte():
+    # Simulates the worst case: every recv() returns a single byte
+    stream = b"can0  204  [16]  00 11 22 33 44 55 66 77 88 99 AA BB CC DD EE FF\ncan0  132  [00]\n"
+    framer = CandumpLineFramer()
+    lines = []
+    for i in range(len(stream)):
+        lines += framer.feed(stream[i:i + 1])
+    assert lines == [
+        "can0  204  [16]  00 11 22 33 44 55 66 77 88 99 AA BB CC DD EE FF",
+        "can0  132  [00]",
+    ]
+
+
+def test_clock_offset_uses_smallest_delay():
+    clock = ClockOffsetEstimator(window=10.0)
+    # Pi clock is 100 s behind; frames take 5, 1 and 3 ms to arrive
+    clock.update(0.0, 100.005)
+    clock.update(1.0, 101.001)
+    clock.update(2.0, 102.003)
+    assert clock.offset == pytest.approx(100.001)
+    assert clock.to_local(3.0, 103.050) == pytest.approx(103.001)
+
+
+def test_clock_offset_follows_clock_changes():
+    clock = ClockOffsetEstimator(window=10.0)
+    clock.update(0.0, 100.001)
+    # Pi clock is set back by 50 s; the old (smaller) offset is kept until it leaves the window
+    clock.update(-45.0, 105.002)
+    assert clock.offset == pytest.approx(100.001)
+    clock.update(-38.0, 112.003)
+    assert clock.offset == pytest.approx(150.002)
+
+
+def test_push_candump_lines_maps_timestamps():
+    frame_ring = FrameRing(8)
+    queue = Queue()
+    clock = ClockOffsetEstimator()
+    try:
+        push_candump_lines(
+            ["(1000.250000)  can0  204  [02]  01 02", "(1000.000000)  can0  130  [00]"],
+            frame_ring,
+            queue,
+            clock,
+        )
+        timestamps = [frame[0] for frame in iter_frames(frame_ring.read())]
+        # Frames keep their spacing on the Pi, whatever the offset is
+        assert timestamps[0] - timestamps[1] == pytest.approx(0.25)
+        assert timestamps[0] <= time.time()
+        assert queue.empty()
+    finally:
+        frame_ring.close()
+
+
+def test_push_candump_lines_tees_frames_and_lines_to_log_queue():
+    frame_ring = FrameRing(8)
+    queue, log_queue = Queue(), Queue()
+    try:
+        push_candump_lines(
+            ["can0  204  [02]  01 02", "[ERROR] bus off", "can0  130  [00]"],
+            frame_ring,
+            queue,
+            log_queue=log_queue,
+        )
+        frames = list(iter_frames(frame_ring.read()))
+        assert log_queue.get_nowait() == [frames[0], "[ERROR] bus off", frames[1]]
+        assert queue.get_nowait() == ["[ERROR] bus off"]
+    finally:
+        frame_ring.close()
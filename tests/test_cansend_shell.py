@@ -0,0 +1,164 @@
+import queue
+import subprocess
+import threading
+
+import pytest
+
+import src.workers.CAN_send_worker as CAN_send_worker
+from src.workers.CAN_send_worker import CANSEND_SHELL, CansendShell, cansend_worker, put_urgent
+
+
+class LocalChannel:
+    """Runs CANSEND_SHELL in a local bash process instead of on the Pi"""
+
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            ["bash", "-c", CANSEND_SHELL],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+
+    def sendall(self, data: bytes):
+        self.proc.stdin.write(data.decode())
+        self.proc.stdin.flush()
+
+    def makefile(self, mode):
+        return self.proc.stdout
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+class ScriptedChannel:
+    """Answers with the given lines once the first command is sent"""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.sent = threading.Event()
+
+    def sendall(self, data: bytes):
+        self.sent.set()
+
+    def makefile(self, mode):
+        self.sent.wait(5)
+        return iter(self.lines)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def shell():
+    responses = queue.Queue()
+    channel = LocalChannel()
+    shell = CansendShell(
+        channel, lambda *response: responses.put(response)
+    )
+    yield shell, responses
+    shell.close()
+
+
+def test_responses_arrive_in_order(shell):
+    shell, responses = shell
+    for i in range(5):
+        shell.send(f"echo frame {i}")
+
+    for i in range(5):
+        cmd, out, err, latency = responses.get(timeout=5)
+        assert (cmd, out, err) == (f"echo frame {i}", f"frame {i}", "")
+        assert latency >= 0
+
+
+def test_failed_command_reports_error(shell):
+    shell, responses = shell
+    shell.send("echo 'bad frame' >&2; false")
+
+    cmd, out, err, _ = responses.get(timeout=5)
+    assert out == ""
+    assert err == "bad frame"
+
+
+def test_multiline_output_stays_one_response(shell):
+    shell, responses = shell
+    shell.send("printf 'a\\nb\\n'")
+    shell.send("true")
+
+    assert responses.get(timeout=5)[1] == "a b"
+    assert responses.get(timeout=5)[0] == "true"
+
+
+def test_pending_commands_fail_when_shell_closes(shell):
+    shell, responses = shell
+    shell.send("sleep 0.2")
+    shell.send("kill -9 $$")  # the shell itself, not the command's subshell
+    shell.send("echo never answered")
+
+    assert responses.get(timeout=5)[2] == ""
+    assert responses.get(timeout=5)[2] == "cansend shell closed"
+    assert responses.get(timeout=5)[2] == "cansend shell closed"
+    shell._reader.join(timeout=5)
+    assert not shell.alive
+
+
+def test_failed_write_is_not_matched_to_a_response(shell):
+    shell, responses = shell
+    shell.send("echo first")
+    sendall = shell._channel.sendall
+
+    def broken_sendall(data):
+        raise OSError("Socket is closed")
+
+    shell._channel.sendall = broken_sendall
+    with pytest.raises(OSError):
+        shell.send("echo lost")
+    shell._channel.sendall = sendall
+
+    assert responses.get(timeout=5)[:2] == ("echo first", "first")
+    shell._reader.join(timeout=5)
+    assert not shell.alive
+    assert responses.empty()  # nothing reported for the unsent command
+
+
+def test_lines_that_are_not_responses_are_skipped(monkeypatch):
+    errors = []
+    monkeypatch.setattr(threading, "excepthook", errors.append)
+    responses = queue.Queue()
+    lines = ["Welcome to Raspberry Pi\n", "0 packages can be upgraded\n", "@cansend 0 \n", "@cansend 0 extra\n"]
+    shell = CansendShell(ScriptedChannel(lines), lambda *response: responses.put(response))
+
+    shell.send("cansend can0 001#00")
+    shell._reader.join(timeout=5)
+
+    assert responses.get_nowait()[:3] == ("cansend can0 001#00", "", "")
+    assert responses.empty()  # the extra response matched no command
+    assert errors == []  # the reader thread didn't die
+
+
+def test_worker_sends_urgent_commands_ahead_of_queued_ones(monkeypatch):
+    class RecordingShell:
+        alive = True
+        sent = []
+
+        def send(self, cmd):
+            self.sent.append(cmd)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(CAN_send_worker.CansendShell, "open", lambda client, on_response: RecordingShell())
+    monkeypatch.setattr(CAN_send_worker, "get_ssh_client", lambda credentials: None)
+    monkeypatch.setattr(CAN_send_worker, "close_ssh_clients", lambda: None)
+    cmd_queue, urgent_queue = queue.Queue(), queue.Queue()
+    for cmd in ("cansend can0 200##0A", "cansend can0 210##0B"):
+        cmd_queue.put(cmd)
+    put_urgent(cmd_queue, urgent_queue, "cansend can0 202##00A")
+    put_urgent(cmd_queue, urgent_queue, "cansend can0 003##00F")
+    cmd_queue.put("__EXIT__")
+
+    cansend_worker(cmd_queue, queue.Queue(), queue.Queue(), ("pi", "user", "pw"), urgent_queue)
+
+    assert RecordingShell.sent == [
+        "cansend can0 202##00A", "cansend can0 003##00F", "cansend can0 200##0A", "cansend can0 210##0B"
+    ]
@@ -0,0 +1,81 @@
+import pytest
+
+from src.command_scheduler import CommandScheduler
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def urgent():
+    return []
+
+
+@pytest.fixture
+def scheduler(sent, urgent):
+    return CommandScheduler(
+        sent.append, coalesced_ids=("001", "002"), urgent_ids=("202", "003"), send_urgent=urgent.append
+    )
+
+
+def test_only_latest_coalesced_command_is_sent(scheduler, sent):
+    for angle in ("10", "20", "30"):
+        assert not scheduler.submit("001", f"cansend can0 001##0{angle}")
+    scheduler.submit("002", "cansend can0 002##0AA")
+
+    assert sent == []
+    scheduler.flush()
+
+    assert sent == ["cansend can0 001##030", "cansend can0 002##0AA"]
+    assert scheduler.coalesced_count == 2
+    assert scheduler.pending() == 0
+
+
+def test_flush_with_nothing_held_sends_nothing(scheduler, sent):
+    scheduler.submit("001", "cansend can0 001##010")
+    scheduler.flush()
+    scheduler.flush()
+
+    assert sent == ["cansend can0 001##010"]
+
+
+def test_other_frames_skip_the_scheduler(scheduler, sent):
+    scheduler.submit("001", "cansend can0 001##010")
+
+    assert scheduler.submit("200", "cansend can0 200##00A")
+
+    assert sent == ["cansend can0 200##00A"]
+    assert scheduler.pending() == 1
+
+
+@pytest.mark.parametrize("frame_id", ["202", "003"])
+def test_urgent_frames_are_sent_ahead_of_the_queue(scheduler, sent, urgent, frame_id):
+    scheduler.submit("001", "cansend can0 001##010")
+
+    assert scheduler.submit(frame_id, f"cansend can0 {frame_id}##00A")
+
+    assert urgent == [f"cansend can0 {frame_id}##00A"]
+    assert sent == []
+
+
+def test_commands_of_different_kinds_on_one_frame_id_are_both_sent(scheduler, sent):
+    scheduler.submit("001", "cansend can0 001##0A00000000", kind="heading")
+    scheduler.submit("001", "cansend can0 001##0B00000080", kind="rudder")
+    scheduler.submit("001", "cansend can0 001##0C00000080", kind="rudder")
+    scheduler.flush()
+
+    assert sent == ["cansend can0 001##0A00000000", "cansend can0 001##0C00000080"]
+
+
+def test_on_sent_is_only_called_for_commands_sent(scheduler, sent):
+    shown = []
+    for angle in ("10", "20"):
+        scheduler.submit("001", f"cansend can0 001##0{angle}", on_sent=lambda angle=angle: shown.append(angle))
+    scheduler.submit("202", "cansend can0 202##001", on_sent=lambda: shown.append("power"))
+
+    assert shown == ["power"]
+    scheduler.flush()
+
+    assert shown == ["power", "20"]  # 10 was replaced before being sent
@@ -201,3 +201,14 @@ class Test_DataObject:
                     assert pen.style() == Qt.DashLine
                 else: assert pen.style() == Qt.SolidLine
 
+
+
+def test_late_datapoints_are_stored_in_time_order():
+    d_obj = DataObject("late", 2, "deg", None)
+    d_obj.add_datapoints([1.0, 2.0, 3.0], [10.0, 20.0, 30.0])
+    d_obj.add_datapoint(2.5, 25.0)  # eg. a frame routed frame by frame, after a batch
+    d_obj.add_datapoints([1.5, 4.0], [15.0, None])
+
+    assert list(d_obj.data.times) == [1.0, 1.5, 2.0, 2.5, 3.0, 4.0]
+    assert list(d_obj.data.values)[:5] == [10.0, 15.0, 20.0, 25.0, 30.0]
+    assert d_obj.current == 4.0
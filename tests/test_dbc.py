@@ -0,0 +1,176 @@
+import pytest
+
+import src.dbc as dbc
+from src.can_frame import CAN_EFF_FLAG
+from src.dbc import dbc_frame_spec, load_dbc, parse_dbc, signal_dp
+from src.frame_sources.synthetic import synthetic_frames
+from src.utils import *
+
+# The rudder debug (0x204) and PDB (0x206) frames, as a firmware team's .dbc would describe them
+POLARIS_DBC = """
+VERSION ""
+
+BU_: RUDR PDB MAIN
+
+BO_ 516 RUDR_DEBUG: 16 RUDR
+ SG_ Actual_rdr_deg : 0|16@1+ (0.01,-90) [-90|90] "deg" MAIN
+ SG_ IMU_roll : 16|16@1+ (0.01,-180) [-180|180] "deg" MAIN
+ SG_ IMU_pitch : 32|16@1+ (0.01,-180) [-180|180] "deg" MAIN
+ SG_ IMU_heading : 48|16@1+ (0.01,0) [0|360] "deg" MAIN
+ SG_ Set_rdr_deg : 64|16@1+ (0.01,-90) [-90|90] "deg" MAIN
+ SG_ IMU_integral : 80|16@1+ (1,-30000) [0|0] "" MAIN
+ SG_ IMU_derivative : 96|16@1+ (1,-30000) [0|0] "" MAIN
+ SG_ Speed_over_gnd : 112|16@1+ (0.001,0) [0|0] "km/h" MAIN
+
+BO_ 518 PDB_STATUS: 24 PDB
+ SG_ Volt2 : 0|16@1+ (0.001,0) [0|5] "V" MAIN
+ SG_ Temp1 : 16|16@1+ (0.01,0) [0|127] "degC" MAIN
+ SG_ Volt3 : 32|16@1+ (0.001,0) [0|5] "V" MAIN
+ SG_ Temp2 : 48|16@1+ (0.01,0) [0|127] "degC" MAIN
+ SG_ Temp3 : 64|16@1+ (0.01,0) [0|127] "degC" MAIN
+ SG_ Volt4 : 80|16@1+ (0.001,0) [0|5] "V" MAIN
+ SG_ Volt1 : 96|16@1+ (0.001,0) [0|5] "V" MAIN
+ SG_ MPPT_curr_hull_port : 112|16@1+ (0.001,0) [0|5] "A" MAIN
+ SG_ MPPT_curr_sail_port : 128|16@1+ (0.001,0) [0|5] "A" MAIN
+ SG_ MPPT_curr_hull_star : 144|16@1+ (0.001,0) [0|5] "A" MAIN
+ SG_ MPPT_curr_sail_star : 160|16@1+ (0.001,0) [0|5] "A" MAIN
+
+BO_ 2147484416 IMU_RAW: 8 RUDR
+ SG_ accel_x : 0|12@1- (0.01,0) [-20.48|20.47] "m/s2" MAIN
+ SG_ accel_y : 12|12@1- (0.01,0) [-20.48|20.47] "m/s2" MAIN
+ SG_ gyro_z : 24|16@1- (0.1,0) [0|0] "deg/s" MAIN
+ SG_ mode : 40|3@1+ (1,0) [0|7] "" MAIN
+ SG_ valid : 43|1@1+ (1,0) [0|1] "" MAIN
+
+CM_ SG_ 516 Actual_rdr_deg "Measured rudder angle";
+BA_DEF_ BO_ "GenMsgCycleTime" INT 0 10000;
+"""
+
+
+@pytest.fixture
+def messages():
+    return {message["frame_id"]: message for message in parse_dbc(POLARIS_DBC)}
+
+
+def test_parse_dbc(messages):
+    assert sorted(messages) == [0x204, 0x206, CAN_EFF_FLAG | 0x300]
+    rudder = messages[0x204]
+    assert rudder["name"] == "RUDR_DEBUG" and rudder["length"] == 16
+    assert len(rudder["signals"]) == 8
+    assert rudder["signals"][0] == {
+        "name": "Actual_rdr_deg",
+        "start": 0,
+        "size": 16,
+        "little_endian": True,
+        "signed": False,
+        "factor": 0.01,
+        "offset": -90.0,
+        "minn": -90.0,
+        "maxn": 90.0,
+        "unit": "deg",
+        "multiplexer": None,
+        "float": False,
+    }
+
+
+def test_dbc_decoders_match_hand_written_parsers(messages):
+    decoders = {frame_id: dbc_frame_spec(m).decode for frame_id, m in messages.items()}
+    hand_parsers = {0x204: parse_0x204_frame, 0x206: parse_0x206_frame}
+    checked = 0
+    for t in range(0, 600, 7):
+        for frame_id, payload in synthetic_frames(t):
+            if frame_id in hand_parsers:
+                assert decoders[frame_id](payload) == hand_parsers[frame_id](payload)
+                checked += 1
+    assert checked > 100
+
+
+def test_bit_fields_and_signed_values(messages):
+    spec = dbc_frame_spec(messages[CAN_EFF_FLAG | 0x300])
+    accel_x, accel_y, gyro_z, mode, valid = -150, 2047, -1234, 5, 1
+    raw = (
+        (accel_x & 0xFFF)
+        | (accel_y & 0xFFF) << 12
+        | (gyro_z & 0xFFFF) << 24
+        | mode << 40
+        | valid << 43
+    )
+
+    parsed = spec.decode(raw.to_bytes(8, "little"))
+
+    assert parsed["accel_x"] == pytest.approx(-1.5)
+    assert parsed["accel_y"] == pytest.approx(20.47)
+    assert parsed["gyro_z"] == pytest.approx(-123.4)
+    assert parsed["mode"] == 5 and parsed["valid"] == 1
+
+
+def test_unsupported_signals_are_rejected():
+    (message,) = parse_dbc(
+        'BO_ 100 MOTOROLA: 8 X\n SG_ value : 7|16@0+ (1,0) [0|0] "" Y\n'
+    )
+    with pytest.raises(ValueError):
+        dbc_frame_spec(message)
+
+
+def test_load_dbc_is_cached_by_file_hash(tmp_path, monkeypatch):
+    path = tmp_path / "polaris.dbc"
+    path.write_text(POLARIS_DBC)
+    cache_dir = tmp_path / "cache"
+    parsed = load_dbc(str(path), str(cache_dir))
+
+    monkeypatch.setattr(dbc, "parse_dbc", lambda text: pytest.fail("not cached"))
+    assert load_dbc(str(path), str(cache_dir)) == parsed
+
+    path.write_text(POLARIS_DBC.replace("RUDR_DEBUG", "RUDR_DBG"))
+    monkeypatch.undo()
+    assert load_dbc(str(path), str(cache_dir))[0]["name"] == "RUDR_DBG"
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+@pytest.mark.parametrize(
+    "factor, dp", [(1, 0), (0.1, 1), (0.01, 2), (0.001, 3), (0.5, 1)]
+)
+def test_signal_dp(factor, dp):
+    assert signal_dp(factor) == dp
+
+
+def test_new_dbc_frame_of_known_signals_feeds_their_data_objects(tmp_path, monkeypatch):
+    import src.utils as utils
+
+    for name in ("all_objs", "data_objs", "graph_objs"):
+        monkeypatch.setattr(utils, name, list(getattr(utils, name)))
+    for name in ("frame_decoders", "batch_specs", "dbc_frames"):
+        monkeypatch.setattr(utils, name, dict(getattr(utils, name)))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "backup.dbc").write_text(
+        'BO_ 1024 RUDR_BACKUP: 4 RUDR\n SG_ Actual_rdr_deg : 0|16@1+ (0.01,-90) [-90|90] "deg" MAIN\n'
+        ' SG_ Backup_volt : 16|16@1+ (0.001,0) [0|5] "V" MAIN\n'
+    )
+    objs_before = len(utils.all_objs)
+
+    frames = utils.load_dbc_frames("backup.dbc")
+
+    assert [obj.name for obj in frames[0x400]] == ["Actual_rdr_deg", "Backup_volt"]
+    assert frames[0x400][0] is next(obj for obj in utils.rudder_objs if obj.name == "Actual_rdr_deg")
+    assert len(utils.all_objs) == objs_before + 1  # only Backup_volt is new
+
+
+def test_signal_with_zero_factor_is_skipped(tmp_path, monkeypatch):
+    import src.utils as utils
+
+    for name in ("all_objs", "data_objs", "graph_objs"):
+        monkeypatch.setattr(utils, name, list(getattr(utils, name)))
+    for name in ("frame_decoders", "batch_specs", "dbc_frames"):
+        monkeypatch.setattr(utils, name, dict(getattr(utils, name)))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "broken.dbc").write_text(
+        'BO_ 1025 SENSORS: 4 X\n SG_ Broken : 0|16@1+ (0,5) [0|0] "" Y\n'
+        ' SG_ Working : 16|16@1+ (0.01,0) [0|0] "" Y\n'
+        'BO_ 1026 OTHER: 2 X\n SG_ Other : 0|16@1+ (1,0) [0|0] "" Y\n'
+    )
+
+    frames = utils.load_dbc_frames("broken.dbc")
+
+    assert [obj.name for obj in frames[0x401]] == ["Working"]
+    assert [obj.name for obj in frames[0x402]] == ["Other"]  # the rest of the file still loads
+    assert utils.frame_decoders[0x401](bytes([0, 0, 0x10, 0x27])) == {"Working": pytest.approx(100)}
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from src.decimation import MinMaxDecimator, bucket_width, min_max_points
+from src.ring_series import RingSeries
+
+
+@pytest.mark.parametrize("span, pixels", [(60, 1200), (600, 1200), (3600, 800), (1, 3)])
+def test_bucket_width_gives_at_most_one_bucket_per_pixel(span, pixels):
+    width = bucket_width(span, pixels)
+    assert np.log2(width) == int(np.log2(width))  # a power of two
+    assert pixels / 2 < span / width <= pixels
+
+
+def test_min_max_points_keeps_spikes_in_time_order():
+    times = np.arange(0, 10, 0.01)
+    values = np.sin(times)
+    values[123] = 50  # one sample spikes
+    values[700] = -50
+
+    xs, ys = min_max_points(times, values, 1.0)
+
+    assert len(xs) == 20  # 2 per bucket
+    assert 50 in ys and -50 in ys
+    assert np.all(np.diff(xs) > 0)
+
+
+def test_min_max_points_of_one_point_buckets():
+    xs, ys = min_max_points(np.array([0.5, 1.5, 1.7]), np.array([1.0, 2.0, 3.0]), 1.0)
+    assert list(xs) == [0.5, 1.5, 1.7]
+    assert list(ys) == [1.0, 2.0, 3.0]
+
+
+def test_incremental_updates_match_decimating_all_at_once():
+    rng = np.random.default_rng(1)
+    width = 0.25
+    series = RingSeries(100_000)
+    decimator = MinMaxDecimator(width, 10_000)
+    t = 0.0
+    for _ in range(200):  # points arrive in ticks of varying size
+        count = int(rng.integers(0, 40))
+        times = t + np.cumsum(rng.uniform(0.001, 0.02, count))
+        series.extend(times, rng.normal(size=count))
+        t = times[-1] if count else t
+        xs, ys = decimator.update(series.times, series.values, start=0)
+
+    expected_xs, expected_ys = min_max_points(series.times, series.values, width)
+    assert np.array_equal(xs, expected_xs)
+    assert np.array_equal(ys, expected_ys)
+
+
+def test_completed_buckets_outlive_their_raw_points():
+    series = RingSeries(150)  # 1.5 s of 100 Hz data
+    decimator = MinMaxDecimator(1.0, 1000)
+    for tick in range(20):  # 0.5 s ticks
+        times = tick / 2 + np.arange(50) / 100
+        series.extend(times, times)
+        xs, ys = decimator.update(series.times, series.values, start=0)
+
+    assert series.times[0] == 8.5
+    assert xs[0] == 0.0 and ys[-1] == 9.99  # 10 s drawn from 1.5 s of raw points
+    assert len(xs) == 20
+
+    xs, _ = decimator.update(series.times, series.values, start=5.5)
+    assert xs[0] == 5.0  # buckets before the view are dropped
+
+
+def test_replaced_points_restart_from_their_start():
+    decimator = MinMaxDecimator(1.0, 100)
+    decimator.update(np.arange(10.0), np.arange(10.0), start=0)
+
+    xs, _ = decimator.update(np.arange(3.0), np.arange(3.0), start=0)
+
+    assert list(xs) == [0.0, 1.0, 2.0]
+
+
+def test_late_point_only_redoes_buckets_from_its_own():
+    series = RingSeries(1000)
+    decimator = MinMaxDecimator(1.0, 1000)
+    series.extend(np.arange(0, 10, 0.1), np.zeros(100))
+    decimator.update(series.times, series.values, start=0)
+    done = decimator._done.times.copy()
+
+    series.insert(7.55, 5.0)  # late: its bucket (7) was already completed
+    decimator.invalidate(7.55)
+    assert np.array_equal(decimator._done.times, done[done < 7])  # earlier buckets are kept
+    xs, ys = decimator.update(series.times, series.values, start=0)
+
+    expected_xs, expected_ys = min_max_points(series.times, series.values, 1.0)
+    assert np.array_equal(xs, expected_xs) and np.array_equal(ys, expected_ys)
+    assert 5.0 in ys
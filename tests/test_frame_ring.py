@@ -0,0 +1,103 @@
+import pickle
+
+import pytest
+
+from src.can_frame import (
+    CAN_EFF_FLAG,
+    format_candump_line,
+    parse_candump_line,
+    split_candump_timestamp,
+)
+from src.frame_ring import FrameRing, iter_frames
+
+
+@pytest.fixture
+def ring():
+    frame_ring = FrameRing(4)
+    yield frame_ring
+    frame_ring.close()
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("can0  204  [16]  00 11 22 33 44 55 66 77 88 99 AA BB CC DD EE FF", (0x204, bytes.fromhex("00112233445566778899aabbccddeeff"))),
+        ("can0  130  [00]", (0x130, b"")),
+        ("can0  041  [4]  01 02 03 04", (0x041, b"\x01\x02\x03\x04")),
+        ("can0  12345678  [01]  FF", (0x12345678 | CAN_EFF_FLAG, b"\xff")),
+        ("can1  204  [01]  FF", None),
+        ("[ERROR] Authentication failed.", None),
+        ("(1760000000.123456)  can0  204  [02]  01 02", (0x204, b"\x01\x02")),
+        ("(1760000000.123456) can0 204#0102", (0x204, b"\x01\x02")),
+        ("(1760000000.123456) can0 12345678##1FF", (0x12345678 | CAN_EFF_FLAG, b"\xff")),
+        ("(1760000000.123456) can0 130#R", (0x130, b"")),
+        ("can0  2X4  [01]  FF", None),
+        ("can0  204  [01]  F", None),
+    ]
+)
+def test_parse_candump_line(line, expected):
+    assert parse_candump_line(line) == expected
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("(1760000000.123456)  can0  204  [00]", (1760000000.123456, "  can0  204  [00]")),
+        ("can0  204  [00]", (None, "can0  204  [00]")),
+        ("(not a time) can0  204  [00]", (None, "(not a time) can0  204  [00]")),
+        ("(1760000000.5", (None, "(1760000000.5")),
+    ]
+)
+def test_split_candump_timestamp(line, expected):
+    assert split_candump_timestamp(line) == expected
+
+
+@pytest.mark.parametrize(
+    "frame_id, payload",
+    [(0x204, bytes(range(16))), (0x130, b""), (0x1ABCDEF | CAN_EFF_FLAG, b"\x01")]
+)
+def test_format_candump_line_round_trip(frame_id, payload):
+    assert parse_candump_line(format_candump_line(frame_id, payload)) == (frame_id, payload)
+
+
+def test_read_returns_frames_in_order(ring):
+    assert ring.push(1.5, 0x204, b"\x01\x02")
+    assert ring.push(2.5, 0x130, b"")
+    assert ring.pending() == 2
+
+    frames = list(iter_frames(ring.read()))
+
+    assert frames == [(1.5, 0x204, b"\x01\x02"), (2.5, 0x130, b"")]
+    assert ring.pending() == 0
+    assert len(ring.read()) == 0
+
+
+def test_overflow_drops_newest_frames(ring):
+    for i in range(6):
+        ring.push(float(i), 0x100, bytes([i]))
+
+    assert ring.overflow_count == 2
+    assert [frame[0] for frame in iter_frames(ring.read())] == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_read_wraps_around(ring):
+    for i in range(3):
+        ring.push(float(i), 0x100, bytes([i]))
+    ring.read()
+    for i in range(3, 7):
+        ring.push(float(i), 0x100, bytes([i]) * 64)
+
+    frames = list(iter_frames(ring.read()))
+
+    assert [frame[0] for frame in frames] == [3.0, 4.0, 5.0, 6.0]
+    assert frames[-1][2] == b"\x06" * 64
+    assert ring.overflow_count == 0
+
+
+def test_pickled_ring_shares_memory(ring):
+    attached = pickle.loads(pickle.dumps(ring))
+    try:
+        attached.push(1.0, 0x206, b"\xaa")
+        assert list(iter_frames(ring.read())) == [(1.0, 0x206, b"\xaa")]
+    finally:
+        attached.close()
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from src.frame_router import FrameRouter
+
+
+class FakeSpec:
+    batchable = True
+
+    def decode_batch(self, payloads):
+        return {"a": payloads[:, 0]}
+
+
+class FakeDataObject:
+    def __init__(self, name):
+        self.name = name
+        self.points = []
+        self.label_updates = 0
+
+    def parse_frame(self, current_time, payload, parsed_dict=None):
+        value = payload[0] if parsed_dict is None else parsed_dict[self.name]
+        self.points.append((current_time, value))
+
+    def parse_frames(self, frame_times, columns):
+        self.points += list(zip(frame_times, columns[self.name].tolist()))
+
+    def update_label(self):
+        self.label_updates += 1
+
+
+@pytest.fixture
+def errors():
+    return []
+
+
+@pytest.fixture
+def router(errors):
+    return FrameRouter(on_error=lambda frame_id, e: errors.append((frame_id, e)))
+
+
+def test_decoded_frame_reaches_every_subscribed_obj(router):
+    objs = [FakeDataObject("a"), FakeDataObject("b")]
+    router.register(0x204, lambda payload: {"a": payload[0], "b": payload[1]}, objs)
+
+    assert router.dispatch(1.5, 0x204, b"\x01\x02")
+
+    assert objs[0].points == [(1.5, 1)] and objs[1].points == [(1.5, 2)]
+    assert objs[0].label_updates == objs[1].label_updates == 1
+
+
+def test_single_value_obj_parses_payload_itself(router):
+    obj = FakeDataObject("pH")
+    router.register(0x110, objs=[obj])
+
+    router.dispatch(2.0, 0x110, b"\x07")
+
+    assert obj.points == [(2.0, 7)]
+
+
+def test_handler_gets_parsed_dict_or_payload(router):
+    calls = []
+    router.register(
+        0x001, lambda payload: {"bit": True}, handler=lambda *a: calls.append(a)
+    )
+    router.register(0x130, handler=lambda *a: calls.append(a))
+
+    router.dispatch(1.0, 0x001, b"\x00")
+    router.dispatch(2.0, 0x130, b"")
+
+    assert calls == [(1.0, {"bit": True}), (2.0, b"")]
+
+
+def test_parse_errors_are_reported(router, errors):
+    router.register(0x206, lambda payload: payload[10], [FakeDataObject("volts")])
+
+    assert router.dispatch(1.0, 0x206, b"\x00")
+
+    assert len(errors) == 1 and errors[0][0] == 0x206
+
+
+def test_unknown_frames_are_counted_and_printed_once(router, capsys):
+    router.register(0x002)
+
+    assert router.dispatch(1.0, 0x002, b"\x00")
+    for _ in range(3):
+        assert not router.dispatch(1.0, 0x999, b"")
+    router.dispatch(1.0, 0x998, b"")
+
+    assert router.unknown_counts == {0x999: 3, 0x998: 1}
+    assert router.unknown_count == 4
+    assert capsys.readouterr().out.count("999") == 1
+
+
+def test_add_objs_extends_decoded_routes_only(router):
+    decoder = lambda payload: {"a": payload[0], "new": payload[1]}
+    old, new = FakeDataObject("a"), FakeDataObject("new")
+    router.register(0x204, decoder, [old])
+    router.register(0x214)
+    router.register(0x110, objs=[FakeDataObject("pH")])
+
+    assert router.add_objs(0x204, decoder, [new])
+    assert router.add_objs(0x214, decoder, [FakeDataObject("a")])
+    assert router.add_objs(0x300, decoder, [FakeDataObject("a")])
+    assert not router.add_objs(0x110, decoder, [FakeDataObject("a")])
+
+    router.dispatch(1.0, 0x204, b"\x01\x02")
+    assert old.points == [(1.0, 1)] and new.points == [(1.0, 2)]
+
+
+def test_batch_dispatch_updates_objs_once(router):
+    obj = FakeDataObject("a")
+    router.register(0x204, lambda payload: {"a": payload[0]}, [obj])
+    router.register(0x001, lambda payload: {}, handler=lambda *a: None)
+    router.set_batch_spec(0x204, FakeSpec())
+    with pytest.raises(ValueError):
+        router.set_batch_spec(0x001, FakeSpec())
+
+    columns = router.dispatch_batch([1.0, 2.0], 0x204, np.array([[5, 0], [6, 0]], np.uint8))
+
+    assert columns["a"].tolist() == [5, 6]
+    assert obj.points == [(1.0, 5), (2.0, 6)]
+    assert obj.label_updates == 1
@@ -0,0 +1,133 @@
+import random
+import struct
+
+import numpy as np
+import pytest
+
+from src.can_frame import format_candump_line, parse_candump_line
+from src.frame_signals import FrameSpec, Signal
+from src.frame_sources.synthetic import encode_ais_frame, synthetic_frames
+from src.utils import *
+
+HAND_PARSERS = {
+    0x001: parse_0x001_frame,
+    0x040: parse_sail_wind_sensor_frame,
+    0x041: parse_wind_sensor_frame,
+    0x060: lambda payload: parse_0x060_frame(payload, 12.5),
+    0x070: parse_0x070_frame,
+    0x204: parse_0x204_frame,
+    0x206: parse_0x206_frame,
+}
+TABLE_DECODERS = {
+    **frame_decoders,
+    0x060: lambda payload: decode_0x060_frame(payload, 12.5),
+    0x070: decode_0x070_frame,
+}
+LENGTHS = {0x001: 5, 0x040: 4, 0x041: 4, 0x060: 32, 0x070: 20, 0x204: 16, 0x206: 24}
+
+
+def frame_corpus():
+    """Frames as candump logs them: a synthetic session, random payloads and N/A sentinels"""
+    frames = [frame for t in range(0, 600, 7) for frame in synthetic_frames(t)]
+    rng = random.Random(0)
+    for frame_id, length in LENGTHS.items():
+        frames += [(frame_id, rng.randbytes(length)) for _ in range(200)]
+        frames += [(frame_id, bytes(length)), (frame_id, b"\xff" * length)]
+    na = bytearray(encode_ais_frame(1, 49.2, -123.1, 0, 1) + bytes(7))
+    na[12:19] = struct.pack("<HHHB", 1023, 3600, 511, 0)
+    frames.append((0x060, bytes(na)))
+    # Round trip through the candump text format, as frames are recorded in logs/
+    return [parse_candump_line(format_candump_line(*frame)) for frame in frames]
+
+
+@pytest.fixture
+def gps_ref():
+    pid_obj.set_refs(49.27, -123.19)
+    yield
+    pid_obj.set_refs(None, None)
+
+
+def test_table_matches_hand_written_parsers(gps_ref):
+    checked = 0
+    for frame_id, payload in frame_corpus():
+        if frame_id not in HAND_PARSERS:
+            continue
+        assert TABLE_DECODERS[frame_id](payload) == HAND_PARSERS[frame_id](payload), (
+            f"0x{frame_id:03X} {payload.hex()}"
+        )
+        checked += 1
+    assert checked > 1000
+
+
+def test_batch_decode_matches_decode():
+    corpus = frame_corpus()
+    checked = 0
+    for spec in frame_specs:
+        if not spec.batchable:
+            continue
+        payloads = [payload for frame_id, payload in corpus if frame_id == spec.frame_id]
+        columns = spec.decode_batch(np.frombuffer(b"".join(payloads), np.uint8).reshape(-1, spec.length))
+
+        for i, payload in enumerate(payloads):
+            assert {name: column[i] for name, column in columns.items()} == spec.decode(payload)
+        checked += len(payloads)
+    assert checked > 800
+
+
+def test_batch_decode_bit_fields():
+    spec = FrameSpec(
+        0x300,
+        2,
+        [
+            Signal("low", 0, 2, mask=0xFFF, signed=True),
+            Signal("high", 0, 2, 10, mask=0xF, shift=12),
+        ],
+    )
+    payloads = np.array([[0xFF, 0x7F], [0x01, 0x88]], np.uint8)
+
+    columns = spec.decode_batch(payloads)
+
+    assert columns["low"].tolist() == [-1, 0x801 - 0x1000]
+    assert columns["high"].tolist() == [0.7, 0.8]
+    assert [spec.decode(bytes(payload)) for payload in payloads] == [
+        {"low": -1, "high": 0.7},
+        {"low": 0x801 - 0x1000, "high": 0.8},
+    ]
+
+
+def test_na_fields_decode_to_none():
+    payload = bytearray(encode_ais_frame(1, 49.2, -123.1, 0, 1) + bytes(7))
+    payload[12:19] = struct.pack("<HHHB", 1023, 3600, 511, 0)
+
+    parsed = decode_0x060_frame(bytes(payload), 0.0)
+
+    for attribute in ("SOG", "COG", "HEADING", "ROT"):
+        assert parsed[AIS_Attributes[attribute]] is None
+
+
+@pytest.mark.parametrize("frame_id", sorted(LENGTHS))
+def test_wrong_length_is_rejected(frame_id):
+    with pytest.raises(ValueError):
+        frame_decoders[frame_id](bytes(3))
+
+
+def test_signed_fields_and_shared_bytes():
+    spec = FrameSpec(
+        0x300,
+        4,
+        [
+            Signal("word", 0, 2, signed=True),
+            Signal("same_word_scaled", 0, 2, 10, signed=True),
+            Signal("flag", 3, 1, mask=0x01, cast=bool),
+        ],
+    )
+
+    parsed = spec.decode(b"\xfe\xff\x00\x01")
+
+    assert parsed == {"word": -2.0, "same_word_scaled": -0.2, "flag": True}
+    assert spec.struct.format == "<hxB"
+
+
+def test_overlapping_signals_are_rejected():
+    with pytest.raises(ValueError):
+        FrameSpec(0x300, 4, [Signal("a", 0, 4), Signal("b", 2, 2)])
@@ -0,0 +1,208 @@
+import csv
+from queue import Queue
+
+import pytest
+
+from src.config import replay_status_period
+from src.frame_ring import FrameRing, iter_frames
+from src.frame_sources import ReplayEngine, ReplaySource, read_candump_log
+from src.frame_sources.synthetic import (
+    encode_main_heading_frame,
+    encode_rudder_frame,
+    synthetic_frames,
+)
+from src.utils import *
+
+
+@pytest.fixture
+def frame_ring():
+    frame_ring = FrameRing(64)
+    yield frame_ring
+    frame_ring.close()
+
+
+def write_candump_log(path, rows):
+    with open(path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(["Timestamp", "Elapsed_Time_s", "CAN_Message"])
+        writer.writerows(rows)
+
+
+def test_encode_rudder_frame_round_trip():
+    parsed = parse_0x204_frame(
+        encode_rudder_frame(-12.5, 3.25, -4.5, 271.75, 10, 5, -7, 2.5)
+    )
+
+    assert parsed[actual_rudder_obj.name] == pytest.approx(-12.5)
+    assert parsed[imu_roll_obj.name] == pytest.approx(3.25)
+    assert parsed[imu_pitch_obj.name] == pytest.approx(-4.5)
+    assert parsed[imu_heading_obj.name] == pytest.approx(271.75)
+    assert parsed[set_rudder_obj.name] == pytest.approx(10)
+    assert parsed[integral_obj.name] == pytest.approx(5)
+    assert parsed[derivative_obj.name] == pytest.approx(-7)
+    assert parsed[spd_over_gnd_obj.name] == pytest.approx(2.5)
+
+
+def test_encode_main_heading_frame_round_trip():
+    parsed = parse_0x001_frame(encode_main_heading_frame(15, True, True))
+
+    assert parsed["steering_selection_bit"] and parsed["steering_enable_bit"]
+    assert parsed[set_rudder_obj.name] == pytest.approx(15)
+
+
+@pytest.mark.parametrize("t", [0.0, 12.3, 3600.0])
+def test_synthetic_frames_parse(t):
+    parsers = {
+        0x001: parse_0x001_frame,
+        0x040: parse_sail_wind_sensor_frame,
+        0x041: parse_wind_sensor_frame,
+        0x070: parse_0x070_frame,
+        0x100: temp_sensor_parsing_fn,
+        0x110: pH_parsing_fn,
+        0x120: sal_parsing_fn,
+        0x204: parse_0x204_frame,
+        0x206: parse_0x206_frame,
+    }
+    for frame_id, payload in synthetic_frames(t):
+        if frame_id == 0x060:
+            parse_0x060_frame(payload, t)
+        elif frame_id in parsers:
+            parsers[frame_id](payload)
+        else:
+            assert payload == b""  # heartbeat
+
+
+def test_read_candump_log(tmp_path):
+    path = tmp_path / "candump_20250101_120000.csv"
+    write_candump_log(
+        path,
+        [
+            ["2025-01-01T12:00:00.500000", "0.500", "can0  001  [05]  5E 87 01 00 40"],
+            ["2025-01-01T12:00:00.250000", "0.250", "can0  130  [00]"],
+            ["not a time", "0.300", "can0  131  [00]"],
+        ],
+    )
+
+    rows = read_candump_log(path)
+
+    assert [line for _, line in rows] == [
+        "can0  130  [00]",
+        "can0  001  [05]  5E 87 01 00 40",
+    ]
+    assert rows[1][0] - rows[0][0] == pytest.approx(0.25)
+
+
+def test_replay_keeps_frame_spacing(tmp_path, frame_ring):
+    path = tmp_path / "candump_20250101_120000.csv"
+    write_candump_log(
+        path,
+        [
+            ["2025-01-01T12:00:00.000000", "0.000", "can0  130  [00]"],
+            ["2025-01-01T12:00:00.050000", "0.050", "[ERROR] something went wrong"],
+            ["2025-01-01T12:00:00.100000", "0.100", "can0  204  [02]  01 02"],
+        ],
+    )
+    queue = Queue()
+
+    ReplaySource(str(path)).run(queue, frame_ring)
+
+    frames = list(iter_frames(frame_ring.read()))
+    assert [(frame_id, payload) for _, frame_id, payload in frames] == [
+        (0x130, b""),
+        (0x204, b"\x01\x02"),
+    ]
+    assert frames[1][0] - frames[0][0] == pytest.approx(0.1)
+    assert queue.get_nowait() == ["[ERROR] something went wrong"]
+
+
+@pytest.fixture
+def engine():
+    rows = [(100.0 + t, f"can0  130  [00]  # {t}") for t in range(10)]
+    return ReplayEngine(rows, speed=1.0, now=0.0)
+
+
+def test_replay_engine_speed_scales_spacing(engine):
+    engine.set_speed(4.0, now=0.0)
+
+    rows = engine.due_rows(now=1.0)
+
+    assert [due for due, _ in rows] == pytest.approx([0.0, 0.25, 0.5, 0.75, 1.0])
+    assert engine.position(now=1.0) == pytest.approx(4.0)
+    assert engine.time_until_next(now=1.0) == pytest.approx(0.25)
+
+
+def test_replay_engine_pause_and_seek(engine):
+    assert len(engine.due_rows(now=2.0)) == 3
+    engine.pause(now=2.5)
+
+    assert engine.due_rows(now=60.0) == []
+    assert engine.position(now=60.0) == pytest.approx(2.5)
+
+    engine.seek(7.0, now=60.0)
+    engine.resume(now=61.0)
+    assert [line for _, line in engine.due_rows(now=62.0)] == [
+        "can0  130  [00]  # 7",
+        "can0  130  [00]  # 8",
+    ]
+
+
+def test_replay_engine_max_speed_takes_rows_in_chunks(engine):
+    engine.set_speed(0, now=0.0)
+
+    assert len(engine.due_rows(now=0.0, max_rows=4)) == 4
+    assert len(engine.due_rows(now=0.0)) == 6
+    assert engine.finished
+    assert engine.time_until_next(now=0.0) is None
+    assert engine.position(now=0.0) == pytest.approx(engine.duration)
+
+
+def test_replay_tees_frames_to_log_queue(tmp_path, frame_ring):
+    path = tmp_path / "candump_20250101_120000.csv"
+    write_candump_log(
+        path,
+        [
+            ["2025-01-01T12:00:00.000000", "0.000", "can0  130  [00]"],
+            ["2025-01-01T12:00:00.050000", "0.050", "can0  204  [02]  01 02"],
+        ],
+    )
+    log_queue = Queue()
+
+    ReplaySource(str(path), speed=0).run(Queue(), frame_ring, log_queue)
+
+    logged = []
+    while not log_queue.empty():
+        logged.extend(log_queue.get_nowait())
+    assert logged == list(iter_frames(frame_ring.read()))
+
+
+class ControlConn:
+    """Pipe end that sends the replay controls, and records how long each poll waits"""
+
+    def __init__(self, controls, polls):
+        self.controls = list(controls)
+        self.waits = []
+        self.polls = polls  # timed polls before the replay is stopped
+
+    def poll(self, timeout=0.0):
+        if timeout:
+            self.waits.append(timeout)
+            if len(self.waits) == self.polls:
+                raise KeyboardInterrupt  # ends the replay loop
+        return bool(self.controls)
+
+    def recv(self):
+        return self.controls.pop(0)
+
+    def send(self, status):
+        pass
+
+
+def test_paused_replay_waits_for_controls_without_polling(tmp_path, frame_ring):
+    path = tmp_path / "candump_20250101_120000.csv"
+    write_candump_log(path, [["2025-01-01T12:00:00.000000", "0.000", "can0  130  [00]"]])
+    conn = ControlConn([("pause",)], polls=3)
+
+    with pytest.raises(KeyboardInterrupt):
+        ReplaySource(str(path), conn=conn).run(Queue(), frame_ring)
+
+    assert conn.waits == [replay_status_period] * 3
@@ -45,4 +45,21 @@ def test_update_current_rotations(old_angle, new_angle, expected, test_obj):
     # check
     assert test_obj.current_rotations == expected
     
-    return
\ No newline at end of file
+    return
+
+def test_add_datapoints_counts_rotations_like_add_datapoint(test_graph_obj):
+    angles = [350, 355, 2, 10, 190, 359, 1, 181, 2, 170]
+    one_by_one = IMUHeadingObject("One", 3, "°", None, graph=test_graph_obj)
+    batched = IMUHeadingObject("Batched", 3, "°", None, graph=test_graph_obj)
+    for obj in (one_by_one, batched):
+        obj.graph_obj.graph = type("Graph", (), {"isVisible": lambda self: False})()
+
+    for x, angle in enumerate(angles):
+        one_by_one.add_datapoint(x, angle)
+    batched.add_datapoints(list(range(5)), angles[:5])
+    batched.add_datapoints(list(range(5, 10)), angles[5:])
+
+    assert batched.current_rotations == one_by_one.current_rotations
+    for series in ("graph_data", "data"):
+        assert list(getattr(batched, series).times) == list(getattr(one_by_one, series).times)
+        assert list(getattr(batched, series).values) == list(getattr(one_by_one, series).values)
@@ -0,0 +1,118 @@
+import csv
+import gzip
+import json
+import os
+import queue
+
+import pytest
+
+from src.frame_sources.replay import read_candump_log
+from src.log_files import LogFile, log_root, log_segments, read_log_rows
+from src.workers.CAN_log_worker import can_logging_process
+
+HEADER = ["Timestamp", "Elapsed_Time_s", "CAN_Message"]
+
+
+def log_rows(n):
+    return [[f"2025-01-01T12:00:{i % 60:02d}", f"{i / 100:.3f}", f"can0  204  [02]  {i % 256:02X} 27"] for i in range(n)]
+
+
+def test_unrotated_gzip_log_is_one_compressed_file(tmp_path):
+    path = str(tmp_path / "candump_test.csv")
+    rows = log_rows(1000)
+    with LogFile(path, HEADER, "gzip") as log_file:
+        log_file.writerows(rows)
+
+    with gzip.open(path + ".gz", "rt", newline="") as segment:
+        assert list(csv.reader(segment)) == [HEADER, *rows]
+    assert os.path.getsize(path + ".gz") < sum(len(",".join(row)) for row in rows) / 4
+    assert list(read_log_rows(path)) == rows  # by the name an uncompressed log would have
+
+
+def test_rotated_segments_each_start_with_the_header(tmp_path):
+    path = str(tmp_path / "candump_test.csv")
+    rows = log_rows(5000)
+    with LogFile(path, HEADER, "gzip", rotate_bytes=4096) as log_file:
+        for i in range(0, len(rows), 100):
+            log_file.writerows(rows[i : i + 100])
+            log_file.flush()
+
+    segments = log_segments(path)
+    assert len(segments) > 2
+    assert os.path.basename(segments[1]) == "candump_test.001.csv.gz"
+    for segment in segments:
+        with gzip.open(segment, "rt", newline="") as segment_file:
+            assert next(csv.reader(segment_file)) == HEADER
+
+    with open(tmp_path / "candump_test.manifest.json") as manifest_file:
+        manifest = json.load(manifest_file)
+    assert manifest["compression"] == "gzip"
+    assert sum(segment["rows"] for segment in manifest["segments"]) == len(rows)
+    assert all(segment["end"] is not None for segment in manifest["segments"])
+
+    assert list(read_log_rows(str(tmp_path / "candump_test.manifest.json"))) == rows
+    assert list(read_log_rows(segments[1]))[0] == rows[manifest["segments"][0]["rows"]]
+
+
+def test_segments_rotate_after_rotate_secs(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.log_files.time.monotonic", lambda: now[0])
+    path = str(tmp_path / "values.csv")
+    with LogFile(path, ["Timestamp"], "none", rotate_secs=60) as log_file:
+        log_file.writerow(["a"])
+        now[0] += 59
+        log_file.writerow(["b"])
+        now[0] += 1
+        log_file.writerow(["c"])
+
+    assert [os.path.basename(segment) for segment in log_segments(path)] == [
+        "values.000.csv",
+        "values.001.csv",
+    ]
+    assert list(read_log_rows(path)) == [["a"], ["b"], ["c"]]
+
+
+def test_segment_cut_short_is_read_up_to_its_last_flush(tmp_path):
+    path = str(tmp_path / "candump_test.csv")
+    rows = log_rows(2000)
+    log_file = LogFile(path, HEADER, "gzip")
+    log_file.writerows(rows[:1500])
+    log_file.fsync()
+    with open(path + ".gz", "rb") as segment:  # as if the process died here
+        flushed = segment.read()
+    log_file.writerows(rows[1500:])
+    log_file.close()
+    with open(path + ".gz", "wb") as segment:
+        segment.write(flushed)
+
+    assert list(read_log_rows(path)) == rows[:1500]
+
+
+def test_log_root():
+    assert log_root("logs/candump_1.003.csv.gz") == "logs/candump_1"
+    assert log_root("logs/values_1_sparse.csv") == "logs/values_1_sparse"
+    assert log_root("logs/ais_values_1.manifest.json") == "logs/ais_values_1"
+
+
+def test_compressed_rotated_can_log_is_replayed(tmp_path, monkeypatch):
+    """can_logging_process writes rotated gzip segments, which replay reads in order"""
+    monkeypatch.chdir(tmp_path)
+    log_queue = queue.Queue()
+    frames = [(1_700_000_000 + i / 100, 0x204, bytes([i % 256, i // 256 % 256])) for i in range(20000)]
+    for i in range(0, len(frames), 200):
+        log_queue.put(frames[i : i + 200])
+    log_queue.put("__EXIT__")
+    can_logging_process(None, log_queue, "test", compression="gzip", rotate_bytes=16384)
+
+    assert len(log_segments("logs/candump_test.csv")) > 1
+    rows = read_candump_log("logs/candump_test.csv")
+    assert [timestamp for timestamp, _ in rows] == pytest.approx([f[0] for f in frames], abs=1e-6)
+
+
+def test_plain_log_is_a_single_csv(tmp_path):
+    path = tmp_path / "candump_test.csv"
+    with LogFile(str(path), HEADER) as log_file:
+        log_file.writerows([["1", "2", "3"]])
+
+    assert os.listdir(tmp_path) == ["candump_test.csv"]
+    assert list(read_log_rows(str(path))) == [["1", "2", "3"]]
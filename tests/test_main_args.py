@@ -0,0 +1,22 @@
+import os
+
+os.environ["POLARIS_QT_BOOTSTRAPPED"] = "1"  # importing main must not re-exec pytest
+
+from src.main import parse_args, restart_argv  # noqa: E402
+
+
+def test_restart_only_switches_the_profile():
+    args = parse_args(
+        ["--source", "replay", "--replay-file", "logs/candump_1.csv", "--replay-speed", "10", "--dbc", "boat.dbc"]
+    )
+
+    restarted = parse_args(restart_argv(args, "Ethernet/deployment"))
+
+    assert restarted.profile == "Ethernet/deployment"
+    assert vars(restarted) == {**vars(args), "profile": "Ethernet/deployment"}
+
+
+def test_restart_keeps_defaults():
+    args = parse_args([])
+
+    assert parse_args(restart_argv(args, "Wifi/testing")).source == "ssh"
@@ -0,0 +1,115 @@
+import numpy as np
+
+import src.widgets.CAN_window_logging as CAN_window_logging
+from src.data_object import DataObject
+from src.frame_ring import FRAME_DTYPE
+from src.frame_router import FrameRouter
+from src.widgets.CAN_window_logging import CANWindowLoggingMixin
+from src.widgets.CAN_window_update import CANWindowUpdateMixin
+
+
+class RudderSpec:
+    """Batch spec of a 2 byte frame whose first byte is the set rudder angle"""
+
+    batchable = True
+    length = 2
+
+    def decode_batch(self, payloads):
+        return {"Set_rdr_deg": payloads[:, 0].astype(float)}
+
+
+class FakeDataObject:
+    name = "Set_rdr_deg"
+
+    def __init__(self):
+        self.points = []
+
+    def parse_frame(self, current_time, payload, parsed_dict=None):
+        self.points.append((current_time, parsed_dict[self.name]))
+
+    def parse_frames(self, frame_times, columns):
+        self.points += list(zip(frame_times, columns[self.name].tolist()))
+
+    def update_label(self):
+        pass
+
+
+class Window(CANWindowUpdateMixin):
+    """Just what _process_frames needs of a CANWindow"""
+
+    def __init__(self, router):
+        self.frame_router = router
+        self.time_start = 0.0
+        self.frames_received = 0
+        self.logged = []
+
+    def _log_values(self, frame_timestamp=None):
+        self.logged.append(frame_timestamp)
+
+    def _log_values_batch(self, frame_timestamps, columns):
+        self.logged += frame_timestamps
+
+
+def make_frames(frames):
+    records = np.zeros(len(frames), dtype=FRAME_DTYPE)
+    for record, (timestamp, frame_id, payload) in zip(records, frames):
+        record["timestamp"], record["frame_id"], record["dlc"] = timestamp, frame_id, len(payload)
+        record["payload"][: len(payload)] = list(payload)
+    return records
+
+
+def test_frames_of_batched_and_single_ids_are_processed_in_order():
+    """Set_rdr_deg is fed by both 0x001 (frame by frame) and 0x204 (batch decoded)"""
+    obj = FakeDataObject()
+    router = FrameRouter()
+    router.register(0x001, lambda payload: {"Set_rdr_deg": float(payload[0])}, [obj])
+    router.register(0x204, lambda payload: {"Set_rdr_deg": float(payload[0])}, [obj])
+    router.set_batch_spec(0x204, RudderSpec())
+    window = Window(router)
+    ids = [0x204, 0x204, 0x001, 0x204, 0x001, 0x001, 0x204, 0x204, 0x130]
+    frames = [(float(i), frame_id, bytes([i, 0])) for i, frame_id in enumerate(ids)]
+    router.register(0x130)
+
+    window._process_frames(make_frames(frames))
+
+    assert obj.points == [(float(i), float(i)) for i, frame_id in enumerate(ids) if frame_id != 0x130]
+    assert window.logged == [float(i) for i in range(len(ids))]
+    assert window.frames_received == len(ids)
+
+
+def test_no_frames():
+    window = Window(FrameRouter())
+    window.frame_router.batch_specs[0x204] = RudderSpec()
+
+    window._process_frames(make_frames([]))
+
+    assert window.frames_received == 0
+
+
+class FakeValuesLog:
+    def __init__(self):
+        self.rows = []
+
+    def submit(self, row):
+        self.rows.append(row)
+
+    def submit_rows(self, rows):
+        self.rows += rows
+
+
+def test_batched_values_log_rows_match_frame_by_frame_rows(monkeypatch):
+    objs = [DataObject("Count", None, "", None), DataObject("Volts", 2, "", None), DataObject("Other", 1, "", None)]
+    monkeypatch.setattr(CAN_window_logging, "data_objs", objs)
+    objs[2].add_datapoint(0.5, 7.25)
+    columns = {"Count": np.array([3.0, 4.0]), "Volts": np.array([1.234, 5.0])}
+    batched, by_frame = CANWindowLoggingMixin(), CANWindowLoggingMixin()
+    batched.values_log, by_frame.values_log = FakeValuesLog(), FakeValuesLog()
+
+    batched._log_values_batch([1.0, 2.0], columns)
+    for i, frame_time in enumerate([1.0, 2.0]):
+        for obj in objs[:2]:
+            obj.parse_frame(frame_time, None, {obj.name: columns[obj.name][i].item()})
+        by_frame._log_values(frame_time)
+
+    assert batched.values_log.rows == by_frame.values_log.rows == [[1.0, 3, 1.23, 7.2], [2.0, 4, 5.0, 7.2]]
+    assert [type(value) for value in batched.values_log.rows[0]] == [float, int, float, float]
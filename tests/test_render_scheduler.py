@@ -0,0 +1,73 @@
+import pytest
+
+from src.data_object import DataObject, GraphObject
+from src.render_scheduler import RenderScheduler
+
+
+class StubGraph:
+    def __init__(self, visible):
+        self.visible = visible
+
+    def isVisible(self):
+        return self.visible
+
+    def width(self):
+        return 500
+
+    def viewRange(self):
+        return [[0, 60], [0, 1]]
+
+
+class StubLine:
+    def __init__(self):
+        self.set_data_calls = 0
+
+    def setData(self, x, y):
+        self.set_data_calls += 1
+
+
+def make_obj(name, visible=True):
+    graph = GraphObject(name, "Time", "", "s", 0, 1)
+    graph.graph = StubGraph(visible)
+    obj = DataObject(name, 3, "", None, line_colour="r", graph=graph)
+    obj.line = StubLine()
+    return obj
+
+
+def test_adding_points_only_marks_dirty():
+    obj = make_obj("Rudder")
+    for t in range(100):
+        obj.add_datapoint(t, t)
+    obj.add_datapoints([100, 101], [1, 2])
+
+    assert obj.dirty
+    assert obj.line.set_data_calls == 0
+
+
+def test_render_redraws_each_dirty_visible_line_once():
+    shown, hidden, idle = make_obj("Shown"), make_obj("Hidden", False), make_obj("Idle")
+    scheduler = RenderScheduler([shown, hidden, idle])
+    for t in range(50):
+        shown.add_datapoint(t, t)
+        hidden.add_datapoint(t, t)
+
+    assert scheduler.render() == 1
+    assert shown.line.set_data_calls == 1 and not shown.dirty
+    assert hidden.line.set_data_calls == 0 and hidden.dirty  # redrawn once it is shown
+    assert idle.line.set_data_calls == 0
+
+    assert scheduler.render() == 0  # nothing new
+    hidden.graph_obj.graph.visible = True
+    assert scheduler.render() == 1
+    assert scheduler.redraw_count == 2 and scheduler.render_count == 3
+
+
+@pytest.mark.parametrize("time_now, dirty", [(10, False), (100, True)])
+def test_update_data_only_dirties_when_points_are_trimmed(time_now, dirty):
+    obj = make_obj("Rudder")
+    obj.add_datapoints([0, 1, 2], [0, 1, 2])
+    obj.dirty = False
+
+    obj.update_data(time_now, scroll_window=60)
+
+    assert obj.dirty == dirty
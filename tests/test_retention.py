@@ -0,0 +1,132 @@
+import sys
+import tracemalloc
+
+import numpy as np
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+import src.config as cg
+from src.data_object import (
+    DataObject, DesiredHeadingObject, GraphObject, IMUHeadingObject, PIDObject
+)
+from src.retention import RetentionManager
+
+HOUR = 3600
+TICK = 30  # simulated secs per update_status() tick
+RATE = 10  # samples/s of each signal
+
+
+class HiddenGraph:
+    """Stands in for a graph that is not on screen (so no line is redrawn)"""
+
+    def isVisible(self):
+        return False
+
+    def addItem(self, item):
+        pass
+
+    def removeItem(self, item):
+        pass
+
+
+@pytest.fixture
+def app():
+    return QApplication.instance() or QApplication(sys.argv)
+
+
+def make_objs():
+    graph = GraphObject("Soak", cg.graph_y, "°", cg.graph_y_units, 0, 360)
+    graph.graph = HiddenGraph()
+    imu = IMUHeadingObject("IMU heading", 3, "°", None, line_colour="r", graph=graph)
+    return [
+        DataObject("Rudder", 3, "°", None, line_colour="r", graph=graph),
+        imu,
+        DesiredHeadingObject("Desired heading", 3, "°", None, line_colour="r", graph=graph, interval=1, imu_heading_ref_obj=imu),
+        PIDObject("PLRS_path", "EW_offset", "NS_offset", 6, "m", None, 12 * HOUR, graph=graph),
+    ]
+
+
+def run_tick(objs, retention, t):
+    times = np.arange(t, t + TICK, 1 / RATE)
+    for obj in objs[:3]:
+        obj.add_datapoints(times, (times * 7) % 360)
+    for fix_time in range(t, t + TICK, 2):  # a GPS fix every 2 secs
+        objs[3].parse_frame(fix_time, None, {
+            "EW_offset": fix_time / 100, "NS_offset": fix_time / 50,
+            cg.desired_heading_arrow_name: None, cg.actual_heading_arrow_name: 90.0,
+        })
+    for obj in objs:
+        obj.update_data(t + TICK, cg.scroll_window)
+    retention.enforce()
+
+
+def test_memory_stays_flat_over_12_hours(app):
+    objs = make_objs()
+    retention = RetentionManager(objs)
+
+    tracemalloc.start()
+    try:
+        # The PID path is kept for 12 hours, so it fills to its budget first
+        for t in range(0, 6 * HOUR, TICK):
+            run_tick(objs, retention, t)
+        usage_after_6h = retention.usage()
+        traced_after_6h = tracemalloc.get_traced_memory()[0]
+
+        for t in range(6 * HOUR, 12 * HOUR, TICK):
+            run_tick(objs, retention, t)
+        traced_after_12h = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert retention.usage() == usage_after_6h
+    for obj in objs:
+        assert usage_after_6h[obj.name] <= cg.signal_memory_budget
+    assert traced_after_12h - traced_after_6h < 64 * 1024  # no growth past noise
+
+
+def test_ring_series_are_sized_to_the_budget():
+    obj = IMUHeadingObject("IMU heading", 3, "°", None)
+    retention = RetentionManager([obj], signal_budget=cg.signal_memory_budget)
+
+    assert obj.memory_usage() <= cg.signal_memory_budget
+    assert retention.total_usage == obj.data.nbytes + obj.graph_data.nbytes
+
+
+def test_rings_shrink_to_what_rollups_and_decimator_leave(app):
+    class WideGraph(HiddenGraph):
+        def width(self):
+            return 4000
+
+        def viewRange(self):
+            return [[0, 3600], [0, 1]]
+
+    graph = GraphObject("Soak", cg.graph_y, "°", cg.graph_y_units, 0, 360)
+    graph.graph = WideGraph()
+    obj = IMUHeadingObject("IMU heading", 3, "°", None, line_colour="r", graph=graph)
+    times = np.arange(0, 3600, 0.1)
+    obj.add_datapoints(times, (times * 7) % 360)
+    obj._line_points(obj.graph_data)  # makes a decimator for 4000 px
+    budget = cg.signal_memory_budget
+    assert obj.memory_usage() > budget
+
+    RetentionManager([obj], signal_budget=budget).enforce()
+
+    assert obj.memory_usage() <= budget
+    assert obj.graph_data.times[-1] == times[-1]  # newest points kept
+
+
+def test_dict_store_drops_oldest_points_over_budget():
+    graph = GraphObject("Soak", "x", "m", "y", 0, 1)
+    graph.graph = HiddenGraph()
+    obj = PIDObject("PLRS_path", "EW_offset", "NS_offset", 6, "m", None, HOUR, graph=graph)
+    for t in range(100):
+        obj.add_datapoint(t, {
+            "EW_offset": t, "NS_offset": t,
+            cg.desired_heading_arrow_name: None, cg.actual_heading_arrow_name: None,
+        })
+    budget = obj.memory_usage() // 2
+
+    RetentionManager([obj], signal_budget=budget).enforce()
+
+    assert obj.memory_usage() <= budget
+    assert list(obj.data) == list(range(100 - len(obj.data), 100))  # newest points kept
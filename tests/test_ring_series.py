@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from src.ring_series import RingSeries
+
+
+def test_append_and_last():
+    series = RingSeries(4)
+    assert len(series) == 0
+    assert series.last() == (None, None)
+
+    series.append(1.0, 10.0)
+    series.append(2.0, 20.0)
+
+    assert len(series) == 2
+    assert series.last() == (2.0, 20.0)
+    assert list(series.times) == [1.0, 2.0]
+    assert list(series.values) == [10.0, 20.0]
+
+
+def test_full_series_drops_oldest():
+    series = RingSeries(3)
+    for t in range(10):
+        series.append(t, t * 10)
+
+    assert len(series) == 3
+    assert list(series.times) == [7, 8, 9]
+    assert list(series.values) == [70, 80, 90]
+
+
+def test_views_stay_contiguous_over_wraps():
+    series = RingSeries(5)
+    for t in range(23):
+        series.append(t, -t)
+        assert series.times.flags["C_CONTIGUOUS"]
+        assert list(series.times) == list(range(max(0, t - 4), t + 1))
+    assert np.shares_memory(series.times, series._times)  # a view, not a copy
+
+
+@pytest.mark.parametrize("first, second", [(2, 2), (3, 6), (0, 9), (4, 1)])
+def test_extend_matches_append(first, second):
+    appended = RingSeries(4)
+    extended = RingSeries(4)
+    points = [(t, t * 1.5) for t in range(first + second)]
+    for t, value in points:
+        appended.append(t, value)
+    for chunk in (points[:first], points[first:]):
+        extended.extend([t for t, _ in chunk], [value for _, value in chunk])
+
+    assert list(extended.times) == list(appended.times)
+    assert list(extended.values) == list(appended.values)
+
+
+def test_trim():
+    series = RingSeries(10)
+    series.extend(np.arange(6.0), np.arange(6.0) * 2)
+
+    series.trim(2.5)
+    assert list(series.times) == [3, 4, 5]
+    series.trim(3)  # keeps points at exactly the given time
+    assert list(series.times) == [3, 4, 5]
+    series.trim(100)
+    assert len(series) == 0
+    assert series.last() == (None, None)
+
+
+def test_clear():
+    series = RingSeries(2)
+    series.extend([1, 2], [3, 4])
+    series.clear()
+    assert len(series) == 0
+    series.append(5, 6)
+    assert series.last() == (5.0, 6.0)
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        RingSeries(0)
+
+
+def test_insert_keeps_time_order():
+    series = RingSeries(4)
+    series.extend([1, 2, 4], [10, 20, 40])
+    series.insert(3, 30)
+    assert list(series.times) == [1, 2, 3, 4]
+    assert list(series.values) == [10, 20, 30, 40]
+
+    series.insert(2.5, 25)  # full: drops the oldest point
+    assert list(series.times) == [2, 2.5, 3, 4]
+    assert series.last() == (4.0, 40.0)
+
+
+def test_drop_from():
+    series = RingSeries(5)
+    series.extend([1, 2, 3, 4], [1, 2, 3, 4])
+    assert series.drop_from(3) == 2
+    assert list(series.times) == [1, 2]
+    assert series.drop_from(10) == 0
+
+
+def test_resize_keeps_newest_points():
+    series = RingSeries(10)
+    series.extend(np.arange(10.0), np.arange(10.0))
+
+    series.resize(4)
+    series.append(10.0, 10.0)
+
+    assert series.capacity == 4 and series.nbytes == RingSeries(4).nbytes
+    assert list(series.times) == [7.0, 8.0, 9.0, 10.0]
@@ -0,0 +1,155 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.data_object import DataObject, GraphObject
+from src.rollup import RollupTier, Rollups
+
+TIERS = ((1, 100), (10, 100), (60, 100))
+
+
+def expected_buckets(times, values, width):
+    starts = np.floor(times / width) * width
+    return {
+        start: (values[starts == start].min(), values[starts == start].max(),
+                values[starts == start].sum(), (starts == start).sum())
+        for start in np.unique(starts)
+    }
+
+
+def as_dict(buckets):
+    return {b["start"]: (b["min"], b["max"], b["sum"], b["count"]) for b in buckets}
+
+
+@pytest.fixture
+def session():
+    rng = np.random.default_rng(0)
+    times = np.cumsum(rng.uniform(0.01, 0.2, 20_000))  # ~35 min
+    return times, rng.normal(size=len(times))
+
+
+def test_every_tier_matches_bucketing_the_raw_values(session):
+    times, values = session
+    rollups = Rollups(TIERS)
+    for chunk in np.array_split(np.arange(len(times)), 300):  # ticks of varying size
+        rollups.extend(times[chunk], values[chunk])
+
+    for tier in rollups.tiers:
+        got, expected = as_dict(tier.buckets()), expected_buckets(times, values, tier.width)
+        assert list(got) == list(expected)[-len(got):]  # the newest, up to capacity
+        for start, (minn, maxn, total, count) in got.items():
+            assert expected[start][:2] == (minn, maxn)
+            assert math.isclose(expected[start][2], total, abs_tol=1e-9)
+            assert expected[start][3] == count
+
+
+def test_add_matches_extend(session):
+    times, values = session
+    one_by_one, batched = Rollups(TIERS), Rollups(TIERS)
+    for time, value in zip(times.tolist(), values.tolist()):
+        one_by_one.add(time, value)
+    batched.extend(times, values)
+
+    for tier, other in zip(one_by_one.tiers, batched.tiers):
+        assert np.allclose(tier.buckets().tolist(), other.buckets().tolist())
+
+
+def test_full_tier_keeps_newest_buckets():
+    tier = RollupTier(1, 5)
+    tier.extend(np.arange(20.0), np.arange(20.0))
+
+    assert list(tier.buckets()["start"]) == [14, 15, 16, 17, 18, 19]  # 5 completed + open
+    assert tier.first_start() == 14
+    assert tier.nbytes == 5 * tier.buckets().itemsize  # never more than capacity
+
+
+def test_missing_values_are_not_rolled_up():
+    rollups = Rollups(TIERS)
+    rollups.extend([0.1, 0.2, 0.3], [1.0, math.nan, 3.0])
+    rollups.add(0.4, math.nan)
+
+    bucket = rollups.tiers[0].buckets()[0]
+    assert (bucket["min"], bucket["max"], bucket["count"]) == (1.0, 3.0, 2)
+
+
+def test_late_value_is_merged_into_its_bucket():
+    rollups = Rollups()
+    rollups.extend(np.arange(0, 3600, 0.1), np.zeros(36_000))
+    rollups.add(3600.01, 1)
+    counts = [len(tier.buckets()) for tier in rollups.tiers]
+
+    rollups.add(3599.99, 5)  # late: its 1 s bucket was completed by the value before
+
+    assert [len(tier.buckets()) for tier in rollups.tiers] == counts  # nothing was dropped
+    assert counts[0] == 1801
+    for tier in rollups.tiers:
+        bucket = as_dict(tier.buckets())[math.floor(3599.99 / tier.width) * tier.width]
+        assert bucket[1] == 5 and bucket[2] == 5
+
+
+def test_late_value_without_a_stored_bucket_is_dropped():
+    tier = RollupTier(1, 5)
+    tier.extend(np.array([0.5, 10.5, 20.5]), np.ones(3))
+
+    tier.add(5.5, 5, 5, 5, 1)  # no values were in 5-6 s
+    tier.add(-1.5, 5, 5, 5, 1)  # before the oldest stored bucket
+
+    assert list(tier.buckets()["start"]) == [0, 10, 20]
+    assert tier.buckets()["max"].max() == 1
+
+
+def test_clear_drops_every_tier():
+    rollups = Rollups(TIERS)
+    rollups.extend(np.arange(100.0), np.ones(100))
+    rollups.clear()
+
+    for tier in rollups.tiers:
+        assert len(tier.buckets()) == 0
+
+
+def test_tier_for_picks_finest_tier_that_fits_and_covers_the_view(session):
+    times, values = session
+    rollups = Rollups(TIERS)
+    rollups.extend(times, values)
+    end = times[-1]
+
+    assert rollups.tier_for(end - 60, end, 100).width == 1
+    assert rollups.tier_for(end - 600, end, 100).width == 10  # 600 1 s buckets > 100 px
+    assert rollups.tier_for(end - 300, end, 1000).width == 10  # 1 s tier only holds 100 s
+    assert rollups.tier_for(0, end, 10).width == 60  # nothing fits: coarsest
+
+
+def test_points_draw_min_and_max_of_buckets_in_view():
+    tier = RollupTier(10, 10)
+    tier.extend(np.arange(0, 40.0), np.arange(0, 40.0))
+
+    times, values = tier.points(15, 30)
+
+    assert list(times) == [10, 15, 20, 25]  # buckets ending by 30
+    assert list(values) == [10, 19, 20, 29]
+
+
+def test_data_object_draws_history_past_its_ring_from_rollups():
+    class Graph:
+        def width(self):
+            return 600
+
+        def viewRange(self):
+            return [[0, 3600], [0, 1]]
+
+    graph = GraphObject("Rudder", "Time", "°", "s", 0, 1)
+    graph.graph = Graph()
+    obj = DataObject("Rudder", 3, "°", None, line_colour="r", graph=graph)
+    times = np.arange(0, 3600, 0.1)  # more than the ring holds
+    values = np.sin(times / 100)
+    values[1000] = 50  # a spike long gone from the ring
+    for chunk in np.array_split(np.arange(len(times)), 360):
+        obj.add_datapoints(times[chunk], values[chunk])
+
+    xs, ys = obj._line_points(obj.data)
+
+    assert obj.data.times[0] > 600
+    assert xs[0] < 10 and 50 in ys
+    assert np.all(np.diff(xs) >= 0)
+    assert len(xs) < 4 * 600
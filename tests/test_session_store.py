@@ -0,0 +1,101 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from src.data_object import DataObject, GraphObject
+from src.session_store import SessionStore, SignalStore, load_signal
+
+
+class StubGraph:
+    def __init__(self, start, end):
+        self.range = [start, end]
+
+    def isVisible(self):
+        return True
+
+    def width(self):
+        return 500
+
+    def viewRange(self):
+        return [self.range, [0, 1]]
+
+
+def test_read_returns_the_points_in_range(tmp_path):
+    store = SignalStore(str(tmp_path / "Rudder.f64"), index_stride=100)
+    times = np.arange(0, 1000, 0.5)
+    store.extend(times[:1500], times[:1500] * 2)
+    store.flush()
+    for t in times[1500:]:
+        store.append(t, t * 2)
+
+    read_times, read_values = store.read(123.25, 456)
+
+    expected = times[(times >= 123.25) & (times < 456)]
+    np.testing.assert_array_equal(read_times, expected)
+    np.testing.assert_array_equal(read_values, expected * 2)
+    assert store.rows == 1500  # the appended points are read from memory, not written
+    assert len(store.read(2000, 3000)[0]) == 0
+
+
+def test_sparse_index_has_an_entry_every_stride_rows(tmp_path):
+    store = SignalStore(str(tmp_path / "Rudder.f64"), index_stride=100)
+    for chunk in np.array_split(np.arange(1050.0), 7):  # flushes not on index rows
+        store.extend(chunk, chunk)
+        store.flush()
+
+    index = np.fromfile(store.index_path, dtype=[("time", "<f8"), ("row", "<i8")])
+
+    np.testing.assert_array_equal(index["row"], np.arange(0, 1050, 100))
+    np.testing.assert_array_equal(index["time"], np.arange(0, 1050, 100))
+
+
+def test_session_writes_on_its_own_thread(tmp_path):
+    session = SessionStore(str(tmp_path / "session"), flush_interval=0.01)
+    store = session.signal("Rudder")
+    store.extend([0, 1, 2], [5, 6, 7])
+
+    deadline = time.monotonic() + 5
+    while store.rows < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    session.close()
+
+    assert store.rows == 3
+    np.testing.assert_array_equal(load_signal(store.path)["value"], [5, 6, 7])
+
+
+def test_files_are_readable_offline(tmp_path):
+    session = SessionStore(str(tmp_path / "session"))
+    session.signal("Rudder").extend([0, 1, 2], [5, 6, 7])
+    session.signal("IMU heading").append(0, 90)
+    session.signal("Unused")
+    session.close()
+
+    with open(tmp_path / "session" / "manifest.json") as manifest_file:
+        manifest = json.load(manifest_file)
+    assert manifest["signals"] == {"Rudder": "Rudder.f64", "IMU heading": "IMU_heading.f64"}
+    assert not os.path.exists(tmp_path / "session" / "Unused.f64")  # no data, no file
+
+    path = os.path.join(tmp_path, "session", manifest["signals"]["Rudder"])
+    points = np.fromfile(path, dtype=[tuple(field) for field in manifest["point_dtype"]])
+    np.testing.assert_array_equal(points["value"], [5, 6, 7])
+    np.testing.assert_array_equal(load_signal(path)["time"], [0, 1, 2])
+
+
+def test_line_scrolled_back_past_the_ring_is_read_from_the_store(tmp_path):
+    graph = GraphObject("Rudder", "Time", "", "s", 0, 1)
+    graph.graph = StubGraph(0, 60)
+    obj = DataObject("Rudder", 3, "", None, line_colour="r", graph=graph)
+    obj.store = SessionStore(str(tmp_path)).signal(obj.name)
+    times = np.arange(0, 3600, 0.1)
+    obj.add_datapoints(times, np.sin(times))
+    obj.update_data(3600, scroll_window=60)  # the ring only keeps the last minute
+
+    graph.graph.range = [100, 130]  # paused and scrolled back 58 min
+    line_times, line_values = obj._line_points(obj.data)
+
+    shown = line_times < 130
+    expected = times[(times >= 100) & (times < 130)]
+    np.testing.assert_array_equal(line_times[shown], expected)  # raw, not 1 s rollups
+    np.testing.assert_array_equal(line_values[shown], np.sin(expected))
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+import src.ssh_broker as ssh_broker
+
+CREDENTIALS = ("raspberrypi", "sailbot", "sailbot")
+
+
+class FakeTransport:
+    def __init__(self):
+        self.active = True
+
+    def is_active(self):
+        return self.active
+
+
+class FakeSSHClient:
+    connects = 0
+
+    def __init__(self):
+        self.transport = None
+
+    def set_missing_host_key_policy(self, policy):
+        pass
+
+    def connect(self, **kwargs):
+        FakeSSHClient.connects += 1
+        self.transport = FakeTransport()
+
+    def get_transport(self):
+        return self.transport
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.active = False
+
+
+@pytest.fixture(autouse=True)
+def fake_paramiko(monkeypatch):
+    FakeSSHClient.connects = 0
+    monkeypatch.setattr(ssh_broker.paramiko, "SSHClient", FakeSSHClient)
+    yield
+    ssh_broker.close_ssh_clients()
+
+
+def test_client_is_shared():
+    client = ssh_broker.get_ssh_client(CREDENTIALS)
+
+    assert ssh_broker.get_ssh_client(CREDENTIALS) is client
+    assert FakeSSHClient.connects == 1
+
+
+def test_one_client_per_profile():
+    client = ssh_broker.get_ssh_client(CREDENTIALS)
+
+    assert ssh_broker.get_ssh_client(("192.168.0.10", "sailbot", "sailbot")) is not client
+    assert FakeSSHClient.connects == 2
+
+
+def test_reconnects_after_connection_drops():
+    client = ssh_broker.get_ssh_client(CREDENTIALS)
+    client.get_transport().active = False
+
+    assert ssh_broker.get_ssh_client(CREDENTIALS) is not client
+    assert FakeSSHClient.connects == 2
+
+
+def test_slow_connect_does_not_block_other_callers(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    connect = FakeSSHClient.connect
+
+    def slow_connect(self, **kwargs):
+        if kwargs["hostname"] == "unreachable":
+            started.set()
+            release.wait(5)
+        connect(self, **kwargs)
+
+    monkeypatch.setattr(FakeSSHClient, "connect", slow_connect)
+    prewarm = threading.Thread(target=ssh_broker.get_ssh_client, args=(("unreachable", "sailbot", "sailbot"),))
+    prewarm.start()
+    started.wait(5)
+
+    start = time.monotonic()
+    ssh_broker.get_ssh_client(CREDENTIALS)
+    assert time.monotonic() - start < 1
+    release.set()
+    prewarm.join(5)
+
+
+def test_concurrent_connects_share_one_client(monkeypatch):
+    barrier = threading.Barrier(2)
+    connect = FakeSSHClient.connect
+
+    def racing_connect(self, **kwargs):
+        barrier.wait(5)  # both connect before either publishes
+        connect(self, **kwargs)
+
+    monkeypatch.setattr(FakeSSHClient, "connect", racing_connect)
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(ssh_broker.get_ssh_client(CREDENTIALS))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert clients[0] is clients[1]
+    assert clients[0].get_transport().is_active()
@@ -93,6 +93,20 @@ class TestParsingFunctions:
         with pytest.raises(ValueError):
             parse_0x001_frame("00112233445")
 
+    @pytest.mark.parametrize(
+        "parsing_fn, data_hex",
+        [
+            (parse_0x001_frame, "5e87010040"),
+            (parse_0x204_frame, "00112233445566778899aabbccddeeff"),
+            (parse_0x110_frame, "f01a"),
+            (pH_parsing_fn, "f01a"),
+            (temp_sensor_parsing_fn, "a0a404"),
+        ]
+    )
+    def test_parsing_functions_accept_payload_bytes(self, parsing_fn, data_hex):
+        # candump_process passes payloads as bytes rather than hex strings
+        assert parsing_fn(bytes.fromhex(data_hex)) == parsing_fn(data_hex)
+
 
 # TODO: first test a function to convert data to hex
 # TODO: test the parse_0x204 frame issue
\ No newline at end of file
@@ -0,0 +1,116 @@
+import csv
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.values_log import expand_sparse_log
+from src.workers.values_log_worker import (
+    KEYFRAME, SPARSE_HEADER, SparseValuesLogWriter, ValuesLogWriter
+)
+
+NAMES = [f"Signal_{i}" for i in range(30)]
+HEADER = ["Timestamp", "Elapsed_Time_s", *NAMES]
+TIME_START = 1_700_000_000.0
+
+
+def read_rows(path):
+    with open(path, newline="") as csv_file:
+        return list(csv.reader(csv_file))
+
+
+def voyage_rows(secs, rate=100):
+    """A frame every 1/rate secs, each changing the 2 values of one of 10 frame ids"""
+    rng = np.random.default_rng(0)
+    values = [None] * len(NAMES)
+    rows = []
+    for i, t in enumerate(np.arange(0, secs, 1 / rate)):
+        frame = i % 10
+        for j in (2 * frame, 2 * frame + 1):
+            values[j] = round(float(rng.normal(10, 3)), 3)
+        rows.append([TIME_START + float(t), *values])
+    return rows
+
+
+def write_log(writer_class, path, rows, **kwargs):
+    writer = writer_class(str(path), HEADER, TIME_START, **kwargs)
+    writer.submit_rows(rows)
+    writer.close()
+
+
+def test_sparse_log_records_only_changes_between_keyframes(tmp_path):
+    path = tmp_path / "values_sparse.csv"
+    rows = [
+        [TIME_START + 0.5, 1.0, None, *[0.0] * 28],
+        [TIME_START + 0.6, 1.0, 2.0, *[0.0] * 28],
+        [TIME_START + 0.7, 1.0, 2.0, *[0.0] * 28],  # nothing changed
+        [TIME_START + 10.5, 3.0, 2.0, *[0.0] * 28],  # next keyframe
+    ]
+    write_log(SparseValuesLogWriter, path, rows, keyframe_interval=10)
+
+    records = read_rows(path)
+    assert records[0] == SPARSE_HEADER
+    assert records[1] == ["0.500", KEYFRAME, repr(TIME_START)]
+    assert records[2:32] == [["0.500", n, v] for n, v in zip(NAMES, ["1.0", "None", *["0.0"] * 28])]
+    assert records[32] == ["0.600", "Signal_1", "2.0"]
+    assert records[33] == ["10.500", KEYFRAME, repr(TIME_START)]
+    assert len(records) == 34 + len(NAMES)
+
+
+def test_expanded_sparse_log_matches_the_wide_log(tmp_path):
+    rows = voyage_rows(5)
+    write_log(ValuesLogWriter, tmp_path / "values.csv", rows)
+    write_log(SparseValuesLogWriter, tmp_path / "values_sparse.csv", rows, keyframe_interval=2)
+
+    expand_sparse_log(str(tmp_path / "values_sparse.csv"), str(tmp_path / "values_wide.csv"))
+
+    wide, expanded = read_rows(tmp_path / "values.csv"), read_rows(tmp_path / "values_wide.csv")
+    assert expanded[0] == wide[0]
+    assert len(expanded) == len(wide)
+    for wide_row, expanded_row in zip(wide[1:], expanded[1:]):
+        assert expanded_row[1:] == wide_row[1:]
+        assert expanded_row[0][:-3] == wide_row[0][:-3]  # timestamps to the ms
+
+
+def test_sparse_log_is_several_times_smaller(tmp_path):
+    rows = voyage_rows(60)
+    write_log(ValuesLogWriter, tmp_path / "values.csv", rows)
+    write_log(SparseValuesLogWriter, tmp_path / "values_sparse.csv", rows)
+
+    ratio = os.path.getsize(tmp_path / "values.csv") / os.path.getsize(tmp_path / "values_sparse.csv")
+
+    assert ratio > 4
+
+
+def test_every_segment_of_a_rotated_sparse_log_expands_on_its_own(tmp_path):
+    rows = voyage_rows(5)
+    write_log(ValuesLogWriter, tmp_path / "values.csv", rows)
+    writer = SparseValuesLogWriter(
+        str(tmp_path / "values_sparse.csv"), HEADER, TIME_START,
+        compression="gzip", rotate_bytes=2000, flush_interval=0.01,
+    )
+    for start in range(0, len(rows), 50):  # written in batches, so segments can be started between them
+        writer.submit_rows(rows[start : start + 50])
+        while writer.written < min(start + 50, len(rows)):
+            time.sleep(0.001)
+    writer.close()
+    assert len(writer._file.segments) > 2
+
+    expand_sparse_log(str(tmp_path / "values_sparse.001.csv.gz"), str(tmp_path / "values_wide.csv"))
+
+    wide, expanded = read_rows(tmp_path / "values.csv"), read_rows(tmp_path / "values_wide.csv")
+    assert expanded[0] == wide[0]
+    first = [row[1] for row in wide].index(expanded[1][1])
+    for wide_row, expanded_row in zip(wide[first:], expanded[1:]):
+        assert expanded_row[1:] == wide_row[1:]
+        assert expanded_row[0][:-3] == wide_row[0][:-3]
+
+
+def test_expanding_records_without_a_keyframe_fails(tmp_path):
+    path = tmp_path / "values_sparse.csv"
+    with open(path, "w", newline="") as csv_file:
+        csv.writer(csv_file).writerows([SPARSE_HEADER, ["0.600", "Signal_1", "2.0"]])
+
+    with pytest.raises(ValueError, match="before its first keyframe"):
+        expand_sparse_log(str(path), str(tmp_path / "values_wide.csv"))
@@ -0,0 +1,70 @@
+import csv
+import time
+from datetime import datetime
+
+from src.workers.values_log_worker import ValuesLogWriter
+
+HEADER = ["Timestamp", "Elapsed_Time_s", "Rudder", "Trim tab"]
+
+
+def read_rows(path):
+    with open(path, newline="") as csv_file:
+        return list(csv.reader(csv_file))
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_rows_are_formatted_like_the_values_log(tmp_path):
+    path = tmp_path / "values.csv"
+    writer = ValuesLogWriter(str(path), HEADER, time_start=1000.0)
+    writer.submit([1001.5, 12.5, None])
+    writer.submit_rows([[1002.25, 13.0, 4.0], [1003.0, 14.0, 5.0]])
+    writer.close()
+
+    assert read_rows(path) == [
+        HEADER,
+        [datetime.fromtimestamp(1001.5).isoformat(), "1.500", "12.5", "None"],
+        [datetime.fromtimestamp(1002.25).isoformat(), "2.250", "13.0", "4.0"],
+        [datetime.fromtimestamp(1003.0).isoformat(), "3.000", "14.0", "5.0"],
+    ]
+    assert writer.written == 3 and writer.dropped == 0
+
+
+def test_rows_are_written_when_flush_rows_are_waiting(tmp_path):
+    path = tmp_path / "values.csv"
+    writer = ValuesLogWriter(str(path), HEADER, 0, flush_rows=10, flush_interval=60)
+    writer.submit_rows([[t, t, t] for t in range(9)])
+    time.sleep(0.1)
+    assert writer.written == 0 and writer.lag > 0  # waiting for the interval
+
+    writer.submit([9, 9, 9])
+
+    assert wait_for(lambda: writer.written == 10)
+    assert len(read_rows(path)) == 11
+    assert wait_for(lambda: writer.lag == 0)
+    writer.close()
+
+
+def test_rows_are_written_every_flush_interval(tmp_path):
+    writer = ValuesLogWriter(str(tmp_path / "values.csv"), HEADER, 0, flush_interval=0.05)
+    writer.submit([0, 1, 2])
+
+    assert wait_for(lambda: writer.written == 1)
+    writer.close()
+
+
+def test_rows_over_capacity_are_dropped(tmp_path):
+    path = tmp_path / "values.csv"
+    writer = ValuesLogWriter(str(path), HEADER, 0, capacity=5, flush_interval=60)
+    writer.submit_rows([[t, t, t] for t in range(4)])
+    writer.submit_rows([[t, t, t] for t in range(4, 7)])
+    writer.submit([7, 7, 7])
+
+    assert writer.dropped == 3
+    writer.close()
+    assert [row[2] for row in read_rows(path)[1:]] == ["0", "1", "2", "3", "4"]